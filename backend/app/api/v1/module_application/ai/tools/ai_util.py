@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*- 
 
 from typing import Any, AsyncGenerator
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
 
 from app.config.setting import settings
 from app.core.logger import log
@@ -14,6 +12,9 @@ class AIClient:
     """
 
     def __init__(self):
+        # langchain 导入耗时较长，首次使用时才加载
+        from langchain_openai import ChatOpenAI
+
         # 使用LangChain的ChatOpenAI类
         self.client = ChatOpenAI(
             api_key=settings.OPENAI_API_KEY,
@@ -77,6 +78,8 @@ class AIClient:
         返回:
         - AsyncGenerator[str, Any]: 流式响应内容。
         """
+        from langchain_core.messages import SystemMessage, HumanMessage
+
         system_prompt = """你是一个有用的AI助手，可以帮助用户回答问题和提供帮助。请用中文回答用户的问题。"""
 
         try:
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from typing import Literal
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.common.response import ErrorResponse, StreamResponse, SuccessResponse
 from app.common.request import PaginationService
 from app.core.router_class import OperationLogRoute
 from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission
 from app.core.logger import log
@@ -305,6 +307,7 @@ async def clear_job_log_controller(
 @JobRouter.post('/log/export', summary="导出定时任务日志", description="导出定时任务日志")
 async def export_job_log_list_controller(
     search: JobLogQueryParam = Depends(),
+    file_format: Literal['xlsx', 'csv'] = Query('xlsx', description="导出格式(xlsx/csv)"),
     auth: AuthSchema = Depends(AuthPermission(["module_application:job:export"]))
 ) -> StreamingResponse:
     """
@@ -312,20 +315,20 @@ async def export_job_log_list_controller(
     
     参数:
     - search (JobLogQueryParam): 查询参数模型
+    - file_format (Literal['xlsx', 'csv']): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出定时任务日志结果的流式响应
     """
-    result_dict_list = await JobLogService.get_job_log_list_service(search=search, auth=auth)
-    export_result = await JobLogService.export_job_log_service(data_list=result_dict_list)
+    export_result = await JobLogService.stream_export_job_log_service(search=search, auth=auth, file_format=file_format)
     log.info('导出定时任务日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.MEDIA_TYPES[file_format],
         headers={
-            'Content-Disposition': 'attachment; filename=job_log.xlsx'
+            'Content-Disposition': f'attachment; filename=job_log.{file_format}'
         }
     )
 
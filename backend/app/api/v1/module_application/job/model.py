@@ -53,6 +53,8 @@ class JobLogModel(ModelMixin):
     job_trigger: Mapped[str | None] = mapped_column(String(255), nullable=True, default='', comment='任务触发器')
     job_message: Mapped[str | None] = mapped_column(String(500), nullable=True, default='', comment='日志信息')
     exception_info: Mapped[str | None] = mapped_column(String(2000), nullable=True, default='', comment='异常信息')
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True, comment='执行耗时(毫秒)')
+    latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True, comment='排队延迟(毫秒):计划执行时间到实际开始执行的间隔')
     
     # 任务关联
     job_id: Mapped[int | None] = mapped_column(
@@ -76,6 +76,8 @@ class JobLogCreateSchema(BaseModel):
     job_trigger: str | None = Field(default=None, description='任务触发器')
     job_message: str | None = Field(default=None, description='日志信息')
     exception_info: str | None = Field(default=None, description='异常信息')
+    duration_ms: int | None = Field(default=None, description='执行耗时(毫秒)')
+    latency_ms: int | None = Field(default=None, description='排队延迟(毫秒)')
     status: str = Field(default='0', description='任务状态:正常,失败')
     description: str | None = Field(default=None, max_length=255, description='描述')
     created_time: DateTimeStr | None = Field(default=None, description='创建时间')
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator, Literal
+
+from app.core.database import async_db_session
 from app.core.exceptions import CustomException
 from app.utils.cron_util import CronUtil
 from app.utils.excel_util import ExcelUtil
@@ -271,6 +274,25 @@ class JobLogService:
             ids = [log.id for log in all_logs]
             await JobLogCRUD(auth).delete_obj_log_crud(ids=ids)
 
+    # 定时任务日志导出字段映射
+    EXPORT_MAPPING = {
+        'id': '编号',
+        'job_name': '任务名称',
+        'job_group': '任务组名',
+        'job_executor': '任务执行器',
+        'invoke_target': '调用目标字符串',
+        'job_args': '位置参数',
+        'job_kwargs': '关键字参数',
+        'job_trigger': '任务触发器',
+        'job_message': '日志信息',
+        'exception_info': '异常信息',
+        'duration_ms': '执行耗时(毫秒)',
+        'latency_ms': '排队延迟(毫秒)',
+        'status': '执行状态',
+        'created_time': '创建时间',
+        'updated_time': '更新时间',
+    }
+
     @classmethod
     async def export_job_log_service(cls, data_list: list[dict]) -> bytes:
         """
@@ -282,26 +304,37 @@ class JobLogService:
         返回:
         - bytes: Excel文件字节流
         """
-        mapping_dict = {
-            'id': '编号',
-            'job_name': '任务名称',
-            'job_group': '任务组名',
-            'job_executor': '任务执行器',
-            'invoke_target': '调用目标字符串',
-            'job_args': '位置参数',
-            'job_kwargs': '关键字参数',
-            'job_trigger': '任务触发器',
-            'job_message': '日志信息',
-            'exception_info': '异常信息',
-            'status': '执行状态',
-            'created_time': '创建时间',
-            'updated_time': '更新时间',
-        }
-
         # 复制数据并转换状态
         data = data_list.copy()
         for item in data:
             item['status'] = '成功' if item.get('status') == '0' else '失败'
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=cls.EXPORT_MAPPING)
+
+    @classmethod
+    async def stream_export_job_log_service(cls, auth: AuthSchema, search: JobLogQueryParam | None = None, order_by: list[dict] | None = None, file_format: Literal['xlsx', 'csv'] = 'xlsx') -> AsyncIterator[bytes]:
+        """
+        流式导出定时任务日志(服务端游标分批读取，内存占用与日志总量无关)
+        
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - search (JobLogQueryParam | None): 查询参数模型
+        - order_by (list[dict] | None): 排序参数列表
+        - file_format (Literal['xlsx', 'csv']): 导出格式
+        
+        返回:
+        - AsyncIterator[bytes]: 导出文件字节流
+        """
+        async def batches() -> AsyncIterator[list[dict]]:
+            # 请求的数据库会话在响应体发送前已关闭，导出期间使用独立的只读会话
+            async with async_db_session() as db:
+                async with db.begin():
+                    stream_auth = AuthSchema(db=db, user=auth.user, check_data_scope=auth.check_data_scope)
+                    async for objs in JobLogCRUD(stream_auth).stream(search=search.__dict__ if search else None, order_by=order_by):
+                        data = [JobLogOutSchema.model_validate(obj).model_dump() for obj in objs]
+                        for item in data:
+                            item['status'] = '成功' if item.get('status') == '0' else '失败'
+                        yield data
+
+        return ExcelUtil.stream_export(batches(), mapping_dict=cls.EXPORT_MAPPING, file_format=file_format)
     
\ No newline at end of file
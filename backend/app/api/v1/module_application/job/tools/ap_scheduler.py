@@ -3,8 +3,15 @@
 import asyncio
 import json
 import importlib
+import os
+import socket
+import time
+import uuid
 from datetime import datetime
+from functools import partial
 from typing import Any
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
 from asyncio import iscoroutinefunction
 from apscheduler.job import Job
 from apscheduler.events import JobExecutionEvent, EVENT_ALL, JobEvent
@@ -17,17 +24,19 @@ from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from concurrent.futures import ThreadPoolExecutor
 
+from app.common.enums import RedisInitKeyConfig
 from app.config.setting import settings
-from app.core.database import engine, db_session, async_db_session
+from app.core.database import engine, async_db_session
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.utils.cron_util import CronUtil
 
 from app.api.v1.module_application.job.model import JobModel
+from app.api.v1.module_application.job.tools.job_log_writer import JobLogWriter
 
 job_stores = {
+    # 调度器必须有 default 存储器；内存存储器各进程独立，业务任务不写入(见 SchedulerUtil._resolve_jobstore)
     'default': MemoryJobStore(),
     'sqlalchemy': SQLAlchemyJobStore(url=settings.DB_URI, engine=engine), 
     'redis': RedisJobStore(
@@ -60,7 +69,61 @@ scheduler.configure(
 class SchedulerUtil:
     """
     定时任务相关方法
+
+    多 worker / 多实例部署时通过 Redis 租约选主，租约值为 "fencing token:节点ID"，
+    fencing token 每次易主时递增，任务执行前校验租约仍属于本节点，失去租约的旧主节点不会重复执行任务。
+    任务只写入共享存储器(Redis/数据库)，任意实例增删改任务后，主节点在下次续约唤醒时读取变更。
+    """
+
+    LEADER_KEY: str = RedisInitKeyConfig.SCHEDULER_LEADER.key
+    # 所有实例共享的任务存储器，任务增删改可在任意实例执行
+    SHARED_JOBSTORES: tuple[str, ...] = ('redis', 'sqlalchemy')
+    FENCE_KEY: str = f"{LEADER_KEY}:fence"
+
+    # 竞选/续约: 租约属于本节点时续期并返回 token；租约空闲时递增 token 并占有；否则返回 0
+    ACQUIRE_SCRIPT: str = """
+    local current = redis.call('GET', KEYS[1])
+    if current then
+        local sep = string.find(current, ':', 1, true)
+        if string.sub(current, sep + 1) == ARGV[1] then
+            redis.call('PEXPIRE', KEYS[1], ARGV[2])
+            return tonumber(string.sub(current, 1, sep - 1))
+        end
+        return 0
+    end
+    local token = redis.call('INCR', KEYS[2])
+    redis.call('SET', KEYS[1], token .. ':' .. ARGV[1], 'PX', ARGV[2])
+    return token
+    """
+    # 释放: 仅删除本节点持有的租约
+    RELEASE_SCRIPT: str = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
     """
+    # 任务执行前: 租约仍属于本节点时加执行锁，返回 1 表示可以执行，-1 表示租约已失效
+    FENCE_SCRIPT: str = """
+    if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+        return -1
+    end
+    if redis.call('SET', KEYS[2], ARGV[1], 'NX', 'EX', ARGV[2]) then
+        return 1
+    end
+    return 0
+    """
+
+    _redis: Redis | None = None
+    _acquire_script: AsyncScript | None = None
+    _release_script: AsyncScript | None = None
+    _fence_script: AsyncScript | None = None
+    _node_id: str = ""
+    _lease_value: str | None = None
+    _lease_deadline: float = 0.0
+    _lease_task: asyncio.Task | None = None
+    # 任务ID -> 实际开始执行时间戳，供执行事件计算耗时与排队延迟
+    _started: dict[str, float] = {}
+
     @classmethod
     def scheduler_event_listener(cls, event: JobEvent | JobExecutionEvent) -> None:
         """
@@ -76,163 +139,208 @@ class SchedulerUtil:
         if not isinstance(event, JobExecutionEvent):
             return
             
-        # 延迟导入避免循环导入
-        from app.api.v1.module_application.job.model import JobLogModel
-        
         # 获取事件类型和任务ID
         event_type = event.__class__.__name__
+        finished = time.time()
+        started = cls._started.pop(event.job_id, None)
         # 初始化任务状态
-        status = True
+        status = '0'
         exception_info = ''
-        if isinstance(event, JobExecutionEvent) and event.exception:
+        if event.exception:
             exception_info = str(event.exception)
-            status = False
-        if hasattr(event, 'job_id'):
-            job_id = event.job_id
-            query_job = cls.get_job(job_id=job_id)
-            if query_job:
-                query_job_info = query_job.__getstate__()
-                # 获取任务名称
-                job_name = query_job_info.get('name')
-                # 获取任务组名
-                job_group = query_job._jobstore_alias
-                # # 获取任务执行器
-                job_executor = query_job_info.get('executor')
-                # 获取调用目标字符串
-                invoke_target = query_job_info.get('func')
-                # 获取调用函数位置参数
-                job_args = ','.join(map(str, query_job_info.get('args', [])))
-                # 获取调用函数关键字参数
-                job_kwargs = json.dumps(query_job_info.get('kwargs'))
-                # 获取任务触发器
-                job_trigger = str(query_job_info.get('trigger'))
-                # 构造日志消息
-                job_message = f"事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_name}, 状态: {status}, 任务组: {job_group}, 错误详情: {exception_info}, 执行于{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                
-                # 创建ORM对象
-                job_log = JobLogModel(
-                    job_name=job_name,
-                    job_group=job_group,
-                    job_executor=job_executor,
-                    invoke_target=invoke_target,
-                    job_args=job_args,
-                    job_kwargs=job_kwargs,
-                    job_trigger=job_trigger,
-                    job_message=job_message,
-                    status=status,
-                    exception_info=exception_info,
-                    created_time=datetime.now(),
-                    updated_time=datetime.now(),
-                    job_id=job_id,
-                )
-                
-                # 使用线程池执行操作以避免阻塞调度器和数据库锁定问题
-                executor = ThreadPoolExecutor(max_workers=1)
-                executor.submit(cls._save_job_log_async_wrapper, job_log)
-                executor.shutdown(wait=False)
-
-    @classmethod
-    def _save_job_log_async_wrapper(cls, job_log) -> None:
-        """
-        异步保存任务日志的包装器函数，在独立线程中运行
-        
-        参数:
-        - job_log (JobLogModel): 任务日志对象
-        
-        返回:
-        - None
-        """
-        with db_session.begin() as session:
-            try:
-                session.add(job_log)
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                log.error(f"保存任务日志失败: {str(e)}")
-            finally:
-                session.close()
+            status = '1'
+        job_id = event.job_id
+        query_job = cls.get_job(job_id=job_id)
+        if not query_job:
+            return
+        query_job_info = query_job.__getstate__()
+        # 获取任务名称
+        job_name = query_job_info.get('name')
+        # 构造日志消息
+        job_message = f"事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_name}, 状态: {'成功' if status == '0' else '失败'}, 任务组: {query_job._jobstore_alias}, 错误详情: {exception_info}, 执行于{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+        # 交给批量写入器异步落库，不阻塞调度器
+        JobLogWriter.submit({
+            "job_name": job_name,
+            # 获取任务组名
+            "job_group": query_job._jobstore_alias,
+            # 获取任务执行器
+            "job_executor": query_job_info.get('executor'),
+            # 获取调用目标字符串
+            "invoke_target": query_job_info.get('func'),
+            # 获取调用函数位置参数
+            "job_args": ','.join(map(str, query_job_info.get('args', []))),
+            # 获取调用函数关键字参数
+            "job_kwargs": json.dumps(query_job_info.get('kwargs')),
+            # 获取任务触发器
+            "job_trigger": str(query_job_info.get('trigger')),
+            "job_message": job_message[:500],
+            "exception_info": exception_info[:2000],
+            # 执行耗时与排队延迟(计划执行时间到实际开始执行)，未实际执行(如错过执行)时为空
+            "duration_ms": round((finished - started) * 1000) if started else None,
+            "latency_ms": round((started - event.scheduled_run_time.timestamp()) * 1000) if started and event.scheduled_run_time else None,
+            "status": status,
+            "job_id": int(job_id) if str(job_id).isdigit() else None,
+        })
 
     @classmethod
-    async def init_system_scheduler(cls) -> None:
+    async def init_system_scheduler(cls, redis: Redis) -> None:
         """
         应用启动时初始化定时任务。
+
+        所有 worker 均以暂停状态启动调度器(可增删改任务，写入共享存储器)，通过 Redis 租约选出主节点，
+        只有主节点加载数据库中的任务并触发执行；主节点失联后租约过期，其他 worker 在数秒内接管。
     
+        参数:
+        - redis (Redis): Redis 连接(连接池由所有任务执行共享)。
+
         返回:
         - None
         """
-        # 延迟导入避免循环导入
-        from app.api.v1.module_application.job.crud import JobCRUD
-        from app.api.v1.module_system.auth.schema import AuthSchema
         log.info('🔎 开始启动定时任务...')
-        
-        # 启动调度器
-        scheduler.start()
+        cls._redis = redis
+        # 预加载模式下 worker 由主进程 fork，节点ID须在 worker 内生成
+        cls._node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        cls._acquire_script = redis.register_script(cls.ACQUIRE_SCRIPT)
+        cls._release_script = redis.register_script(cls.RELEASE_SCRIPT)
+        cls._fence_script = redis.register_script(cls.FENCE_SCRIPT)
+
+        # 启动调度器(暂停状态，成为主节点后恢复)
+        scheduler.start(paused=True)
         
         # 添加事件监听器
         scheduler.add_listener(cls.scheduler_event_listener, EVENT_ALL)
-        
-        async with async_db_session() as session:
-            async with session.begin():
-                auth = AuthSchema(db=session)
-                job_list = await JobCRUD(auth).get_obj_list_crud()
-                
-                # 只在一个实例上初始化任务
-                # 使用Redis锁确保只有一个实例执行任务初始化
-                import redis.asyncio as redis
-                redis_client = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=int(settings.REDIS_PORT),
-                    username=settings.REDIS_USER,
-                    password=settings.REDIS_PASSWORD,
-                    db=int(settings.REDIS_DB_NAME),
-                )
-                
-                # 尝试获取锁，过期时间10秒
-                lock_key = "scheduler_init_lock"
-                lock_acquired = await redis_client.set(lock_key, "1", ex=10, nx=True)
-                
-                if lock_acquired:
-                    try:
-                        for item in job_list:
-                            # 检查任务是否已经存在
-                            existing_job = cls.get_job(job_id=item.id)
-                            if existing_job:
-                                cls.remove_job(job_id=item.id)  # 删除旧任务
-                            
-                            # 添加新任务
-                            cls.add_job(item)
-                            
-                            # 根据数据库中保存的状态来设置任务状态
-                            if hasattr(item, 'status') and item.status == "1":
-                                # 如果任务状态为暂停，则立即暂停刚添加的任务
-                                cls.pause_job(job_id=item.id)
-                        log.info('✅️ 系统初始定时任务加载成功')
-                    finally:
-                        # 释放锁
-                        await redis_client.delete(lock_key)
-                else:
-                    # 等待其他实例完成初始化
-                    import asyncio
-                    await asyncio.sleep(2)
-                    log.info('✅️ 定时任务已由其他实例初始化完成')
+
+        # 先竞选一次，单实例部署时启动完成即已加载任务
+        await cls._elect()
+        cls._lease_task = asyncio.create_task(cls._lease_loop())
 
     @classmethod
     async def close_system_scheduler(cls) -> None:
         """
         关闭系统定时任务。
+
+        任务保留在共享存储器中(下一任主节点会按数据库重新加载)，主节点释放租约以便其他实例立即接管。
     
         返回:
         - None
         """
         try:
-            # 移除所有任务
-            scheduler.remove_all_jobs()
+            if cls._lease_task:
+                cls._lease_task.cancel()
+                cls._lease_task = None
+            if cls._lease_value:
+                await cls._release_script(keys=[cls.LEADER_KEY], args=[cls._lease_value])
+                cls._step_down()
             # 等待所有任务完成后再关闭
             scheduler.shutdown(wait=True)
             log.info('✅️ 关闭定时任务成功')
         except Exception as e:
             log.error(f'关闭定时任务失败: {str(e)}')
 
+    @classmethod
+    def is_leader(cls) -> bool:
+        """
+        当前实例是否为调度主节点。
+    
+        返回:
+        - bool: 是否为主节点。
+        """
+        return cls._lease_value is not None
+
+    @classmethod
+    async def _lease_loop(cls) -> None:
+        """
+        租约维护(常驻任务): 定期竞选/续约，主节点每次续约时唤醒调度器以感知其他实例写入共享存储器的任务变更
+        """
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_LEASE_RENEW_INTERVAL)
+            try:
+                await cls._elect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"定时任务租约续约失败: {str(e)}")
+                # 无法确认租约时，在租约到期前主动退位，避免与新主节点同时触发任务
+                if cls._lease_value and time.monotonic() >= cls._lease_deadline:
+                    cls._step_down()
+
+    @classmethod
+    async def _elect(cls) -> None:
+        """
+        竞选或续约主节点租约。
+    
+        返回:
+        - None
+        """
+        ttl = settings.SCHEDULER_LEASE_TTL
+        started = time.monotonic()
+        token = int(await cls._acquire_script(keys=[cls.LEADER_KEY, cls.FENCE_KEY], args=[cls._node_id, ttl * 1000]))
+        if not token:
+            if cls._lease_value:
+                log.warning('⚠️ 定时任务主节点租约已被其他实例持有，转为从节点')
+                cls._step_down()
+            return
+        # 提前一个续约周期视为到期，留出退位时间
+        cls._lease_deadline = started + ttl - settings.SCHEDULER_LEASE_RENEW_INTERVAL
+        lease_value = f"{token}:{cls._node_id}"
+        if cls._lease_value == lease_value:
+            scheduler.wakeup()
+            return
+        cls._lease_value = lease_value
+        try:
+            await cls._load_jobs()
+        except Exception:
+            await cls._release_script(keys=[cls.LEADER_KEY], args=[lease_value])
+            cls._lease_value = None
+            raise
+        scheduler.resume()
+        log.info(f'✅️ 当前实例成为定时任务主节点 (fencing token {token})')
+
+    @classmethod
+    def _step_down(cls) -> None:
+        """
+        退位为从节点: 暂停调度器，不再触发任务。
+    
+        返回:
+        - None
+        """
+        cls._lease_value = None
+        if scheduler.running:
+            scheduler.pause()
+
+    @classmethod
+    async def _load_jobs(cls) -> None:
+        """
+        主节点按数据库中的任务配置重新加载调度任务。
+    
+        返回:
+        - None
+        """
+        # 延迟导入避免循环导入
+        from app.api.v1.module_application.job.crud import JobCRUD
+        from app.api.v1.module_system.auth.schema import AuthSchema
+
+        async with async_db_session() as session:
+            async with session.begin():
+                auth = AuthSchema(db=session)
+                job_list = await JobCRUD(auth).get_obj_list_crud()
+                
+        for item in job_list:
+            # 检查任务是否已经存在
+            existing_job = cls.get_job(job_id=item.id)
+            if existing_job:
+                cls.remove_job(job_id=item.id)  # 删除旧任务
+            
+            # 添加新任务
+            cls.add_job(item)
+            
+            # 根据数据库中保存的状态来设置任务状态
+            if hasattr(item, 'status') and item.status == "1":
+                # 如果任务状态为暂停，则立即暂停刚添加的任务
+                cls.pause_job(job_id=item.id)
+        log.info('✅️ 系统初始定时任务加载成功')
+
     @classmethod
     def get_job(cls, job_id: str | int) -> Job | None:
         """
@@ -258,35 +366,20 @@ class SchedulerUtil:
 
     @classmethod
     async def _task_wrapper(cls, func, job_id, *args, **kwargs):
-        """任务执行包装器，添加分布式锁防止并发执行"""
-        from redis.asyncio import Redis
-        from app.config.setting import settings
-        from app.core.logger import log
-
-        # 使用项目配置创建Redis连接池
-        redis_client = Redis(
-            host=settings.REDIS_HOST,
-            port=int(settings.REDIS_PORT),
-            username=settings.REDIS_USER,
-            password=settings.REDIS_PASSWORD,
-            db=int(settings.REDIS_DB_NAME),
-            encoding='utf-8',
-            decode_responses=True,
-            health_check_interval=20,
-            max_connections=settings.POOL_SIZE,
-            socket_timeout=settings.POOL_TIMEOUT
-        )
-
+        """任务执行包装器: 校验主节点租约(fencing token)并加执行锁，防止失去租约的旧主节点或并发实例重复执行"""
         lock_key = f"job_lock:{job_id}"
         lock_expire = 30  # 锁过期时间，根据任务实际执行时间调整
         lock_acquired = None
 
         try:
-            # 获取分布式锁，使用nx=True确保原子性操作
-            lock_acquired = await redis_client.set(lock_key, "1", ex=lock_expire, nx=True)
+            # 租约校验与加锁在同一脚本中原子完成
+            lock_acquired = cls._lease_value is not None and int(await cls._fence_script(
+                keys=[cls.LEADER_KEY, lock_key], args=[cls._lease_value, lock_expire]
+            )) == 1
             
             if lock_acquired:
                 log.info(f"任务 {job_id} 获取执行锁成功")
+                cls._started[job_id] = time.time()
                 # 执行任务
                 if iscoroutinefunction(func):
                     return await func(*args, **kwargs)
@@ -295,23 +388,21 @@ class SchedulerUtil:
                     log.info(f"任务 {job_id} 开始执行同步函数: {func.__name__}, 参数: {args}-{kwargs}")
                     try:
                         loop = asyncio.get_running_loop()
-                        result = await loop.run_in_executor(None, func, *args, **kwargs)
+                        result = await loop.run_in_executor(None, partial(func, *args, **kwargs))
                         log.info(f"任务 {job_id} 同步函数执行完成，结果: {result}")
                         return result
                     except Exception as e:
                         log.error(f"任务 {job_id} 同步函数执行失败: {str(e)}")
                         raise
             else:
-                # 获取锁失败，记录日志
-                log.info(f"任务 {job_id} 获取执行锁失败，跳过本次执行")
+                # 非主节点或获取锁失败，记录日志
+                log.info(f"任务 {job_id} 未持有主节点租约或获取执行锁失败，跳过本次执行")
                 return None
         finally:
             # 释放锁
             if lock_acquired:
-                await redis_client.delete(lock_key)
+                await cls._redis.delete(lock_key)
                 log.info(f"任务 {job_id} 释放执行锁")
-            # 关闭Redis连接
-            await redis_client.close()
 
     @classmethod
     def add_job(cls, job_info: JobModel) -> Job:
@@ -332,9 +423,8 @@ class SchedulerUtil:
             module = importlib.import_module(module_path)
             job_func = getattr(module, func_name)
             
-            # 2. 确定任务存储器：优先使用redis，确保分布式环境中任务同步
-            if job_info.jobstore is None:
-                job_info.jobstore = 'redis'  # 改为默认使用redis存储
+            # 2. 确定任务存储器：只允许共享存储器，从节点写入的任务由主节点续约唤醒时读取执行
+            jobstore = cls._resolve_jobstore(job_info.jobstore)
             
             # 3. 确定执行器
             job_executor = job_info.executor
@@ -421,10 +511,10 @@ class SchedulerUtil:
                 name=job_info.name,
                 coalesce=job_info.coalesce,
                 max_instances=1,  # 确保只有一个实例执行
-                jobstore=job_info.jobstore,
+                jobstore=jobstore,
                 executor=job_executor,
             )
-            log.info(f"任务 {job_info.id} 添加到 {job_info.jobstore} 存储器成功")
+            log.info(f"任务 {job_info.id} 添加到 {jobstore} 存储器成功")
             return job
         except ModuleNotFoundError:
             raise ValueError(f"未找到该模块：{module_path}")
@@ -433,6 +523,25 @@ class SchedulerUtil:
         except Exception as e:
             raise CustomException(msg=f"添加任务失败: {str(e)}")
 
+    @classmethod
+    def _resolve_jobstore(cls, jobstore: str | None) -> str:
+        """
+        确定任务存储器。
+
+        内存存储器('default')只在当前进程可见，从节点写入后主节点无法读取执行，因此改用 Redis 共享存储器。
+
+        参数:
+        - jobstore (str | None): 任务配置的存储器。
+
+        返回:
+        - str: 实际使用的存储器。
+        """
+        if jobstore in cls.SHARED_JOBSTORES:
+            return jobstore
+        if jobstore not in (None, 'default'):
+            log.warning(f"⚠️ 未知的任务存储器 {jobstore}，改用 redis 存储器")
+        return 'redis'
+
     @classmethod
     def remove_job(cls, job_id: str | int) -> None:
         """
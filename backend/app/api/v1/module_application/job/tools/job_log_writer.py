@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import random
+from sqlalchemy import insert
+
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.core.logger import log
+
+from app.api.v1.module_application.job.model import JobLogModel
+
+
+class JobLogWriter:
+    """
+    任务执行日志批量写入器
+
+    调度器事件监听只负责组装日志记录并放入进程内有界队列，由后台任务按
+    JOB_LOG_BATCH_SIZE 条或 JOB_LOG_FLUSH_INTERVAL_MS 毫秒批量 INSERT。
+
+    队列使用率超过 JOB_LOG_SAMPLE_THRESHOLD 时按 JOB_LOG_SAMPLE_RATE 对成功日志采样，
+    失败日志始终入队；队列已满时失败日志写入应用日志。应用关闭时 flush 队列中剩余的日志。
+    采样与丢弃(队列已满、写入失败、关闭超时)条数通过 stats() 暴露给运行时统计接口。
+    """
+
+    _queue: asyncio.Queue | None = None
+    _task: asyncio.Task | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    sampled: int = 0
+    dropped: int = 0
+
+    @classmethod
+    def start(cls) -> None:
+        """启动后台写入任务（由 lifespan 调用）"""
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._loop = asyncio.get_running_loop()
+        cls._queue = asyncio.Queue(maxsize=settings.JOB_LOG_QUEUE_SIZE)
+        cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止后台写入任务并 flush 剩余日志（由 lifespan 调用）"""
+        queue, task = cls._queue, cls._task
+        if queue is None or task is None:
+            return
+        cls._queue = None
+        try:
+            await asyncio.wait_for(queue.put(None), timeout=settings.JOB_LOG_SHUTDOWN_TIMEOUT)
+            await asyncio.wait_for(task, timeout=settings.JOB_LOG_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            task.cancel()
+            cls.dropped += queue.qsize()
+            log.warning(f"任务执行日志 flush 超时，丢弃 {queue.qsize()} 条")
+        finally:
+            cls._task = None
+            cls._loop = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        获取写入统计(进程内累计值)
+
+        返回:
+        - dict: 运行状态、队列长度与容量、采样丢弃条数、丢弃条数
+        """
+        queue = cls._queue
+        return {
+            "running": cls._task is not None and not cls._task.done(),
+            "queue_size": queue.qsize() if queue is not None else 0,
+            "queue_maxsize": queue.maxsize if queue is not None else 0,
+            "sampled": cls.sampled,
+            "dropped": cls.dropped,
+        }
+
+    @classmethod
+    def submit(cls, record: dict) -> None:
+        """
+        提交一条任务执行日志(同步方法，可在调度器事件回调或其他线程中调用)
+
+        参数:
+        - record (dict): 日志记录(字段与 JobLogModel 一致，status 为 '0' 表示成功)
+        """
+        loop = cls._loop
+        if loop is None:
+            cls.dropped += 1
+            log.warning(f"任务执行日志写入器未启动，丢弃任务 {record.get('job_id')} 的执行日志")
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            cls._put(record)
+        else:
+            loop.call_soon_threadsafe(cls._put, record)
+
+    @classmethod
+    def _put(cls, record: dict) -> None:
+        """
+        按队列负载采样后入队
+
+        参数:
+        - record (dict): 日志记录
+        """
+        queue = cls._queue
+        if queue is None:
+            return
+        failed = record.get("status") != "0"
+        if not failed and queue.qsize() >= queue.maxsize * settings.JOB_LOG_SAMPLE_THRESHOLD:
+            if random.random() >= settings.JOB_LOG_SAMPLE_RATE:
+                cls.sampled += 1
+                return
+        try:
+            queue.put_nowait(record)
+        except asyncio.QueueFull:
+            cls.dropped += 1
+            if failed:
+                log.error(f"任务执行日志队列已满，任务 {record.get('job_id')} 执行失败: {record.get('exception_info')}")
+
+    @classmethod
+    async def _run(cls) -> None:
+        """后台任务：按条数或时间窗口聚合批次并写入"""
+        queue = cls._queue
+        loop = asyncio.get_running_loop()
+        interval = settings.JOB_LOG_FLUSH_INTERVAL_MS / 1000
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + interval
+            closing = False
+            while len(batch) < settings.JOB_LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    closing = True
+                    break
+                batch.append(record)
+            await cls._write(batch)
+            if closing:
+                return
+
+    @classmethod
+    async def _write(cls, batch: list[dict]) -> None:
+        """
+        批量写入数据库: 整批写入失败时逐行重试(每行一个 SAVEPOINT)，只丢弃写入失败的记录
+
+        单行失败常见于日志入队后任务被删除(job_id 外键失效)，不应连带丢弃同批的其他日志。
+
+        参数:
+        - batch (list[dict]): 日志记录列表
+        """
+        try:
+            async with async_db_session() as session:
+                async with session.begin():
+                    await session.execute(insert(JobLogModel), batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                cls.dropped += 1
+                log.error(f"写入任务执行日志失败(任务 {batch[0].get('job_id')}): {str(e)}")
+                return
+            log.warning(f"批量写入任务执行日志失败({len(batch)}条)，逐条重试: {str(e)}")
+
+        dropped = 0
+        try:
+            async with async_db_session() as session:
+                async with session.begin():
+                    for record in batch:
+                        try:
+                            async with session.begin_nested():
+                                await session.execute(insert(JobLogModel), [record])
+                        except Exception as e:
+                            dropped += 1
+                            log.error(f"写入任务执行日志失败(任务 {record.get('job_id')}): {str(e)}")
+        except Exception as e:
+            # 提交失败时整批回滚
+            cls.dropped += len(batch)
+            log.error(f"批量写入任务执行日志失败({len(batch)}条): {str(e)}")
+            return
+        cls.dropped += dropped
@@ -3,11 +3,13 @@
 from pathlib import Path
 from fastapi import APIRouter, BackgroundTasks, Body, Depends, UploadFile, Request
 from fastapi.responses import JSONResponse, FileResponse
+from redis.asyncio.client import Redis
 
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.logger import log
 from app.common.response import SuccessResponse, UploadFileResponse
 from app.core.router_class import OperationLogRoute
+from app.api.v1.module_system.auth.schema import AuthSchema
 from app.utils.upload_util import UploadUtil
 
 from .service import FileService
@@ -56,3 +58,23 @@ async def download_controller(
         background_tasks.add_task(UploadUtil.delete_file, Path(file_path))
     log.info(f"下载文件成功")
     return UploadFileResponse(file_path=result.file_path, filename=result.file_name)
+
+@FileRouter.get("/import/progress/{task_id}", summary="查询导入进度", description="查询当前用户发起的导入任务进度")
+async def import_progress_controller(
+    task_id: str,
+    redis: Redis = Depends(redis_getter),
+    auth: AuthSchema = Depends(AuthPermission()),
+) -> JSONResponse:
+    """
+    查询导入进度
+    
+    参数:
+    - task_id (str): 导入任务编号
+    - redis (Redis): Redis客户端
+    - auth (AuthSchema): 认证信息模型
+    
+    返回:
+    - JSONResponse: 包含导入进度的JSON响应
+    """
+    result_dict = await FileService.import_progress_service(auth=auth, redis=redis, task_id=task_id)
+    return SuccessResponse(data=result_dict, msg="查询导入进度成功")
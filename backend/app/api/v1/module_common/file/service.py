@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
-from typing import Dict
+from typing import Any, Dict
 from fastapi import UploadFile
+from redis.asyncio.client import Redis
 
 from app.core.exceptions import CustomException
 from app.core.base_schema import UploadResponseSchema, DownloadFileSchema
+from app.utils.excel_util import ImportProgress
 from app.utils.upload_util import UploadUtil
+from app.api.v1.module_system.auth.schema import AuthSchema
 
 
 class FileService:
@@ -67,4 +70,25 @@ class FileService:
         return DownloadFileSchema(
             file_path=file_path,
             file_name=str(file_name),
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    async def import_progress_service(cls, auth: AuthSchema, redis: Redis, task_id: str) -> Dict[str, Any]:
+        """
+        查询当前用户发起的导入任务进度。
+        
+        参数:
+        - auth (AuthSchema): 认证信息模型。
+        - redis (Redis): Redis客户端。
+        - task_id (str): 导入任务编号(导入接口的 task_id 参数)。
+        
+        返回:
+        - Dict[str, Any]: 导入进度。
+        
+        异常:
+        - CustomException: 当任务不存在或已过期时抛出。
+        """
+        progress = await ImportProgress.get(redis=redis, user_id=auth.user.id, task_id=task_id)
+        if not progress:
+            raise CustomException(msg="导入任务不存在或已过期")
+        return progress
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.core.database import async_db_session
 
 HealthRouter = APIRouter(prefix="", tags=["健康检查"])
 
@@ -14,3 +17,32 @@ async def health_check() -> JSONResponse:
     - JSONResponse: 包含健康状态的JSON响应
     """
     return JSONResponse(content={"msg": True}, status_code=200)
+
+@HealthRouter.get("/health/ready", summary="就绪检查", description="检查启动步骤是否完成以及数据库、Redis是否可用，未就绪时返回503")
+async def health_ready(request: Request) -> JSONResponse:
+    """
+    就绪检查接口(与存活检查 /health 区分: 启动未完成、正在关闭或依赖不可用时返回503，负载均衡据此摘除实例)
+    
+    参数:
+    - request (Request): 请求对象
+    
+    返回:
+    - JSONResponse: 包含就绪状态、启动步骤与依赖检查结果的JSON响应
+    """
+    startup = getattr(request.app.state, "startup", None)
+    content = startup.status() if startup else {"ready": False}
+    checks = {}
+    try:
+        checks["redis"] = bool(await request.app.state.redis.ping())
+    except Exception:
+        checks["redis"] = False
+    try:
+        async with async_db_session() as session:
+            await session.execute(text("SELECT 1"))
+        checks["database"] = True
+    except Exception:
+        checks["database"] = False
+    content["checks"] = checks
+    ready = bool(content["ready"]) and all(checks.values())
+    content["msg"] = ready
+    return JSONResponse(content=content, status_code=200 if ready else 503)
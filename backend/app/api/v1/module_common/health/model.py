@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.base_model import MappedBase
+
+
+class StartupStampModel(MappedBase):
+    """
+    启动初始化版本戳表
+
+    记录集群内只需执行一次的启动步骤(如建表和基础数据初始化)最近一次完成时的版本，
+    版本一致时后续启动直接跳过该步骤。
+    """
+    __tablename__: str = 'sys_startup_stamp'
+    __table_args__: dict[str, str] = ({'comment': '启动初始化版本戳表'})
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True, comment='启动步骤名称')
+    version: Mapped[str] = mapped_column(String(64), nullable=False, comment='完成时的版本戳')
+    updated_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment='更新时间')
@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter, Depends, UploadFile, Body, Path, Query
 from fastapi.responses import StreamingResponse, JSONResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import SuccessResponse, StreamResponse
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.core.base_params import PaginationQueryParam
 from app.utils.common_util import bytes2file_response
@@ -38,7 +39,9 @@ async def get_sys_documents_list_controller(
         page_no=page.page_no if page.page_no is not None else 1,
         page_size=page.page_size if page.page_size is not None else 10,
         search=search,
-        order_by=page.order_by
+        order_by=page.order_by,
+        cursor=page.cursor,
+        with_total=page.with_total
     )
     log.info("查询文档管理列表成功")
     return SuccessResponse(data=result_dict, msg="查询文档管理列表成功")
@@ -105,10 +108,12 @@ async def export_sys_documents_list_controller(
 @SysDocumentsRouter.post('/import', summary="导入文档管理", description="导入文档管理")
 async def import_sys_documents_list_controller(
     file: UploadFile,
+    task_id: str | None = Query(None, description="导入任务编号(用于轮询导入进度)"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["module_gencode:sys_documents:import"]))
 ) -> JSONResponse:
     """导入文档管理接口"""
-    batch_import_result = await SysDocumentsService.batch_import_sys_documents_service(file=file, auth=auth, update_support=True)
+    batch_import_result = await SysDocumentsService.batch_import_sys_documents_service(file=file, auth=auth, update_support=True, redis=redis, task_id=task_id)
     log.info("导入文档管理成功")
     
     return SuccessResponse(data=batch_import_result, msg="导入文档管理成功")
@@ -97,7 +97,7 @@ class SysDocumentsCRUD(CRUDBase[SysDocumentsModel, SysDocumentsCreateSchema, Sys
         """
         return await self.set(ids=ids, status=status)
     
-    async def page_sys_documents_crud(self, offset: int, limit: int, order_by: list[dict] | None = None, search: dict | None = None, preload: list | None = None) -> dict:
+    async def page_sys_documents_crud(self, offset: int, limit: int, order_by: list[dict] | None = None, search: dict | None = None, preload: list | None = None, cursor: str | None = None, with_total: bool = True) -> dict:
         """
         分页查询（返回原始对象，用于后续处理文件信息）
         
@@ -107,39 +107,40 @@ class SysDocumentsCRUD(CRUDBase[SysDocumentsModel, SysDocumentsCreateSchema, Sys
         - order_by (list[dict] | None): 排序参数，未提供时使用模型默认项
         - search (dict | None): 查询参数，未提供时查询所有
         - preload (list | None): 预加载关系，未提供时使用模型默认项
+        - cursor (str | None): 游标分页标识，None 时使用偏移分页
+        - with_total (bool): 游标分页时是否统计总数
         
         返回:
         - Dict: 分页数据（包含原始对象列表）
         """
-        from sqlalchemy import func, select
-        from sqlalchemy import inspect as sa_inspect
+        from sqlalchemy import select
         from app.core.exceptions import CustomException
         
         try:
             conditions = await self._CRUDBase__build_conditions(**search) if search else []
             order = order_by or [{'id': 'asc'}]
+
+            if cursor is not None:
+                # 游标分页：不做偏移扫描，按需统计总数
+                objs, next_cursor = await self._CRUDBase__cursor_objs(conditions=conditions, order_by=order, limit=limit, cursor=cursor, preload=preload)
+                total = await self._CRUDBase__count(conditions) if with_total else None
+                return {
+                    "page_no": None,
+                    "page_size": limit,
+                    "total": total,
+                    "has_next": next_cursor is not None,
+                    "next_cursor": next_cursor,
+                    "items": objs,  # 返回原始对象列表
+                    "_raw_items": True  # 标记为原始对象，需要在service层处理
+                }
+
             sql = select(self.model).where(*conditions).order_by(*self._CRUDBase__order_by(order))
             # 应用预加载选项
             for opt in self._CRUDBase__loader_options(preload):
                 sql = sql.options(opt)
             sql = await self._CRUDBase__filter_permissions(sql)
 
-            # 优化count查询：使用主键计数而非全表扫描
-            mapper = sa_inspect(self.model)
-            pk_cols = list(getattr(mapper, "primary_key", []))
-            if pk_cols:
-                # 使用主键的第一列进行计数（主键必定非NULL，性能更好）
-                count_sql = select(func.count(pk_cols[0])).select_from(self.model)
-            else:
-                # 降级方案：使用count(*)
-                count_sql = select(func.count()).select_from(self.model)
-            
-            if conditions:
-                count_sql = count_sql.where(*conditions)
-            count_sql = await self._CRUDBase__filter_permissions(count_sql)
-            
-            total_result = await self.auth.db.execute(count_sql)
-            total = total_result.scalar() or 0
+            total = await self._CRUDBase__count(conditions)
 
             result = await self.auth.db.execute(sql.offset(offset).limit(limit))
             objs = result.scalars().all()
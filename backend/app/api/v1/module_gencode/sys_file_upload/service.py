@@ -1,15 +1,15 @@
 # -*- coding: utf-8 -*-
 
-import io
 import os
 import aiofiles
 from pathlib import Path
 from fastapi import UploadFile
-import pandas as pd
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelImporter, ExcelUtil, ImportColumn, ImportResult
 from app.core.logger import log
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.config.path_conf import FILE_UPLOAD_DIR
@@ -39,7 +39,7 @@ class SysFileUploadService:
         return [SysFileUploadOutSchema.model_validate(obj).model_dump() for obj in obj_list]
 
     @classmethod
-    async def page_sys_file_upload_service(cls, auth: AuthSchema, page_no: int, page_size: int, search: SysFileUploadQueryParam | None = None, order_by: list[dict] | None = None) -> dict:
+    async def page_sys_file_upload_service(cls, auth: AuthSchema, page_no: int, page_size: int, search: SysFileUploadQueryParam | None = None, order_by: list[dict] | None = None, cursor: str | None = None, with_total: bool = True) -> dict:
         """分页查询（数据库分页）"""
         search_dict = search.__dict__ if search else {}
         order_by_list = order_by or [{'id': 'asc'}]
@@ -48,7 +48,9 @@ class SysFileUploadService:
             offset=offset,
             limit=page_size,
             order_by=order_by_list,
-            search=search_dict
+            search=search_dict,
+            cursor=cursor,
+            with_total=with_total
         )
         return result
     
@@ -137,77 +139,33 @@ class SysFileUploadService:
         return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
 
     @classmethod
-    async def batch_import_sys_file_upload_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
-        """批量导入"""
-        header_dict = {
-            '原始文件名': 'origin_name',
-            '新文件名（生成后的文件名）': 'file_name',
-            '文件存储路径': 'file_path',
-            '文件大小（字节）': 'file_size',
-            '文件类型/扩展名': 'file_type',
-            '主键ID': 'id',
-            'UUID全局唯一标识': 'uuid',
-            '是否启用(0:启用 1:禁用)': 'status',
-            '备注/描述': 'description',
-            '创建时间': 'created_time',
-            '更新时间': 'updated_time',
-            '创建人ID': 'created_id',
-            '更新人ID': 'updated_id',
-        }
+    async def batch_import_sys_file_upload_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False, redis: Redis | None = None, task_id: str | None = None) -> str:
+        """批量导入(流式读取，每块在独立事务中写入)"""
+        columns = [
+            ImportColumn(header='原始文件名', field='origin_name', required=True),
+            ImportColumn(header='新文件名（生成后的文件名）', field='file_name', required=True),
+            ImportColumn(header='文件存储路径', field='file_path', required=True),
+            ImportColumn(header='文件大小（字节）', field='file_size', type='int', required=True),
+            ImportColumn(header='文件类型/扩展名', field='file_type', required=True),
+            ImportColumn(header='是否启用(0:启用 1:禁用)', field='status', default='0'),
+            ImportColumn(header='备注/描述', field='description', max_length=255),
+        ]
 
-        try:
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
-            await file.close()
-            
-            if df.empty:
-                raise CustomException(msg="导入文件为空")
-            
-            missing_headers = [header for header in header_dict.keys() if header not in df.columns]
-            if missing_headers:
-                raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
-            
-            df.rename(columns=header_dict, inplace=True)
-            
-            # 验证必填字段
-            
-            error_msgs = []
-            success_count = 0
-            count = 0
-            
-            for index, row in df.iterrows():
-                count += 1
-                try:
-                    data = {
-                        "origin_name": row['origin_name'],
-                        "file_name": row['file_name'],
-                        "file_path": row['file_path'],
-                        "file_size": row['file_size'],
-                        "file_type": row['file_type'],
-                        "id": row['id'],
-                        "uuid": row['uuid'],
-                        "status": row['status'],
-                        "description": row['description'],
-                        "created_time": row['created_time'],
-                        "updated_time": row['updated_time'],
-                        "created_id": row['created_id'],
-                        "updated_id": row['updated_id'],
-                    }
-                    # 使用CreateSchema做校验后入库
-                    create_schema = SysFileUploadCreateSchema.model_validate(data)
-                    
-                    # 检查唯一性约束
-                    
-                    await SysFileUploadCRUD(auth).create_sys_file_upload_crud(data=create_schema)
-                    success_count += 1
-                except Exception as e:
-                    error_msgs.append(f"第{count}行: {str(e)}")
-                    continue
+        async def writer(db: AsyncSession, rows: list[tuple[int, dict]], result: ImportResult) -> int:
+            """分块写入: 校验通过的行批量插入"""
+            chunk_auth = AuthSchema(db=db, user=auth.user, check_data_scope=auth.check_data_scope)
+            await SysFileUploadCRUD(chunk_auth).bulk_create(data=[item for _, item in rows])
+            return len(rows)
 
-            result = f"成功导入 {success_count} 条数据"
-            if error_msgs:
-                result += "\n错误信息:\n" + "\n".join(error_msgs)
-            return result
+        try:
+            result = await ExcelImporter(
+                columns=columns,
+                schema=SysFileUploadCreateSchema,
+                redis=redis,
+                task_id=task_id,
+                user_id=auth.user.id if auth.user else None,
+            ).run(file=file, writer=writer)
+            return result.message()
             
         except Exception as e:
             log.error(f"批量导入失败: {str(e)}")
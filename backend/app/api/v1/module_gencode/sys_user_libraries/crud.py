@@ -97,7 +97,7 @@ class SysUserLibrariesCRUD(CRUDBase[SysUserLibrariesModel, SysUserLibrariesCreat
         """
         return await self.set(ids=ids, status=status)
     
-    async def page_sys_user_libraries_crud(self, offset: int, limit: int, order_by: list[dict] | None = None, search: dict | None = None, preload: list | None = None) -> dict:
+    async def page_sys_user_libraries_crud(self, offset: int, limit: int, order_by: list[dict] | None = None, search: dict | None = None, preload: list | None = None, cursor: str | None = None, with_total: bool = True) -> dict:
         """
         分页查询
         
@@ -107,6 +107,8 @@ class SysUserLibrariesCRUD(CRUDBase[SysUserLibrariesModel, SysUserLibrariesCreat
         - order_by (list[dict] | None): 排序参数，未提供时使用模型默认项
         - search (dict | None): 查询参数，未提供时查询所有
         - preload (list | None): 预加载关系，未提供时使用模型默认项
+        - cursor (str | None): 游标分页标识，None 时使用偏移分页
+        - with_total (bool): 游标分页时是否统计总数
         
         返回:
         - Dict: 分页数据
@@ -119,5 +121,7 @@ class SysUserLibrariesCRUD(CRUDBase[SysUserLibrariesModel, SysUserLibrariesCreat
             order_by=order_by_list,
             search=search_dict,
             out_schema=SysUserLibrariesOutSchema,
-            preload=preload
+            preload=preload,
+            cursor=cursor,
+            with_total=with_total
         )
\ No newline at end of file
@@ -68,8 +68,8 @@ class CacheService:
         返回:
         - list: 缓存键名列表信息。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'{cache_name}*')
-        cache_key_list = [key.split(':', 1)[1] for key in cache_keys if key.startswith(f'{cache_name}:')]
+        cache_keys = await RedisCURD(redis).get_keys(f'{cache_name}:*')
+        cache_key_list = [key.split(':', 1)[1] for key in cache_keys]
 
         return cache_key_list
 
@@ -102,9 +102,7 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'{cache_name}*')
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        await RedisCURD(redis).clear(f'{cache_name}*')
 
         return True
 
@@ -120,9 +118,7 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'*{cache_key}')
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        await RedisCURD(redis).clear(f'*{cache_key}')
 
         return True
 
@@ -137,11 +133,7 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys()
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        # SCAN 增量遍历 + 分块 UNLINK，避免 KEYS/DEL 阻塞 Redis
+        await RedisCURD(redis).clear()
 
         return True
-
-        # 避免清除所有的缓存，而采用上面的方式，只清除本系统内指定的所有缓存
-        # return await RedisCURD(redis).clear()
@@ -4,7 +4,6 @@ from fastapi import APIRouter, Body, Depends
 from fastapi.responses import JSONResponse
 from redis.asyncio.client import Redis
 
-from app.common.request import PaginationService
 from app.common.response import SuccessResponse,ErrorResponse
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_params import PaginationQueryParam
@@ -40,8 +39,7 @@ async def get_online_list_controller(
     返回:
     - JSONResponse: 包含在线用户列表的JSON响应。
     """
-    result_dict_list = await OnlineService.get_online_list_service(redis=redis, search=search)
-    result_dict = await PaginationService.paginate(data_list= result_dict_list, page_no= paging_query.page_no, page_size = paging_query.page_size)
+    result_dict = await OnlineService.get_online_list_service(redis=redis, page_no=paging_query.page_no, page_size=paging_query.page_size, search=search)
     log.info('获取成功')
 
     return SuccessResponse(data=result_dict,msg='获取成功')
@@ -30,12 +30,14 @@ class OnlineQueryParam:
 
     def __init__(
         self,
-        name: str | None = Query(None, description="登录名称"), 
+        name: str | None = Query(None, description="登录名称(用户名)"), 
         ipaddr: str | None = Query(None, description="登陆IP地址"),
         login_location: str | None = Query(None, description="登录所属地"),
     ) -> None:
         
+        # 精确查询字段(走在线会话索引)
+        self.name = name.strip() if name and name.strip() else None
+        self.ipaddr = ipaddr.strip() if ipaddr and ipaddr.strip() else None
+
         # 模糊查询字段
-        self.name = ("like", f"%{name}%") if name else None
         self.login_location = ("like", f"%{login_location}%") if login_location else None
-        self.ipaddr = ("like", f"%{ipaddr}%") if ipaddr else None
@@ -1,120 +1,343 @@
 # -*- coding: utf-8 -*-
 
-import json
-from redis.asyncio.client import Redis
+import time
+from datetime import datetime
+from typing import Any
+from redis.asyncio.client import Pipeline, Redis
 
 from app.common.enums import RedisInitKeyConfig
 from app.core.redis_crud import RedisCURD
+from app.core.exceptions import CustomException
 from app.core.security import decode_access_token
 from app.core.logger import log
 
-from .schema import OnlineQueryParam
+from .schema import OnlineOutSchema, OnlineQueryParam
+
+
+class OnlineSessionRegistry:
+    """
+    在线会话索引
+
+    登录时写入，在线列表直接分页读取，无需遍历并解码所有访问令牌:
+    - online_session:login          ZSET 会话ID -> 登录时间戳(列表排序、分页、计数)
+    - online_session:expire         ZSET 会话ID -> 访问令牌过期时间戳(清理过期会话)
+    - online_session:info:{会话ID}   HASH 会话信息
+    - online_session:user:{用户名}   SET  用户名 -> 会话ID
+    - online_session:ip:{IP}        SET  IP -> 会话ID
+    """
+
+    KEY: str = RedisInitKeyConfig.ONLINE_SESSION.key
+    LOGIN_INDEX: str = f"{KEY}:login"
+    EXPIRE_INDEX: str = f"{KEY}:expire"
+    BUILT_FLAG: str = f"{KEY}:built"
+    FILTER_BATCH: int = 1000
+    # 会话信息比索引多保留一段时间，便于清理过期会话时找到其用户名/IP索引
+    INFO_GRACE: int = 3600
+
+    @classmethod
+    def info_key(cls, session_id: str) -> str:
+        return f"{cls.KEY}:info:{session_id}"
+
+    @classmethod
+    def user_key(cls, username: str) -> str:
+        return f"{cls.KEY}:user:{username}"
+
+    @classmethod
+    def ip_key(cls, ip: str) -> str:
+        return f"{cls.KEY}:ip:{ip}"
+
+    @classmethod
+    async def register(cls, redis: Redis, session: OnlineOutSchema, expire: int, pipe: Pipeline | None = None) -> None:
+        """
+        登记在线会话
+
+        参数:
+        - redis (Redis): Redis 连接
+        - session (OnlineOutSchema): 会话信息
+        - expire (int): 访问令牌有效期(秒)
+        - pipe (Pipeline | None): 调用方的管道，传入时只排队命令，与令牌写入合并为一次往返
+        """
+        if pipe is None:
+            async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+                await cls.register(redis, session, expire, pipe=pipe)
+            return
+        now = time.time()
+        info = {key: "" if value is None else str(value) for key, value in session.model_dump(mode="json").items()}
+        login_score = session.login_time.timestamp() if session.login_time else now
+        pipe.hset(cls.info_key(session.session_id), mapping=info)
+        pipe.expire(cls.info_key(session.session_id), expire + cls.INFO_GRACE)
+        pipe.zadd(cls.LOGIN_INDEX, {session.session_id: login_score})
+        pipe.zadd(cls.EXPIRE_INDEX, {session.session_id: now + expire})
+        pipe.sadd(cls.user_key(session.user_name), session.session_id)
+        pipe.expire(cls.user_key(session.user_name), expire + cls.INFO_GRACE)
+        if session.ipaddr:
+            pipe.sadd(cls.ip_key(session.ipaddr), session.session_id)
+            pipe.expire(cls.ip_key(session.ipaddr), expire + cls.INFO_GRACE)
+
+    @classmethod
+    async def touch(cls, redis: Redis, session_id: str, expire: int, pipe: Pipeline | None = None) -> None:
+        """
+        刷新令牌后延长会话有效期(按会话信息重新写入各索引)
+
+        参数:
+        - redis (Redis): Redis 连接
+        - session_id (str): 会话ID
+        - expire (int): 访问令牌有效期(秒)
+        - pipe (Pipeline | None): 调用方的管道，传入时只排队命令
+        """
+        if pipe is None:
+            async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+                await cls.touch(redis, session_id, expire, pipe=pipe)
+            return
+        # 与登记时相同地重写全部索引，索引被清理或淘汰后也能恢复
+        user_name, ipaddr, login_time = await redis.hmget(cls.info_key(session_id), ["user_name", "ipaddr", "login_time"])
+        if not user_name:
+            return
+        now = time.time()
+        try:
+            login_score = datetime.fromisoformat(login_time).timestamp() if login_time else now
+        except ValueError:
+            login_score = now
+        pipe.expire(cls.info_key(session_id), expire + cls.INFO_GRACE)
+        pipe.zadd(cls.LOGIN_INDEX, {session_id: login_score}, nx=True)
+        pipe.zadd(cls.EXPIRE_INDEX, {session_id: now + expire})
+        pipe.sadd(cls.user_key(user_name), session_id)
+        pipe.expire(cls.user_key(user_name), expire + cls.INFO_GRACE)
+        if ipaddr:
+            pipe.sadd(cls.ip_key(ipaddr), session_id)
+            pipe.expire(cls.ip_key(ipaddr), expire + cls.INFO_GRACE)
+
+    @classmethod
+    async def remove(cls, redis: Redis, session_ids: list[str], pipe: Pipeline | None = None) -> None:
+        """
+        移除会话索引
+
+        参数:
+        - redis (Redis): Redis 连接
+        - session_ids (list[str]): 会话ID列表
+        - pipe (Pipeline | None): 调用方的管道，传入时删除命令只排队(读取会话归属仍需一次往返)
+        """
+        if not session_ids:
+            return
+        if pipe is None:
+            async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+                await cls.remove(redis, session_ids, pipe=pipe)
+            return
+        async with redis.pipeline(transaction=False) as read_pipe:
+            for session_id in session_ids:
+                read_pipe.hmget(cls.info_key(session_id), ["user_name", "ipaddr"])
+            owners = await read_pipe.execute()
+
+        pipe.zrem(cls.LOGIN_INDEX, *session_ids)
+        pipe.zrem(cls.EXPIRE_INDEX, *session_ids)
+        for session_id, (user_name, ipaddr) in zip(session_ids, owners):
+            if user_name:
+                pipe.srem(cls.user_key(user_name), session_id)
+            if ipaddr:
+                pipe.srem(cls.ip_key(ipaddr), session_id)
+            pipe.unlink(cls.info_key(session_id))
+
+    @classmethod
+    async def prune(cls, redis: Redis) -> None:
+        """清理已过期的会话索引"""
+        expired = await redis.zrangebyscore(cls.EXPIRE_INDEX, "-inf", time.time())
+        if expired:
+            await cls.remove(redis, expired)
+
+    @classmethod
+    async def clear(cls, redis: Redis) -> None:
+        """清空全部会话索引(保留重建标记)"""
+        async for keys in RedisCURD(redis).scan_batches(f"{cls.KEY}:*"):
+            keys = [key for key in keys if key != cls.BUILT_FLAG]
+            await RedisCURD(redis).unlink(*keys)
+
+    @classmethod
+    async def rebuild(cls, redis: Redis) -> None:
+        """
+        由现有访问令牌重建索引(仅首次部署时执行一次，由 lifespan 调用)
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        if not await redis.set(cls.BUILT_FLAG, 1, nx=True):
+            return
+        count = 0
+        async for keys in RedisCURD(redis).scan_batches(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*"):
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                    pipe.ttl(key)
+                values = await pipe.execute()
+            async with RedisCURD(redis).pipeline(transaction=False) as pipe:
+                for token, ttl in zip(values[::2], values[1::2]):
+                    if not token or ttl is None or ttl <= 0:
+                        continue
+                    try:
+                        session = OnlineOutSchema.model_validate_json(decode_access_token(token=token).sub)
+                        await cls.register(redis, session, ttl, pipe=pipe)
+                        count += 1
+                    except Exception as e:
+                        log.error(f"重建在线会话索引失败: {e}")
+        log.info(f"在线会话索引重建完成: {count} 个会话")
+
+    @classmethod
+    async def page(cls, redis: Redis, page_no: int, page_size: int, search: OnlineQueryParam | None = None) -> dict[str, Any]:
+        """
+        分页查询在线会话
+
+        参数:
+        - redis (Redis): Redis 连接
+        - page_no (int): 页码
+        - page_size (int): 每页数量
+        - search (OnlineQueryParam | None): 查询参数
+
+        返回:
+        - dict[str, Any]: 分页数据
+        """
+        if page_no < 1 or page_size < 1:
+            raise CustomException(msg="分页参数不合法")
+        await cls.prune(redis)
+
+        start = (page_no - 1) * page_size
+        user_name = search.name if search else None
+        ipaddr = search.ipaddr if search else None
+        location = search.login_location[1].strip('%').lower() if search and search.login_location else None
+
+        if not (user_name or ipaddr or location):
+            # 无筛选：计数与分页均直接基于有序集合
+            total = await redis.zcard(cls.LOGIN_INDEX)
+            session_ids = await redis.zrevrange(cls.LOGIN_INDEX, start, start + page_size - 1)
+        else:
+            if user_name or ipaddr:
+                # 精确条件：用户名/IP 集合求交集得到候选会话，再按登录时间排序
+                sets = [cls.user_key(user_name)] if user_name else []
+                sets += [cls.ip_key(ipaddr)] if ipaddr else []
+                candidates = list(await redis.sinter(sets))
+                async with redis.pipeline(transaction=False) as pipe:
+                    for session_id in candidates:
+                        pipe.zscore(cls.LOGIN_INDEX, session_id)
+                    scores = await pipe.execute()
+                ordered = sorted(
+                    ((sid, score) for sid, score in zip(candidates, scores) if score is not None),
+                    key=lambda item: item[1],
+                    reverse=True,
+                )
+                candidates = [sid for sid, _ in ordered]
+            else:
+                candidates = None
+
+            if location:
+                candidates = await cls._filter_location(redis, candidates, location)
+
+            total = len(candidates)
+            session_ids = candidates[start:start + page_size]
+
+        items = await cls._load(redis, session_ids)
+        return {
+            "items": items,
+            "total": total,
+            "page_no": page_no,
+            "page_size": page_size,
+            "has_next": start + page_size < total,
+        }
+
+    @classmethod
+    async def _filter_location(cls, redis: Redis, candidates: list[str] | None, keyword: str) -> list[str]:
+        """按登录地模糊筛选(只读取 login_location 字段)，candidates 为 None 时按登录时间遍历全部"""
+        matched = []
+        offset = 0
+        while True:
+            if candidates is None:
+                batch = await redis.zrevrange(cls.LOGIN_INDEX, offset, offset + cls.FILTER_BATCH - 1)
+            else:
+                batch = candidates[offset:offset + cls.FILTER_BATCH]
+            if not batch:
+                break
+            async with redis.pipeline(transaction=False) as pipe:
+                for session_id in batch:
+                    pipe.hget(cls.info_key(session_id), "login_location")
+                locations = await pipe.execute()
+            matched.extend(sid for sid, loc in zip(batch, locations) if loc and keyword in loc.lower())
+            offset += cls.FILTER_BATCH
+        return matched
+
+    @classmethod
+    async def _load(cls, redis: Redis, session_ids: list[str]) -> list[dict]:
+        """批量读取会话信息"""
+        if not session_ids:
+            return []
+        async with redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hgetall(cls.info_key(session_id))
+            infos = await pipe.execute()
+        items = []
+        for info in infos:
+            if not info:
+                continue
+            item = {key: value or None for key, value in info.items()}
+            item["user_id"] = int(item["user_id"]) if item.get("user_id") else None
+            items.append(item)
+        return items
 
 
 class OnlineService:
     """在线用户管理模块服务层"""
 
     @classmethod
-    async def get_online_list_service(cls, redis: Redis, search: OnlineQueryParam | None = None) ->  list[dict]:
+    async def get_online_list_service(cls, redis: Redis, page_no: int, page_size: int, search: OnlineQueryParam | None = None) -> dict:
         """
         获取在线用户列表信息（支持分页和搜索）
-        
+
         参数:
         - redis (Redis): Redis异步客户端实例。
+        - page_no (int): 页码。
+        - page_size (int): 每页数量。
         - search (OnlineQueryParam | None): 查询参数模型。
-        
+
         返回:
-        - list[dict]: 在线用户详情字典列表。
+        - dict: 在线用户分页数据，按登录时间倒序。
         """
-
-        keys = await RedisCURD(redis).get_keys(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
-        tokens = await RedisCURD(redis).mget(keys)
-
-        online_users = []
-        for token in tokens:
-            if not token:
-                continue
-            try:
-                payload = decode_access_token(token=token)
-                session_info = json.loads(payload.sub)  
-                if cls._match_search_conditions(session_info, search):
-                    online_users.append(session_info)
-            except Exception as e:
-                log.error(f"解析在线用户数据失败: {e}")
-                continue
-        # 按照 login_time 倒序排序
-        online_users.sort(key=lambda x: x.get('login_time', ''), reverse=True)
-        
-        return online_users
+        return await OnlineSessionRegistry.page(redis=redis, page_no=page_no, page_size=page_size, search=search)
 
 
     @classmethod
     async def delete_online_service(cls, redis: Redis, session_id: str) -> bool:
         """
         强制下线指定在线用户
-        
+
         参数:
         - redis (Redis): Redis异步客户端实例。
         - session_id (str): 在线用户会话ID。
-        
+
         返回:
         - bool: 如果操作成功则返回True，否则返回False。
         """
-        # 删除 token
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-
+        # 删除 token 与会话索引(一次提交)
+        async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+            await RedisCURD(redis).mdelete(
+                [f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}", f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}"],
+                pipe=pipe,
+            )
+            await OnlineSessionRegistry.remove(redis=redis, session_ids=[session_id], pipe=pipe)
 
         log.info(f"强制下线用户会话: {session_id}")
         return True
-    
+
     @classmethod
     async def clear_online_service(cls, redis: Redis) -> bool:
         """
         强制下线所有在线用户
-        
+
         参数:
         - redis (Redis): Redis异步客户端实例。
-        
+
         返回:
         - bool: 如果操作成功则返回True，否则返回False。
         """
         # 删除 token
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:*")
+        await OnlineSessionRegistry.clear(redis=redis)
 
         log.info(f"清除所有在线用户会话成功")
         return True
-
-    
-    @staticmethod
-    def _match_search_conditions(online_info: dict, search: OnlineQueryParam | None = None) -> bool:
-        """
-        检查是否匹配搜索条件
-        
-        参数:
-        - online_info (dict): 在线用户信息字典。
-        - search (OnlineQueryParam | None): 查询参数模型。
-        
-        返回:
-        - bool: 如果匹配则返回True，否则返回False。
-        """
-        if not search:
-            return True
-
-        if search.name and search.name[1]:
-            keyword = search.name[1].strip('%')
-            if keyword.lower() not in online_info.get("name", "").lower():
-                return False
-
-        if search.ipaddr and search.ipaddr[1]:
-            keyword = search.ipaddr[1].strip('%')
-            if keyword not in online_info.get("ipaddr", ""):
-                return False
-
-        if search.login_location and search.login_location[1]:
-            keyword = search.login_location[1].strip('%')
-            if keyword.lower() not in online_info.get("login_location", "").lower():
-                return False
-
-        return True
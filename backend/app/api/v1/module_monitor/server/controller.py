@@ -31,3 +31,21 @@ async def get_monitor_server_info_controller() -> JSONResponse:
     log.info(f'获取服务器监控信息成功: {result_dict}')
 
     return SuccessResponse(data=result_dict, msg='获取服务器监控信息成功')
+
+@ServerRouter.get(
+    '/runtime',
+    summary="查询运行时统计",
+    description="查询当前进程的响应压缩、任务执行日志写入等运行时统计",
+    dependencies=[Depends(AuthPermission(["module_monitor:server:query"]))]
+)
+async def get_monitor_runtime_stats_controller() -> JSONResponse:
+    """
+    查询运行时统计
+    
+    返回:
+    - JSONResponse: 包含运行时统计的JSON响应。
+    """
+    result_dict = await ServerService.get_runtime_stats_service()
+    log.info(f'获取运行时统计成功: {result_dict}')
+
+    return SuccessResponse(data=result_dict, msg='获取运行时统计成功')
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import os
 import platform
 import psutil
 import socket
 import time
 from pathlib import Path
 
+from app.core.middlewares import CompressionMiddleware
 from app.utils.common_util import bytes2human
+from app.api.v1.module_application.job.tools.job_log_writer import JobLogWriter
 
 from .schema import (
     CpuInfoSchema,
@@ -37,6 +40,20 @@ class ServerService:
             disks=cls._get_disk_info()
         ).model_dump()
 
+    @classmethod
+    async def get_runtime_stats_service(cls) -> dict:
+        """
+        获取当前进程的运行时统计(各统计均为进程内累计值，多 worker 时仅反映处理本次请求的 worker)
+        
+        返回:
+        - dict: 包含响应压缩统计、任务执行日志写入统计的字典。
+        """
+        return {
+            "pid": os.getpid(),
+            "compression": CompressionMiddleware.stats(),
+            "job_log": JobLogWriter.stats(),
+        }
+
     @classmethod
     def _get_cpu_info(cls) -> CpuInfoSchema:
         """
@@ -25,6 +25,7 @@ from app.core.security import (
 )
 
 from app.api.v1.module_monitor.online.schema import OnlineOutSchema
+from app.api.v1.module_monitor.online.service import OnlineSessionRegistry
 from ..user.crud import UserCRUD
 from ..user.model import UserModel
 from .schema import (
@@ -76,14 +77,16 @@ class LoginService:
         if not user:
             raise CustomException(msg="用户不存在")
 
-        if not PwdUtil.verify_password(plain_password=login_form.password, password_hash=user.password):
+        # 密码校验在进程池中执行，哈希轮数低于当前策略时同时生成新哈希
+        verified, new_password_hash = await PwdUtil.verify_and_update_async(plain_password=login_form.password, password_hash=user.password)
+        if not verified:
             raise CustomException(msg="账号或密码错误")
 
         if not user.status:
             raise CustomException(msg="用户已被停用")
         
-        # 更新最后登录时间
-        user = await UserCRUD(auth).update_last_login_crud(id=user.id)
+        # 更新最后登录时间(并透明升级密码哈希)
+        user = await UserCRUD(auth).update_last_login_crud(id=user.id, password_hash=new_password_hash)
         if not user:
             raise CustomException(msg="用户不存在")
         if not login_form.login_type:
@@ -143,7 +146,7 @@ class LoginService:
         log.info(f"用户ID: {user.id}, 用户名: {user.username} 正在生成JWT令牌")
         
         # 生成会话信息
-        session_info=OnlineOutSchema(
+        session=OnlineOutSchema(
             session_id=session_id,
             user_id=user.id, 
             name=user.name,
@@ -154,7 +157,8 @@ class LoginService:
             browser = user_agent.browser.family,
             login_time=user.last_login,
             login_type=login_type
-        ).model_dump_json()
+        )
+        session_info = session.model_dump_json()
 
         access_token = create_access_token(payload=JWTPayloadSchema(
             sub=session_info,
@@ -167,18 +171,16 @@ class LoginService:
             exp=now + refresh_expires,
         ))
 
-        # 设置新的token
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-            value=access_token,
-            expire=int(access_expires.total_seconds())
-        )
-
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}',
-            value=refresh_token,
-            expire=int(refresh_expires.total_seconds())
-        )
+        # 设置新的token并登记在线会话索引(一次往返)
+        access_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
+        refresh_key = f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}'
+        async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+            await RedisCURD(redis).mset(
+                {access_key: access_token, refresh_key: refresh_token},
+                expire={access_key: int(access_expires.total_seconds()), refresh_key: int(refresh_expires.total_seconds())},
+                pipe=pipe,
+            )
+            await OnlineSessionRegistry.register(redis=redis, session=session, expire=int(access_expires.total_seconds()), pipe=pipe)
 
         return JWTOutSchema(
             access_token=access_token,
@@ -244,18 +246,16 @@ class LoginService:
             exp=now + refresh_expires
         ))
         
-        # 覆盖写入 Redis
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-            value=access_token,
-            expire=int(access_expires.total_seconds())
-        )
-
-        await RedisCURD(redis).set(
-            key=f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}',
-            value=refresh_token_new,
-            expire=int(refresh_expires.total_seconds())
-        )
+        # 覆盖写入 Redis 并延长会话索引(一次往返)
+        access_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
+        refresh_key = f'{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}'
+        async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+            await RedisCURD(redis).mset(
+                {access_key: access_token, refresh_key: refresh_token_new},
+                expire={access_key: int(access_expires.total_seconds()), refresh_key: int(refresh_expires.total_seconds())},
+                pipe=pipe,
+            )
+            await OnlineSessionRegistry.touch(redis=redis, session_id=session_id, expire=int(access_expires.total_seconds()), pipe=pipe)
         
         return JWTOutSchema(
             access_token=access_token,
@@ -287,8 +287,12 @@ class LoginService:
             raise CustomException(msg="非法凭证,无法获取会话编号")
 
         # 删除Redis中的在线用户、访问令牌、刷新令牌
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
+        async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+            await RedisCURD(redis).mdelete(
+                [f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}", f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}"],
+                pipe=pipe,
+            )
+            await OnlineSessionRegistry.remove(redis=redis, session_ids=[session_id], pipe=pipe)
         
         log.info(f"用户退出登录成功,会话编号:{session_id}")
 
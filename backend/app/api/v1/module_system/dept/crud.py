@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from typing import Sequence
+from sqlalchemy import delete, insert, select
 
 from app.core.base_crud import CRUDBase
+from app.core.exceptions import CustomException
 
 from ..auth.schema import AuthSchema
-from .model import DeptModel
+from .model import DeptModel, DeptClosureModel
 from .schema import DeptCreateSchema, DeptUpdateSchema
 
 
@@ -85,4 +87,157 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
         - str | None: 部门名称，未找到返回 None。
         """
         obj = await self.get(id=id)
-        return obj.name if obj else None
\ No newline at end of file
+        return obj.name if obj else None
+
+    async def get_descendant_ids_crud(self, ids: list[int], include_self: bool = True) -> list[int]:
+        """
+        通过闭包表获取部门的全部下级部门ID。
+        
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+        - include_self (bool): 是否包含自身。
+        
+        返回:
+        - list[int]: 下级部门 ID 列表（去重）。
+        """
+        sql = select(DeptClosureModel.descendant_id).where(DeptClosureModel.ancestor_id.in_(ids))
+        if not include_self:
+            sql = sql.where(DeptClosureModel.depth > 0)
+        result = await self.auth.db.execute(sql.distinct())
+        return list(result.scalars().all())
+
+    async def get_ancestor_ids_crud(self, ids: list[int], include_self: bool = True) -> list[int]:
+        """
+        通过闭包表获取部门的全部上级部门ID。
+        
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+        - include_self (bool): 是否包含自身。
+        
+        返回:
+        - list[int]: 上级部门 ID 列表（去重）。
+        """
+        sql = select(DeptClosureModel.ancestor_id).where(DeptClosureModel.descendant_id.in_(ids))
+        if not include_self:
+            sql = sql.where(DeptClosureModel.depth > 0)
+        result = await self.auth.db.execute(sql.distinct())
+        return list(result.scalars().all())
+
+    async def insert_closure_crud(self, id: int, parent_id: int | None) -> None:
+        """
+        新增部门后写入闭包关系：自身一行，加上父部门每个祖先到新部门的一行。
+        
+        参数:
+        - id (int): 新部门 ID。
+        - parent_id (int | None): 父部门 ID。
+        
+        返回:
+        - None
+        """
+        rows = [{"ancestor_id": id, "descendant_id": id, "depth": 0}]
+        if parent_id:
+            result = await self.auth.db.execute(
+                select(DeptClosureModel.ancestor_id, DeptClosureModel.depth).where(DeptClosureModel.descendant_id == parent_id)
+            )
+            rows.extend({"ancestor_id": ancestor_id, "descendant_id": id, "depth": depth + 1} for ancestor_id, depth in result.all())
+        await self.auth.db.execute(insert(DeptClosureModel), rows)
+
+    async def move_closure_crud(self, id: int, parent_id: int | None) -> None:
+        """
+        部门变更上级后迁移整棵子树的闭包关系。
+        
+        参数:
+        - id (int): 被移动的部门 ID。
+        - parent_id (int | None): 新的父部门 ID。
+        
+        返回:
+        - None
+        
+        异常:
+        - CustomException: 新上级为自身或其下级部门时抛出。
+        """
+        result = await self.auth.db.execute(
+            select(DeptClosureModel.descendant_id, DeptClosureModel.depth).where(DeptClosureModel.ancestor_id == id)
+        )
+        subtree = result.all()
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        if parent_id is not None and parent_id in subtree_ids:
+            raise CustomException(msg='上级部门不能为自身或下级部门')
+
+        # 断开子树与原祖先之间的关系（保留子树内部关系）
+        old_ancestor_ids = await self.get_ancestor_ids_crud(ids=[id], include_self=False)
+        if old_ancestor_ids:
+            await self.auth.db.execute(
+                delete(DeptClosureModel).where(
+                    DeptClosureModel.ancestor_id.in_(old_ancestor_ids),
+                    DeptClosureModel.descendant_id.in_(subtree_ids)
+                )
+            )
+
+        # 新祖先 × 子树节点 笛卡尔积
+        if parent_id:
+            result = await self.auth.db.execute(
+                select(DeptClosureModel.ancestor_id, DeptClosureModel.depth).where(DeptClosureModel.descendant_id == parent_id)
+            )
+            rows = [
+                {"ancestor_id": ancestor_id, "descendant_id": descendant_id, "depth": ancestor_depth + depth + 1}
+                for ancestor_id, ancestor_depth in result.all()
+                for descendant_id, depth in subtree
+            ]
+            if rows:
+                await self.auth.db.execute(insert(DeptClosureModel), rows)
+
+    async def delete_closure_crud(self, ids: list[int]) -> None:
+        """
+        删除部门的闭包关系（不依赖数据库外键级联）。
+        
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+        
+        返回:
+        - None
+        """
+        await self.auth.db.execute(
+            delete(DeptClosureModel).where(
+                (DeptClosureModel.ancestor_id.in_(ids)) | (DeptClosureModel.descendant_id.in_(ids))
+            )
+        )
+
+    async def rebuild_closure_crud(self, force: bool = False) -> bool:
+        """
+        根据 parent_id 重建闭包表。
+        
+        非强制模式下按 parent_id 计算应有的闭包关系并与闭包表现有内容逐行比较，
+        不一致时(首次部署、历史数据迁移或部门移动后祖先路径损坏)才重建。
+        
+        参数:
+        - force (bool): 是否强制重建。
+        
+        返回:
+        - bool: 是否执行了重建。
+        """
+        result = await self.auth.db.execute(select(DeptModel.id, DeptModel.parent_id))
+        parent_map = {id: parent_id for id, parent_id in result.all()}
+
+        # 迭代向上遍历，避免深层级递归
+        rows = []
+        for id in parent_map:
+            ancestor_id, depth, visited = id, 0, set()
+            while ancestor_id is not None and ancestor_id in parent_map and ancestor_id not in visited:
+                visited.add(ancestor_id)
+                rows.append({"ancestor_id": ancestor_id, "descendant_id": id, "depth": depth})
+                ancestor_id, depth = parent_map[ancestor_id], depth + 1
+
+        if not force:
+            existing = await self.auth.db.execute(
+                select(DeptClosureModel.ancestor_id, DeptClosureModel.descendant_id, DeptClosureModel.depth)
+            )
+            expected = {(row["ancestor_id"], row["descendant_id"], row["depth"]) for row in rows}
+            if set(existing.tuples().all()) == expected:
+                return False
+
+        await self.auth.db.execute(delete(DeptClosureModel))
+        if rows:
+            await self.auth.db.execute(insert(DeptClosureModel), rows)
+        await self.auth.db.flush()
+        return True
@@ -4,13 +4,39 @@ from typing import TYPE_CHECKING
 from sqlalchemy import String, Integer, ForeignKey
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
-from app.core.base_model import ModelMixin, UserMixin
+from app.core.base_model import MappedBase, ModelMixin, UserMixin
 
 if TYPE_CHECKING:
     from app.api.v1.module_system.role.model import RoleModel
     from app.api.v1.module_system.user.model import UserModel
 
 
+class DeptClosureModel(MappedBase):
+    """
+    部门闭包表
+    
+    物化部门树的祖先-后代关系(含自身, depth=0)，用于数据权限按子树过滤，
+    避免在应用层递归展开部门ID列表
+    """
+    __tablename__: str = "sys_dept_closure"
+    __table_args__: dict[str, str] = ({'comment': '部门闭包表'})
+
+    ancestor_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sys_dept.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        comment="祖先部门ID"
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sys_dept.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        index=True,
+        comment="后代部门ID"
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="层级距离(0:自身)")
+
+
 class DeptModel(ModelMixin, UserMixin):
     """
     部门模型
@@ -2,13 +2,10 @@
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_parent_id_map,
-    get_parent_recursion,
-    get_child_id_map,
-    get_child_recursion,
-    traversal_to_tree
-)
+from app.core.auth_cache import AuthUserCache
+from app.core.permission import DataScopeCache
+from app.core.service_cache import cached
+from app.utils.common_util import traversal_to_tree
 
 from ..auth.schema import AuthSchema
 from .crud import DeptCRUD
@@ -46,6 +43,7 @@ class DeptService:
         return result
 
     @classmethod
+    @cached(key="tree:{auth}:{search}:{order_by}", tags=("sys_dept", "sys_role", "sys_user"))
     async def get_dept_tree_service(cls, auth: AuthSchema, search: DeptQueryParam | None= None, order_by: list[dict] | None = None) -> list[dict]:
         """
         获取部门树形列表。
@@ -87,6 +85,9 @@ class DeptService:
         if obj:
             raise CustomException(msg='创建失败，编码已存在')
         dept = await DeptCRUD(auth).create(data=data)
+        await DeptCRUD(auth).insert_closure_crud(id=dept.id, parent_id=dept.parent_id)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
@@ -111,7 +112,12 @@ class DeptService:
         exist_dept = await DeptCRUD(auth).get(name=data.name)
         if exist_dept and exist_dept.id != id:
             raise CustomException(msg='更新失败，部门名称重复')
+        # 上级部门变更时先迁移闭包关系（同时校验不能移动到自身或下级部门之下）
+        if 'parent_id' in data.model_fields_set and (data.parent_id or None) != dept.parent_id:
+            await DeptCRUD(auth).move_closure_crud(id=id, parent_id=data.parent_id or None)
         dept = await DeptCRUD(auth).update(id=id, data=data)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
@@ -136,13 +142,14 @@ class DeptService:
             if not dept:
                 raise CustomException(msg='删除失败，该部门不存在')
         # 校验是否存在子级部门，存在则禁止删除
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        id_map = get_child_id_map(model_list=dept_list)
         for id in ids:
-            descendants = get_child_recursion(id=id, id_map=id_map)
-            if len(descendants) > 1:
+            descendants = await DeptCRUD(auth).get_descendant_ids_crud(ids=[id], include_self=False)
+            if descendants:
                 raise CustomException(msg='删除失败，存在子级部门，请先删除子级部门')
+        await DeptCRUD(auth).delete_closure_crud(ids=ids)
         await DeptCRUD(auth).delete(ids=ids)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def batch_set_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -156,18 +163,12 @@ class DeptService:
         返回:
         - None
         """
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        total_ids = []
-        
+        # 启用时连带启用所有上级部门，停用时连带停用所有下级部门（基于闭包表）
         if data.status:
-            id_map = get_parent_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                enable_ids = get_parent_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(enable_ids)
+            total_ids = await DeptCRUD(auth).get_ancestor_ids_crud(ids=data.ids)
         else:
-            id_map = get_child_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                disable_ids = get_child_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+            total_ids = await DeptCRUD(auth).get_descendant_ids_crud(ids=data.ids)
 
-        await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
\ No newline at end of file
@@ -8,6 +8,7 @@ from app.utils.excel_util import ExcelUtil
 from app.core.database import async_db_session
 from app.core.base_schema import BatchSetAvailable
 from app.core.redis_crud import RedisCURD
+from app.core.service_cache import cached
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -147,12 +148,12 @@ class DictTypeService:
             # 获取当前字典类型的所有字典数据，确保包含最新状态
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
             dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-            
-            value = json.dumps(dict_data, ensure_ascii=False)
-            await RedisCURD(redis).set(
-                    key=redis_key,
-                    value=value,
-                )
+            # 类型编码变更时同时移除旧键，写入与删除在一次往返内完成
+            async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+                if exist_obj.dict_type != data.dict_type:
+                    await RedisCURD(redis).mdelete([f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{exist_obj.dict_type}"], pipe=pipe)
+                if not await RedisCURD(redis).mset({redis_key: dict_data}, pipe=pipe):
+                    raise CustomException(msg="序列化字典数据失败")
             log.info(f"更新字典类型成功并刷新缓存: {new_obj_dict}")
         except Exception as e:
             log.error(f"更新字典类型缓存失败: {e}")
@@ -301,18 +302,14 @@ class DictDataService:
                     success_count = 0
                     fail_count = 0
                     
+                    # 先汇总所有字典类型的数据，最后一次往返批量写入Redis
+                    cache_items = {}
                     for obj in obj_list:
                         dict_type = obj.dict_type
                         try:
                             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type})
                             dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-                            # 保存到Redis并设置过期时间
-                            redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
-                            value = json.dumps(dict_data, ensure_ascii=False)
-                            await RedisCURD(redis).set(
-                                    key=redis_key,
-                                    value=value,
-                            )
+                            cache_items[f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"] = dict_data
                             success_count += 1
                             log.info(f"✅ 字典数据缓存成功: {dict_type}")
                             
@@ -321,6 +318,9 @@ class DictDataService:
                             log.error(f"❌ 初始化字典数据失败 [{dict_type}]: {e}")
                             # 继续处理其他字典类型，不中断整个初始化过程
                     
+                    if not await RedisCURD(redis).mset(cache_items):
+                        raise CustomException(msg="字典数据写入缓存失败")
+                    
                     log.info(f"字典数据初始化完成 - 成功: {success_count}, 失败: {fail_count}")
                     
         except Exception as e:
@@ -329,6 +329,7 @@ class DictDataService:
             raise CustomException(msg=f"字典数据初始化失败: {str(e)}")
     
     @classmethod
+    @cached(key="{dict_type}", tags=("sys_dict_data", "sys_dict_type"), l2=False)
     async def get_init_dict_service(cls, redis: Redis, dict_type: str)->list[dict]:
         """
         从缓存获取字典数据列表信息service
@@ -344,19 +345,20 @@ class DictDataService:
             redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
             obj_list_dict = await RedisCURD(redis).get(redis_key)
             
-            # 确保返回数据正确序列化
+            # 确保返回数据正确序列化(RedisCURD 已解码为列表，字符串为旧版 JSON 缓存)
+            if isinstance(obj_list_dict, list):
+                return obj_list_dict
             if obj_list_dict:
-                if isinstance(obj_list_dict, str):
-                    try:
-                        return json.loads(obj_list_dict)
-                    except json.JSONDecodeError:
-                        log.warning(f"字典数据反序列化失败，尝试重新初始化缓存: {dict_type}")
-                elif isinstance(obj_list_dict, list):
-                    return obj_list_dict
+                try:
+                    return json.loads(obj_list_dict)
+                except json.JSONDecodeError:
+                    log.warning(f"字典数据反序列化失败，尝试重新初始化缓存: {dict_type}")
                 
             # 缓存不存在或格式错误时重新初始化
             await cls.init_dict_service(redis)
             obj_list_dict = await RedisCURD(redis).get(redis_key)
+            if isinstance(obj_list_dict, list):
+                return obj_list_dict
             if not obj_list_dict:
                 raise CustomException(msg="数据字典不存在")
             
@@ -403,11 +405,9 @@ class DictDataService:
             # 获取当前字典类型的所有字典数据
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
             dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-            
-            value = json.dumps(dict_data, ensure_ascii=False)
             await RedisCURD(redis).set(
                     key=redis_key,
-                    value=value,
+                    value=dict_data,
                 )
             log.info(f"创建字典数据写入缓存成功: {obj}")
         except Exception as e:
@@ -454,10 +454,9 @@ class DictDataService:
                 try:
                     dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type.dict_type})
                     dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-                    value = json.dumps(dict_data, ensure_ascii=False)
                     await RedisCURD(redis).set(
                             key=redis_key,
-                            value=value,
+                            value=dict_data,
                         )
                 except Exception as e:
                     log.error(f"更新字典数据类型变更时刷新旧缓存失败: {e}")
@@ -468,11 +467,9 @@ class DictDataService:
             # 获取当前字典类型的所有字典数据
             dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': data.dict_type})
             dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-            
-            value = json.dumps(dict_data, ensure_ascii=False)
             await RedisCURD(redis).set(
                     key=redis_key,
-                    value=value,
+                    value=dict_data,
                 )
             log.info(f"更新字典数据写入缓存成功: {obj}")
         except Exception as e:
@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from typing import Literal
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.common.request import PaginationService
 from app.common.response import SuccessResponse, StreamResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil
 from app.core.dependencies import AuthPermission
 from app.core.base_params import PaginationQueryParam
 from app.core.logger import log
@@ -39,8 +39,15 @@ async def get_obj_list_controller(
     order_by = [{"created_time": "desc"}]
     if page.order_by:
         order_by = page.order_by
-    result_dict_list = await OperationLogService.get_log_list_service(search=search, auth=auth, order_by=order_by)
-    result_dict = await PaginationService.paginate(data_list= result_dict_list, page_no= page.page_no, page_size = page.page_size)
+    result_dict = await OperationLogService.get_log_page_service(
+        auth=auth,
+        page_no=page.page_no,
+        page_size=page.page_size,
+        search=search,
+        order_by=order_by,
+        cursor=page.cursor,
+        with_total=page.with_total
+    )
     log.info(f"查询日志成功")
     return SuccessResponse(data=result_dict, msg="查询日志成功")
 
@@ -88,6 +95,7 @@ async def delete_obj_log_controller(
 @LogRouter.post("/export", summary="导出日志", description="导出日志")
 async def export_obj_list_controller(
     search: OperationLogQueryParam = Depends(),
+    file_format: Literal['xlsx', 'csv'] = Query('xlsx', description="导出格式(xlsx/csv)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:log:export"]))
 ) -> StreamingResponse:
     """ 
@@ -95,19 +103,19 @@ async def export_obj_list_controller(
     
     参数:
     - search (OperationLogQueryParam): 日志查询参数模型
+    - file_format (Literal['xlsx', 'csv']): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出日志的流式响应模型
     """
-    operation_log_list = await OperationLogService.get_log_list_service(search=search, auth=auth)
-    operation_log_export_result = await OperationLogService.export_log_list_service(operation_log_list=operation_log_list)
+    operation_log_export_result = await OperationLogService.stream_export_log_service(search=search, auth=auth, file_format=file_format)
     log.info('导出日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(operation_log_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=operation_log_export_result,
+        media_type=ExcelUtil.MEDIA_TYPES[file_format],
         headers = {
-            'Content-Disposition': 'attachment; filename=log.xlsx'
+            'Content-Disposition': f'attachment; filename=log.{file_format}'
         }
     )
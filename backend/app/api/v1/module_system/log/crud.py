@@ -6,7 +6,7 @@ from app.core.base_crud import CRUDBase
 
 from ..auth.schema import AuthSchema
 from .model import OperationLogModel
-from .schema import OperationLogCreateSchema
+from .schema import OperationLogCreateSchema, OperationLogOutSchema
 
 
 class OperationLogCRUD(CRUDBase[OperationLogModel, OperationLogCreateSchema, OperationLogCreateSchema]):
@@ -58,4 +58,31 @@ class OperationLogCRUD(CRUDBase[OperationLogModel, OperationLogCreateSchema, Ope
         返回:
         - Sequence[OperationLogModel]: 操作日志列表。
         """
-        return await self.list(search=search, order_by=order_by, preload=preload)
\ No newline at end of file
+        return await self.list(search=search, order_by=order_by, preload=preload)
+
+    async def get_page_crud(self, offset: int, limit: int, order_by: list | None = None, search: dict | None = None, preload: list | None = None, cursor: str | None = None, with_total: bool = True) -> dict:
+        """
+        分页获取操作日志（数据库分页）。
+        
+        参数:
+        - offset (int): 偏移量。
+        - limit (int): 每页数量。
+        - order_by (List[Dict[str, str]] | None): 排序字段列表。
+        - search (Dict | None): 搜索条件字典。
+        - preload (Optional[List[Union[str, Any]]]): 预加载关系，未提供时使用模型默认项
+        - cursor (str | None): 游标分页标识，None 时使用偏移分页。
+        - with_total (bool): 游标分页时是否统计总数。
+        
+        返回:
+        - dict: 分页数据。
+        """
+        return await self.page(
+            offset=offset,
+            limit=limit,
+            order_by=order_by or [{'created_time': 'desc'}],
+            search=search or {},
+            out_schema=OperationLogOutSchema,
+            preload=preload,
+            cursor=cursor,
+            with_total=with_total
+        )
\ No newline at end of file
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator, Literal
+
+from app.core.database import async_db_session
 from app.core.exceptions import CustomException
 from app.utils.excel_util import ExcelUtil
 
@@ -51,6 +54,32 @@ class OperationLogService:
         log_dict_list = [OperationLogOutSchema.model_validate(log).model_dump() for log in log_list]
         return log_dict_list
 
+    @classmethod
+    async def get_log_page_service(cls, auth: AuthSchema, page_no: int, page_size: int, search: OperationLogQueryParam | None = None, order_by: list | None = None, cursor: str | None = None, with_total: bool = True) -> dict:
+        """
+        分页获取日志列表（数据库分页）
+        
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - page_no (int): 当前页码（游标分页时忽略）
+        - page_size (int): 每页数量
+        - search (OperationLogQueryParam | None): 日志查询参数模型
+        - order_by (list | None): 排序字段列表
+        - cursor (str | None): 游标分页标识，None 时使用偏移分页
+        - with_total (bool): 游标分页时是否统计总数
+        
+        返回:
+        - dict: 分页数据
+        """
+        return await OperationLogCRUD(auth).get_page_crud(
+            offset=(page_no - 1) * page_size,
+            limit=page_size,
+            order_by=order_by,
+            search=search.__dict__ if search else None,
+            cursor=cursor,
+            with_total=with_total
+        )
+
     @classmethod
     async def create_log_service(cls, auth: AuthSchema, data: OperationLogCreateSchema) -> dict:
         """
@@ -83,6 +112,45 @@ class OperationLogService:
             raise CustomException(msg='删除失败，删除对象不能为空')
         await OperationLogCRUD(auth).delete(ids=ids)
 
+    # 操作日志导出字段映射
+    EXPORT_MAPPING = {
+        'id': '编号',
+        'type': '日志类型',
+        'request_path': '请求URL',
+        'request_method': '请求方式',
+        'request_payload': '请求参数',
+        'request_ip': '操作地址',
+        'login_location': '登录位置',
+        'request_os': '操作系统',
+        'request_browser': '浏览器',
+        'response_json': '返回参数',
+        'response_code': '相应状态',
+        'process_time': '处理时间',
+        'description': '备注',
+        'created_time': '创建时间',
+        'updated_time': '更新时间',
+        'created_id': '创建者ID',
+        'updated_id': '更新者ID',
+    }
+
+    @classmethod
+    def __export_row(cls, item: dict) -> dict:
+        """
+        转换导出行的显示值
+
+        参数:
+        - item (dict): 操作日志详情字典
+        
+        返回:
+        - dict: 转换后的字典
+        """
+        # 处理状态
+        item['response_code'] = '成功' if item.get('response_code') == 200 else '失败'
+        # 处理日志类型 - 修正与schema.py保持一致
+        item['type'] = '登录日志' if item.get('type') == 1 else '操作日志'
+        item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+        return item
+
     @classmethod
     async def export_log_list_service(cls, operation_log_list: list[dict]) -> bytes:
         """
@@ -94,34 +162,29 @@ class OperationLogService:
         返回:
         - bytes: 操作日志信息excel的二进制数据
         """
-        # 操作日志字段映射
-        mapping_dict = {
-            'id': '编号',
-            'type': '日志类型',
-            'request_path': '请求URL',
-            'request_method': '请求方式',
-            'request_payload': '请求参数',
-            'request_ip': '操作地址',
-            'login_location': '登录位置',
-            'request_os': '操作系统',
-            'request_browser': '浏览器',
-            'response_json': '返回参数',
-            'response_code': '相应状态',
-            'process_time': '处理时间',
-            'description': '备注',
-            'created_time': '创建时间',
-            'updated_time': '更新时间',
-            'created_id': '创建者ID',
-            'updated_id': '更新者ID',
-        }
-
-        # 处理数据
-        data = operation_log_list.copy()
-        for item in data:
-            # 处理状态
-            item['response_code'] = '成功' if item.get('response_code') == 200 else '失败'
-            # 处理日志类型 - 修正与schema.py保持一致
-            item['type'] = '登录日志' if item.get('type') == 1 else '操作日志'
-            item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
-
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        data = [cls.__export_row(item) for item in operation_log_list]
+        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=cls.EXPORT_MAPPING)
+
+    @classmethod
+    async def stream_export_log_service(cls, auth: AuthSchema, search: OperationLogQueryParam | None = None, order_by: list | None = None, file_format: Literal['xlsx', 'csv'] = 'xlsx') -> AsyncIterator[bytes]:
+        """
+        流式导出日志信息(服务端游标分批读取，内存占用与日志总量无关)
+
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - search (OperationLogQueryParam | None): 日志查询参数模型
+        - order_by (list | None): 排序字段列表
+        - file_format (Literal['xlsx', 'csv']): 导出格式
+        
+        返回:
+        - AsyncIterator[bytes]: 导出文件字节流
+        """
+        async def batches() -> AsyncIterator[list[dict]]:
+            # 请求的数据库会话在响应体发送前已关闭，导出期间使用独立的只读会话
+            async with async_db_session() as db:
+                async with db.begin():
+                    stream_auth = AuthSchema(db=db, user=auth.user, check_data_scope=auth.check_data_scope)
+                    async for objs in OperationLogCRUD(stream_auth).stream(search=search.__dict__ if search else None, order_by=order_by):
+                        yield [cls.__export_row(OperationLogOutSchema.model_validate(obj).model_dump()) for obj in objs]
+
+        return ExcelUtil.stream_export(batches(), mapping_dict=cls.EXPORT_MAPPING, file_format=file_format)
@@ -2,6 +2,8 @@
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
+from app.core.auth_cache import AuthUserCache
+from app.core.service_cache import cached
 from app.utils.common_util import (
     get_parent_id_map,
     get_parent_recursion,
@@ -48,6 +50,7 @@ class MenuService:
         return menu_out.model_dump()
 
     @classmethod
+    @cached(key="tree:{auth}:{search}:{order_by}", tags=("sys_menu", "sys_role", "sys_dept", "sys_user"))
     async def get_menu_tree_service(cls, auth: AuthSchema, search: MenuQueryParam | None = None, order_by: list[dict] | None = None) -> list[dict]:
         """
         获取菜单树形列表。
@@ -113,6 +116,7 @@ class MenuService:
                 raise CustomException(msg='更新失败，父级菜单不存在')
             data.parent_name = parent_menu.name
         new_menu = await MenuCRUD(auth).update(id=id, data=data)
+        await AuthUserCache.invalidate(db=auth.db)
         
         await cls.set_menu_available_service(auth=auth, data=BatchSetAvailable(ids=[id], status=data.status))
         
@@ -145,6 +149,7 @@ class MenuService:
             if len(descendants) > 1:
                 raise CustomException(msg='删除失败，存在子级菜单，请先删除子级菜单')
         await MenuCRUD(auth).delete(ids=ids)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_menu_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -174,4 +179,5 @@ class MenuService:
                 disable_ids = get_child_recursion(id=menu_id, id_map=id_map)
                 total_ids.extend(disable_ids)
 
-        await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        await AuthUserCache.invalidate(db=auth.db)
\ No newline at end of file
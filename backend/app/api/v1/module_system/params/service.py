@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import json
+from typing import Any
 from redis.asyncio.client import Redis
 from fastapi import UploadFile
-from redis.asyncio.client import Redis
 
 from app.common.enums import RedisInitKeyConfig
 from app.core.database import async_db_session
 from app.core.redis_crud import RedisCURD
+from app.core.service_cache import cached
+from app.core.system_config import SystemConfigCache
 from app.utils.excel_util import ExcelUtil
 from app.utils.upload_util import UploadUtil
 from app.core.base_schema import UploadResponseSchema
@@ -56,6 +58,7 @@ class ParamsService:
         return ParamsOutSchema.model_validate(obj).model_dump()
     
     @classmethod
+    @cached(key="value:{auth}:{config_key}", tags=("sys_param",))
     async def get_config_value_by_key_service(cls, auth: AuthSchema, config_key: str) -> str | None:
         """
         根据配置键获取配置值
@@ -125,7 +128,8 @@ class ParamsService:
         except Exception as e:
             log.error(f"创建字典类型失败: {e}")
             raise CustomException(msg=f"创建字典类型失败 {e}")
-        
+
+        await SystemConfigCache.invalidate(redis=redis, db=auth.db)
         return new_obj_dict
     
     @classmethod
@@ -156,10 +160,9 @@ class ParamsService:
         # 同步redis
         redis_key = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{new_obj.config_key}"
         try:
-            value = json.dumps(new_obj_dict, ensure_ascii=False)
             result = await RedisCURD(redis).set(
                 key=redis_key,
-                value=value,
+                value=new_obj_dict,
             )
             if not result:
                 log.error(f"同步配置到缓存失败: {new_obj_dict}")
@@ -168,6 +171,7 @@ class ParamsService:
             log.error(f"更新系统配置失败: {e}")
             raise CustomException(msg="更新系统配置失败")
 
+        await SystemConfigCache.invalidate(redis=redis, db=auth.db)
         return new_obj_dict
 
     @classmethod
@@ -185,6 +189,7 @@ class ParamsService:
         """
         if len(ids) < 1:
             raise CustomException(msg='删除失败，删除对象不能为空')
+        config_keys = []
         for id in ids:
             exist_obj = await ParamsCRUD(auth).get_obj_by_id_crud(id=id)
             if not exist_obj:
@@ -193,21 +198,21 @@ class ParamsService:
             if exist_obj.config_type:
                 # 如果有字典数据，不能删除
                 raise CustomException(msg=f'{exist_obj.config_name} 删除失败，系统初始化配置不可以删除')
+            config_keys.append(exist_obj.config_key)
         
         await ParamsCRUD(auth).delete_obj_crud(ids=ids)
         
-        # 同步删除Redis缓存
-        for id in ids:
-            exist_obj = await ParamsCRUD(auth).get_obj_by_id_crud(id=id)
-            if not exist_obj:
-                continue
-            redis_key = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{exist_obj.config_key}"
+        # 同步删除Redis缓存(删除前已记录配置键)
+        for config_key in config_keys:
+            redis_key = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config_key}"
             try:
                 await RedisCURD(redis).delete(redis_key)
-                log.info(f"删除系统配置成功: {id}")
+                log.info(f"删除系统配置成功: {config_key}")
             except Exception as e:
                 log.error(f"删除系统配置失败: {e}")
                 raise CustomException(msg="删除字典类型失败")
+
+        await SystemConfigCache.invalidate(redis=redis, db=auth.db)
     
     @classmethod
     async def export_obj_service(cls, data_list: list[dict]) -> bytes:
@@ -282,19 +287,14 @@ class ParamsService:
                 if not config_obj:
                     raise CustomException(msg="系统配置不存在")
                 try:
-                    # 保存到Redis并设置过期时间
-                    for config in config_obj:
-                        redis_key = (f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config.config_key}")
-                        config_obj_dict = ParamsOutSchema.model_validate(config).model_dump()
-                        value = json.dumps(config_obj_dict, ensure_ascii=False)
-                        result = await RedisCURD(redis).set(
-                            key=redis_key,
-                            value=value,
-                        )
-                        log.info(f"✅ 系统配置缓存成功: {config.config_key}")
-                        if not result:
-                            log.error(f"❌️ 初始化系统配置失败: {config_obj_dict}")
-                            raise CustomException(msg="初始化系统配置失败")
+                    # 一次往返批量保存到Redis
+                    result = await RedisCURD(redis).mset({
+                        f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{config.config_key}": ParamsOutSchema.model_validate(config).model_dump()
+                        for config in config_obj
+                    })
+                    if not result:
+                        raise CustomException(msg="初始化系统配置失败")
+                    log.info(f"✅ 系统配置缓存成功: {len(config_obj)} 项")
                 except Exception as e:
                     log.error(f"❌️ 初始化系统配置失败: {e}")
                     raise CustomException(msg="初始化系统配置失败")
@@ -311,20 +311,34 @@ class ParamsService:
         - list[dict]: 系统配置模型实例字典列表表示
         """
         redis_keys = await RedisCURD(redis).get_keys(f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:*")
-        redis_configs = await RedisCURD(redis).mget(redis_keys)
         configs = []
-        for config in redis_configs:
+        for config in await RedisCURD(redis).mget(redis_keys) if redis_keys else []:
             if not config:
                 continue
             try:
-                new_config = json.loads(config)  
-                configs.append(new_config)
+                new_config = cls._load_cached_config(config)
+                # 跳过版本号等非配置项
+                if isinstance(new_config, dict):
+                    configs.append(new_config)
             except Exception as e:
                 log.error(f"解析系统配置数据失败: {e}")
                 continue
         
         return configs
     
+    @staticmethod
+    def _load_cached_config(value: Any) -> Any:
+        """
+        解析缓存中的配置项(兼容旧版以 JSON 字符串保存的数据)
+        
+        参数:
+        - value (Any): RedisCURD 读取到的缓存值
+        
+        返回:
+        - Any: 配置字典
+        """
+        return json.loads(value) if isinstance(value, str) else value
+
     @classmethod
     async def get_system_config_for_middleware(cls, redis: Redis) -> dict:
         """
@@ -358,7 +372,7 @@ class ParamsService:
         # 解析演示模式配置
         if config_values[0]:
             try:
-                demo_config = json.loads(config_values[0])
+                demo_config = cls._load_cached_config(config_values[0])
                 config_result["demo_enable"] = demo_config.get("config_value", False) if isinstance(demo_config, dict) else False
             except json.JSONDecodeError:
                 log.error(f"解析演示模式配置失败")
@@ -367,7 +381,7 @@ class ParamsService:
         if config_values[1]:
             
             try:
-                ip_white_config = json.loads(config_values[1])
+                ip_white_config = cls._load_cached_config(config_values[1])
                 # 确保是列表类型
                 config_result["ip_white_list"] = json.loads(ip_white_config.get("config_value", [])) 
             except json.JSONDecodeError:
@@ -376,7 +390,7 @@ class ParamsService:
         # 解析API路径白名单
         if config_values[2]:
             try:
-                white_api_config = json.loads(config_values[2])
+                white_api_config = cls._load_cached_config(config_values[2])
                 # 确保是列表类型
                 config_result["white_api_list_path"] = json.loads(white_api_config.get("config_value", []))
             except json.JSONDecodeError:
@@ -385,9 +399,9 @@ class ParamsService:
         # 解析IP黑名单
         if config_values[3]:
             try:
-                black_ip_config = json.loads(config_values[3])
+                black_ip_config = cls._load_cached_config(config_values[3])
                 # 确保是列表类型
                 config_result["ip_black_list"] = json.loads(black_ip_config.get("config_value", []))
             except json.JSONDecodeError:
                 log.error(f"解析IP黑名单配置失败")
-        return config_result
\ No newline at end of file
+        return config_result
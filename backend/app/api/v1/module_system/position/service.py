@@ -2,6 +2,7 @@
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
+from app.core.auth_cache import AuthUserCache
 from app.utils.excel_util import ExcelUtil
 
 from ..auth.schema import AuthSchema
@@ -86,6 +87,7 @@ class PositionService:
         if exist_position and exist_position.id != id:
             raise CustomException(msg='更新失败，岗位名称重复')
         updated_position = await PositionCRUD(auth).update(id=id, data=data)
+        await AuthUserCache.invalidate(db=auth.db)
         return PositionOutSchema.model_validate(updated_position).model_dump()
 
     @classmethod
@@ -107,6 +109,7 @@ class PositionService:
             if not position:
                 raise CustomException(msg='删除失败，该岗位不存在')
         await PositionCRUD(auth).delete(ids=ids)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_position_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -121,6 +124,7 @@ class PositionService:
         - None
         """
         await PositionCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def export_position_list_service(cls, position_list: list[dict]) -> bytes:
@@ -3,6 +3,8 @@
 from typing import Any
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
+from app.core.auth_cache import AuthUserCache
+from app.core.permission import DataScopeCache
 from app.utils.excel_util import ExcelUtil
 
 from ..auth.schema import AuthSchema
@@ -91,6 +93,8 @@ class RoleService:
         if exist_role and exist_role.id != id:
             raise CustomException(msg='更新失败，角色名称重复')
         updated_role = await RoleCRUD(auth).update(id=id, data=data)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
         return RoleOutSchema.model_validate(updated_role).model_dump()
 
     @classmethod
@@ -112,6 +116,8 @@ class RoleService:
             if not role:
                 raise CustomException(msg='删除失败，该角色不存在')
         await RoleCRUD(auth).delete(ids=ids)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_role_permission_service(cls, auth: AuthSchema, data: RolePermissionSettingSchema) -> None:
@@ -136,6 +142,8 @@ class RoleService:
             await RoleCRUD(auth).set_role_depts_crud(role_ids=data.role_ids, dept_ids=data.dept_ids)
         else:
             await RoleCRUD(auth).set_role_depts_crud(role_ids=data.role_ids, dept_ids=[])
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_role_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -150,6 +158,8 @@ class RoleService:
         - None
         """
         await RoleCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        await DataScopeCache.invalidate(db=auth.db)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def export_role_list_service(cls, role_list: list[dict[str, Any]]) -> bytes:
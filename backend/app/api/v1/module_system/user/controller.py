@@ -1,15 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import urllib.parse
-from fastapi import APIRouter, Depends, Body, Path, UploadFile, Request
+from fastapi import APIRouter, Depends, Body, Path, Query, UploadFile, Request
 from fastapi.responses import JSONResponse, StreamingResponse
+from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.common.request import PaginationService
 from app.core.router_class import OperationLogRoute
 from app.utils.common_util import bytes2file_response
-from app.core.dependencies import db_getter, get_current_user, AuthPermission
+from app.core.dependencies import db_getter, get_current_user, redis_getter, AuthPermission
 from app.core.base_params import PaginationQueryParam
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
@@ -352,6 +353,8 @@ async def export_obj_list_controller(
 @UserRouter.post('/import/data', summary="导入用户", description="导入用户")
 async def import_obj_list_controller(
     file: UploadFile,
+    task_id: str | None = Query(None, description="导入任务编号(用于轮询导入进度)"),
+    redis: Redis = Depends(redis_getter),
     auth: AuthSchema = Depends(AuthPermission(["module_system:user:import"]))
 ) -> JSONResponse:
     """
@@ -359,11 +362,13 @@ async def import_obj_list_controller(
     
     参数:
     - file (UploadFile): 用户导入文件
+    - task_id (str | None): 导入任务编号，可通过 /common/file/import/progress/{task_id} 查询进度
+    - redis (Redis): Redis客户端
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - JSONResponse: 导入用户JSON响应
     """
-    batch_import_result = await UserService.batch_import_user_service(file=file, auth=auth, update_support=True)
+    batch_import_result = await UserService.batch_import_user_service(file=file, auth=auth, update_support=True, redis=redis, task_id=task_id)
     log.info(f"导入用户成功: {batch_import_result}")
     return SuccessResponse(data=batch_import_result, msg="导入用户成功")
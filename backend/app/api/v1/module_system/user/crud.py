@@ -90,17 +90,21 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             preload=preload,
         )
 
-    async def update_last_login_crud(self, id: int) -> UserModel | None:
+    async def update_last_login_crud(self, id: int, password_hash: str | None = None) -> UserModel | None:
         """
         更新用户最后登录时间
         
         参数:
         - id (int): 用户ID
+        - password_hash (str | None): 按当前加密策略重新生成的密码哈希，为空时不更新密码
         
         返回:
         - UserModel | None: 更新后的用户信息
         """
-        return await self.update(id=id, data={"last_login": datetime.now()})
+        data: dict = {"last_login": datetime.now()}
+        if password_hash:
+            data["password"] = password_hash
+        return await self.update(id=id, data=data)
 
     async def set_available_crud(self, ids: list[int], status: str) -> None:
         """
@@ -1,16 +1,17 @@
 # -*- coding: utf-8 -*-
 
-import io
 from typing import Any
 from fastapi import UploadFile
-import pandas as pd
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import CustomException
+from app.core.auth_cache import AuthUserCache
 from app.utils.hash_bcrpy_util import PwdUtil
 from app.core.base_schema import BatchSetAvailable, UploadResponseSchema
 from app.core.logger import log
 from app.utils.common_util import traversal_to_tree
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelImporter, ExcelUtil, ImportColumn, ImportResult
 from app.utils.upload_util import UploadUtil
 
 from ..position.crud import PositionCRUD
@@ -111,7 +112,7 @@ class UserService:
                 raise CustomException(msg='部门不存在')
         # 创建用户
         if data.password:
-            data.password = PwdUtil.set_password_hash(password=data.password)
+            data.password = await PwdUtil.set_password_hash_async(password=data.password)
         user_dict = data.model_dump(exclude_unset=True, exclude={"role_ids", "position_ids"})
         # 创建用户
         new_user = await UserCRUD(auth).create(data=user_dict)
@@ -195,6 +196,7 @@ class UserService:
                 raise CustomException(msg='部分岗位已被禁用')
             await UserCRUD(auth).set_user_positions_crud(user_ids=[id], position_ids=data.position_ids)
 
+        await AuthUserCache.invalidate(db=auth.db)
         user_dict = UserOutSchema.model_validate(new_user).model_dump()
         return user_dict
 
@@ -230,6 +232,7 @@ class UserService:
         
         # 删除用户
         await UserCRUD(auth).delete(ids=ids)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def get_current_user_info_service(cls, auth: AuthSchema) -> dict:
@@ -305,6 +308,7 @@ class UserService:
                 raise CustomException(msg='更新失败，邮箱已存在')
         user_update_data = UserUpdateSchema(**data.model_dump())
         new_user = await UserCRUD(auth).update(id=auth.user.id, data=user_update_data)
+        await AuthUserCache.invalidate(db=auth.db)
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
@@ -326,6 +330,7 @@ class UserService:
             if user.is_superuser:
                 raise CustomException(msg="超级管理员状态不能修改")
         await UserCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        await AuthUserCache.invalidate(db=auth.db)
 
     @classmethod
     async def upload_avatar_service(cls, base_url: str, file: UploadFile) -> dict:
@@ -369,11 +374,11 @@ class UserService:
         user = await UserCRUD(auth).get_by_id_crud(id=auth.user.id)
         if not user:
             raise CustomException(msg="用户不存在")
-        if not PwdUtil.verify_password(plain_password=data.old_password, password_hash=user.password):
+        if not await PwdUtil.verify_password_async(plain_password=data.old_password, password_hash=user.password):
             raise CustomException(msg='原密码输入错误')
 
         # 更新密码
-        new_password_hash = PwdUtil.set_password_hash(password=data.new_password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.new_password)
         new_user = await UserCRUD(auth).change_password_crud(id=user.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
     
@@ -402,7 +407,7 @@ class UserService:
             raise CustomException(msg="超级管理员密码不能重置")
 
         # 更新密码
-        new_password_hash = PwdUtil.set_password_hash(password=data.password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.password)
         new_user = await UserCRUD(auth).change_password_crud(id=data.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
 
@@ -423,7 +428,7 @@ class UserService:
         if username_ok:
             raise CustomException(msg='账号已存在')
 
-        data.password = PwdUtil.set_password_hash(password=data.password)
+        data.password = await PwdUtil.set_password_hash_async(password=data.password)
         data.name = data.username
         create_dict = data.model_dump(exclude_unset=True, exclude={"role_ids", "position_ids"})
         
@@ -458,12 +463,12 @@ class UserService:
         if user.is_superuser:
             raise CustomException(msg="超级管理员密码不能重置")
 
-        new_password_hash = PwdUtil.set_password_hash(password=data.new_password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.new_password)
         new_user = await UserCRUD(auth).forget_password_crud(id=user.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
-    async def batch_import_user_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
+    async def batch_import_user_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False, redis: Redis | None = None, task_id: str | None = None) -> str:
         """
         批量导入用户
         
@@ -471,102 +476,79 @@ class UserService:
         - auth (AuthSchema): 认证信息模型
         - file (UploadFile): 上传的Excel文件
         - update_support (bool, optional): 是否支持更新已存在用户. 默认值为False.
+        - redis (Redis | None, optional): 记录导入进度的Redis客户端
+        - task_id (str | None, optional): 导入进度任务编号
         
         返回:
         - str: 导入结果消息
         """
-        
-        header_dict = {
-            '部门编号': 'dept_id',
-            '用户名': 'username',
-            '名称': 'name',
-            '邮箱': 'email',
-            '手机号': 'mobile',
-            '性别': 'gender',
-            '状态': 'status'
-        }
+        columns = [
+            ImportColumn(header='部门编号', field='dept_id', type='int', required=True),
+            ImportColumn(header='用户名', field='username', required=True, unique=True),
+            ImportColumn(header='名称', field='name', required=True),
+            ImportColumn(header='邮箱', field='email'),
+            ImportColumn(header='手机号', field='mobile'),
+            ImportColumn(header='性别', field='gender', choices={'男': '0', '女': '1'}, default='2'),
+            ImportColumn(header='状态', field='status', choices={'正常': '0'}, default='1'),
+        ]
+        # 默认密码只计算一次哈希
+        default_password = await PwdUtil.set_password_hash_async(password="123456")
+
+        async def writer(db: AsyncSession, rows: list[tuple[int, dict]], result: ImportResult) -> int:
+            """分块写入: 新用户批量插入，已存在的用户按主键批量更新(不覆盖密码)"""
+            chunk_auth = AuthSchema(db=db, user=auth.user, check_data_scope=auth.check_data_scope)
+            usernames = [data["username"] for _, data in rows]
+            # 查询已存在的用户(不受数据权限限制)，再确认其中当前用户有权限修改的部分
+            existing = {
+                user.username: user
+                for user in await UserCRUD(AuthSchema(db=db, check_data_scope=False)).list(search={"username": ("in", usernames)}, preload=[])
+            }
+            visible_ids: set[int] = set()
+            if existing and update_support:
+                visible_ids = {
+                    user.id
+                    for user in await UserCRUD(chunk_auth).list(search={"id": ("in", [user.id for user in existing.values()])}, preload=[])
+                }
+
+            create_rows, update_rows = [], []
+            for count, user_data in rows:
+                exists_user = existing.get(user_data["username"])
+                if not exists_user:
+                    create_rows.append({**user_data, "password": default_password})
+                elif exists_user.is_superuser:
+                    result.add_error(count, "超级管理员不允许修改")
+                elif not update_support:
+                    result.add_error(count, f"用户 {user_data['username']} 已存在")
+                elif exists_user.id not in visible_ids:
+                    result.add_error(count, f"无权限修改用户 {user_data['username']}")
+                else:
+                    update_rows.append({**user_data, "id": exists_user.id})
+
+            if create_rows:
+                await UserCRUD(chunk_auth).bulk_create(data=create_rows)
+            if update_rows:
+                await UserCRUD(chunk_auth).bulk_update(
+                    data=update_rows,
+                    update_fields=["name", "email", "mobile", "gender", "status", "dept_id"],
+                )
+            return len(create_rows) + len(update_rows)
 
         try:
-            # 读取Excel文件
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
-            await file.close()
-            
-            if df.empty:
-                raise CustomException(msg="导入文件为空")
-            
-            # 检查表头是否完整
-            missing_headers = [header for header in header_dict.keys() if header not in df.columns]
-            if missing_headers:
-                raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
-            
-            # 重命名列名
-            df.rename(columns=header_dict, inplace=True)
-            
-            # 验证必填字段
-            required_fields = ['username', 'name', 'dept_id']
-            errors = []
-            for field in required_fields:
-                missing_rows = df[df[field].isnull()].index.tolist()
-                if missing_rows:
-                    field_name = [k for k,v in header_dict.items() if v == field][0]
-                    rows_str = "、".join([str(i+1) for i in missing_rows])
-                    errors.append(f"{field_name}不能为空，第{rows_str}行")
-            
-            if errors:
-                raise CustomException(msg="；".join(errors))
-            
-            error_msgs = []
-            success_count = 0
-            count = 0
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
-                try:
-                    count = count + 1
-                    # 数据转换
-                    gender = 1 if row['gender'] == '男' else (2 if row['gender'] == '女' else 1)
-                    status = True if row['status'] == '正常' else False
-                    
-                    # 构建用户数据
-                    user_data = {
-                        "username": str(row['username']).strip(),
-                        "name": str(row['name']).strip(),
-                        "email": str(row['email']).strip(),
-                        "mobile": str(row['mobile']).strip(),
-                        "gender": gender,
-                        "status": status,
-                        "dept_id": int(row['dept_id']),
-                        "password": PwdUtil.set_password_hash(password="123456")  # 设置默认密码
-                    }
-
-                    # 处理用户导入
-                    exists_user = await UserCRUD(auth).get_by_username_crud(username=user_data["username"])
-                    if exists_user:
-                        # 检查是否是超级管理员
-                        if exists_user.is_superuser:
-                            error_msgs.append(f"第{count}行: 超级管理员不允许修改")
-                            continue
-                        if update_support:
-                            user_update_data = UserUpdateSchema(**user_data)
-                            await UserCRUD(auth).update(id=exists_user.id, data=user_update_data)
-                            success_count += 1
-                        else:
-                            error_msgs.append(f"第{count}行: 用户 {user_data['username']} 已存在")
-                    else:
-                        user_create_data = UserCreateSchema(**user_data)
-                        await UserCRUD(auth).create(data=user_create_data)
-                        success_count += 1
-                        
-                except Exception as e:
-                    error_msgs.append(f"第{count}行: 异常{str(e)}")
-                    continue
+            # 流式读取、整列校验，每块在独立事务中写入
+            result = await ExcelImporter(
+                columns=columns,
+                schema=UserCreateSchema,
+                exclude={"role_ids", "position_ids"},
+                redis=redis,
+                task_id=task_id,
+                user_id=auth.user.id if auth.user else None,
+            ).run(file=file, writer=writer)
+
+            if update_support and result.success:
+                await AuthUserCache.invalidate()
 
             # 返回详细的导入结果
-            result = f"成功导入 {success_count} 条数据"
-            if error_msgs:
-                result += "\n错误信息:\n" + "\n".join(error_msgs)
-            return result
+            return result.message()
             
         except Exception as e:
             log.error(f"批量导入用户失败: {str(e)}")
@@ -45,7 +45,16 @@ class RedisInitKeyConfig(Enum):
     REFRESH_TOKEN = {'key': 'refresh_token', 'remark': '刷新令牌信息'}
     CAPTCHA_CODES = {'key': 'captcha_codes', 'remark': '图片验证码'}
     SYSTEM_CONFIG = {'key': 'system_config', 'remark': '系统配置'}
+    SYSTEM_CONFIG_VERSION = {'key': 'system_config_version', 'remark': '系统配置快照版本号'}
     SYSTEM_DICT = {'key':'system_dict','remark': '数据字典'}
+    DATA_SCOPE = {'key': 'data_scope', 'remark': '数据权限缓存版本'}
+    AUTH_USER = {'key': 'auth_user', 'remark': '认证用户快照'}
+    ROLE_PERMISSION = {'key': 'role_permission', 'remark': '角色权限标识集合'}
+    ONLINE_SESSION = {'key': 'online_session', 'remark': '在线会话索引'}
+    SERVICE_CACHE = {'key': 'service_cache', 'remark': '服务层读穿透缓存'}
+    IMPORT_PROGRESS = {'key': 'import_progress', 'remark': '数据导入进度'}
+    STARTUP_STAMP = {'key': 'startup_stamp', 'remark': '启动初始化版本戳'}
+    SCHEDULER_LEADER = {'key': 'scheduler_leader', 'remark': '定时任务主节点租约'}
     
     @property
     def key(self) -> str:
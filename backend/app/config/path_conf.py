@@ -24,6 +24,9 @@ DOWNLOAD_DIR = STATIC_DIR / 'download'
 # 环境配置目录
 ENV_DIR = BASE_DIR / 'env'
 
+# 路由清单(python main.py build-routes 生成)
+ROUTE_MANIFEST_FILE = BASE_DIR / 'route_manifest.json'
+
 # 初始化脚本
 SCRIPT_DIR: Path = BASE_DIR / 'app' / 'scripts' / 'data'
 
@@ -30,6 +30,16 @@ class Settings(BaseSettings):
     # ================================================= #
     SERVER_HOST: str = '0.0.0.0'        # 允许访问的IP地址
     SERVER_PORT: int = 8001             # 服务端口
+    SERVER_WORKERS: int = 1             # 生产环境 worker 进程数(大于1时由 gunicorn 管理进程，Windows 下使用 uvicorn 多进程)
+    SERVER_PRELOAD: bool = True         # 多进程时在主进程中预加载应用并完成建表/缓存预热后再 fork worker
+    SERVER_LOOP: Literal['auto', 'asyncio', 'uvloop'] = 'auto'    # 事件循环实现
+    SERVER_HTTP: Literal['auto', 'h11', 'httptools'] = 'auto'     # HTTP 协议解析实现
+    SERVER_MAX_REQUESTS: int = 0        # worker 处理请求数达到该值后平滑重启(0 表示不重启)
+    SERVER_MAX_REQUESTS_JITTER: int = 0 # 重启阈值随机抖动，避免 worker 同时重启
+    SERVER_GRACEFUL_TIMEOUT: int = 30   # 平滑重启/关闭时等待处理中请求的最长时间(秒)
+    ROUTE_MANIFEST_ENABLE: bool = True  # 非开发环境下存在路由清单时按清单注册路由，跳过目录扫描(python main.py build-routes 生成)
+    STARTUP_LOCK_TIMEOUT: int = 60      # 集群内只执行一次的启动步骤的锁超时时间(秒)，持锁实例异常退出后由其他实例接管
+    STARTUP_WAIT_TIMEOUT: int = 300     # 等待其他实例完成启动步骤的最长时间(秒)
 
     # ================================================= #
     # ******************* API文档配置 ****************** #
@@ -68,6 +78,12 @@ class Settings(BaseSettings):
     TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [                               # JWT / RBAC 路由白名单
         'api/v1/auth/login',
     ]
+    AUTH_USER_CACHE_ENABLE: bool = True                                     # 是否缓存认证用户快照
+    AUTH_USER_CACHE_LOCAL_TTL: int = 10                                     # 进程内缓存过期时间(秒)
+    AUTH_USER_CACHE_REDIS_TTL: int = 60 * 5                                 # Redis缓存过期时间(秒)
+    AUTH_USER_CACHE_SIZE: int = 2048                                        # 进程内缓存最大用户数
+    PASSWORD_HASH_ROUNDS: int = 12                                          # bcrypt加密轮数，低于该值的旧哈希在登录时自动重新加密
+    PASSWORD_HASH_WORKERS: int = 2                                          # 密码哈希进程池大小(0 表示使用线程池)
 
     # ================================================= #
     # ******************** 数据库配置 ******************* #
@@ -85,6 +101,7 @@ class Settings(BaseSettings):
     AUTOCOMMIT: bool = False                               # 是否自动提交
     AUTOFETCH: bool = False                                # 是否自动刷新
     EXPIRE_ON_COMMIT: bool = False                         # 是否在提交时过期
+    BULK_CHUNK_SIZE: int = 1000                            # 批量插入/upsert 每条语句的行数
 
     # 数据库类型
     DATABASE_TYPE: Literal['mysql', 'postgres', 'sqlite', 'dm'] = 'mysql'
@@ -97,6 +114,11 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = 'ServBay.dev'
     DATABASE_NAME: str = 'fastapiadmin'
 
+    # ================================================= #
+    # ******************* 数据权限配置 ****************** #
+    # ================================================= #
+    DATA_SCOPE_USE_CLOSURE: bool = True    # 本部门及以下数据权限是否基于部门闭包表(sys_dept_closure)子查询过滤
+
     # ================================================= #
     # ******************** Redis配置 ******************* #
     # ================================================= #
@@ -106,6 +128,43 @@ class Settings(BaseSettings):
     REDIS_DB_NAME: int = 1
     REDIS_USER: str = ''
     REDIS_PASSWORD: str = ''
+    REDIS_SCAN_COUNT: int = 1000       # SCAN 每批次 COUNT 提示
+    REDIS_UNLINK_CHUNK: int = 500      # 分块 UNLINK 时每条命令的键数
+    REDIS_CODEC: str = 'orjson'        # 非标量缓存值编解码器(json/orjson/msgpack/pickle)，依赖未安装时退回 json
+    REDIS_PICKLE_ENABLE: bool = False  # 是否允许 pickle 编解码(兜底编码无法序列化的对象；反序列化可执行任意代码，仅在 Redis 可信时开启)
+    REDIS_COMPRESSION: str = 'zstd'    # 缓存值压缩算法(zstd/lz4，空字符串为不压缩)
+    REDIS_COMPRESS_THRESHOLD: int = 1024  # 超过该字节数才压缩
+
+    # ================================================= #
+    # ******************* 定时任务配置 ****************** #
+    # ================================================= #
+    SCHEDULER_LEASE_TTL: int = 10                 # 调度主节点租约有效期(秒)，主节点失联后其他实例最迟在该时间后接管
+    SCHEDULER_LEASE_RENEW_INTERVAL: int = 3       # 租约续约/竞选间隔(秒)，也是其他实例新增任务被主节点感知的最长延迟
+    JOB_LOG_QUEUE_SIZE: int = 10000               # 任务执行日志写入队列容量
+    JOB_LOG_BATCH_SIZE: int = 200                 # 任务执行日志单次批量写入条数
+    JOB_LOG_FLUSH_INTERVAL_MS: int = 1000         # 任务执行日志批量写入时间窗口(毫秒)
+    JOB_LOG_SAMPLE_THRESHOLD: float = 0.5         # 队列使用率超过该比例时对成功日志采样(失败日志始终保留)
+    JOB_LOG_SAMPLE_RATE: float = 0.1              # 采样时成功日志的保留比例
+    JOB_LOG_SHUTDOWN_TIMEOUT: int = 10            # 关闭时flush超时时间(秒)
+
+    # ================================================= #
+    # ******************* 服务层缓存配置 ****************** #
+    # ================================================= #
+    SERVICE_CACHE_ENABLE: bool = True          # 是否启用服务层读穿透缓存(@cached)
+    SERVICE_CACHE_TTL: int = 60 * 10           # Redis缓存过期时间(秒)
+    SERVICE_CACHE_TTL_JITTER: float = 0.1      # 过期时间随机抖动比例，避免同时失效
+    SERVICE_CACHE_LOCAL_TTL: int = 60          # 进程内缓存过期时间(秒)
+    SERVICE_CACHE_LOCAL_SIZE: int = 2048       # 进程内缓存最大条目数
+    SERVICE_CACHE_LOCK_TIMEOUT: int = 3        # 跨 worker 回源锁超时时间(秒)
+    CACHE_INVALIDATION_EXCLUDE_TABLES: List[str] = ["sys_log", "app_job_log"]  # 写入不触发缓存失效的表(日志等)
+
+    # ================================================= #
+    # ******************* 导入导出配置 ****************** #
+    # ================================================= #
+    IMPORT_CHUNK_SIZE: int = 1000              # 导入时每次读取/校验/写入的行数(每块独立事务)
+    IMPORT_MAX_ERRORS: int = 1000              # 导入结果中保留的错误信息条数上限
+    IMPORT_PROGRESS_EXPIRE: int = 60 * 60      # 导入进度在Redis中的保留时间(秒)
+    EXPORT_BATCH_SIZE: int = 1000              # 流式导出时每次从数据库游标读取的行数
 
     # ================================================= #
     # ******************** 验证码配置 ******************* #
@@ -121,13 +180,42 @@ class Settings(BaseSettings):
     OPERATION_LOG_RECORD: bool = True                                                               # 是否记录操作日志
     IGNORE_OPERATION_FUNCTION: List[str] = ["get_captcha_for_login"]                                # 忽略记录的函数
     OPERATION_RECORD_METHOD: List[str] = ["POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]      # 需要记录的请求方法
+    OPERATION_LOG_QUEUE_SIZE: int = 10000           # 操作日志写入队列容量
+    OPERATION_LOG_BATCH_SIZE: int = 200             # 单次批量写入条数
+    OPERATION_LOG_FLUSH_INTERVAL_MS: int = 500      # 批量写入时间窗口(毫秒)
+    OPERATION_LOG_PUT_TIMEOUT: float = 0.05         # 队列满时入队等待时间(秒)，0为不等待
+    OPERATION_LOG_OVERFLOW: str = "spill"           # 队列溢出/写入失败策略(spill:落盘后回放 drop:丢弃)
+    OPERATION_LOG_SHUTDOWN_TIMEOUT: int = 10        # 关闭时flush超时时间(秒)
+    IP_FILTER_ENABLE: bool = True                   # 是否启用IP黑名单/演示模式拦截
+    PROCESS_TIME_HEADER_ENABLE: bool = True         # 是否添加 X-Process-Time 响应头
 
     # ================================================= #
-    # ******************* Gzip压缩配置 ******************* #
+    # ******************* IP归属地配置 ****************** #
     # ================================================= #
-    GZIP_ENABLE: bool = True        # 是否启用Gzip
+    IP_LOCATION_DB_PATH: str = 'static/assets/ipdb/ip_location.db'  # 离线IP库路径(由 IpLocalUtil.build_database 生成)
+    IP_LOCATION_CACHE_SIZE: int = 10000                              # 归属地LRU缓存条数
+    IP_LOCATION_REMOTE_ENABLE: bool | None = None                    # 是否回退到远程API(None:仅离线库不存在时 True:离线库未命中时 False:不回退)
+    IP_LOCATION_REMOTE_TIMEOUT: float = 3.0                          # 远程API超时时间(秒)
+
+    # ================================================= #
+    # ******************* 响应压缩配置 ******************* #
+    # ================================================= #
+    GZIP_ENABLE: bool = True        # 是否启用响应压缩
     GZIP_MIN_SIZE: int = 1000       # 最小压缩大小(字节)
-    GZIP_COMPRESS_LEVEL: int = 9    # 压缩级别(1-9)
+    GZIP_COMPRESS_LEVEL: int = 9    # gzip默认压缩级别(1-9)，仅用于 COMPRESSION_LEVELS 未配置的内容类型
+    COMPRESSION_ALGORITHMS: List[str] = ["br", "zstd", "gzip"]    # 按优先级协商的压缩算法(br/zstd需安装 brotli/zstandard)
+    COMPRESSION_LEVELS: dict[str, dict[str, int]] = {             # 按内容类型前缀配置各算法压缩级别(JSON/文本的 gzip 级别由原来的9调整为5/6，压缩率接近而耗时更低)
+        "application/json": {"br": 4, "zstd": 3, "gzip": 5},
+        "text/": {"br": 5, "zstd": 3, "gzip": 6},
+        "application/javascript": {"br": 5, "zstd": 3, "gzip": 6},
+    }
+    COMPRESSION_EXCLUDE_TYPES: List[str] = [                      # 不压缩的内容类型前缀(已压缩媒体/流式事件)
+        "image/", "video/", "audio/", "font/woff",
+        "application/zip", "application/gzip", "application/x-7z-compressed", "application/pdf",
+        "application/octet-stream", "application/vnd.openxmlformats-officedocument",
+        "text/event-stream",
+    ]
+    COMPRESSION_EXCLUDE_PATHS: List[str] = ["/static/upload"]    # 不压缩的路径前缀
 
     # ================================================= #
     # ***************** 静态文件配置 ***************** #
@@ -176,8 +264,10 @@ class Settings(BaseSettings):
         # 中间件列表
         MIDDLEWARES: List[Optional[str]] = [
             "app.core.middlewares.CustomCORSMiddleware" if self.CORS_ORIGIN_ENABLE else None,
+            "app.core.middlewares.ProcessTimeMiddleware" if self.PROCESS_TIME_HEADER_ENABLE else None,
             "app.core.middlewares.RequestLogMiddleware" if self.OPERATION_LOG_RECORD else None,
-            "app.core.middlewares.CustomGZipMiddleware" if self.GZIP_ENABLE else None,
+            "app.core.middlewares.IpFilterMiddleware" if self.IP_FILTER_ENABLE else None,
+            "app.core.middlewares.CompressionMiddleware" if self.GZIP_ENABLE else None,
         ]
         return MIDDLEWARES
 
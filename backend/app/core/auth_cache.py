@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.database import run_after_commit
+from app.core.logger import log
+from app.api.v1.module_system.user.model import UserModel
+from app.api.v1.module_system.role.model import RoleModel
+from app.api.v1.module_system.menu.model import MenuModel
+from app.api.v1.module_system.dept.model import DeptModel
+from app.api.v1.module_system.position.model import PositionModel
+
+
+class AuthUserCache:
+    """
+    认证用户快照缓存（进程内 LRU + Redis 哈希）
+
+    缓存 get_current_user 解析出的用户、角色、菜单权限与部门信息，命中时无需查询数据库。
+    快照以 JSON 保存，每次请求重建为游离(transient)的模型实例，避免跨请求共享 ORM 对象。
+
+    用户/角色/菜单/部门/岗位写操作提交后递增 Redis 版本号并广播，
+    各 worker 清空进程内缓存，版本号不一致的 Redis 快照视为失效。
+    """
+
+    KEY: str = RedisInitKeyConfig.AUTH_USER.key
+    VERSION_KEY: str = f"{RedisInitKeyConfig.AUTH_USER.key}:version"
+    CHANNEL: str = f"{RedisInitKeyConfig.AUTH_USER.key}:invalidate"
+
+    _redis: Redis | None = None
+    _version: int = 0
+    _local: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+
+    @classmethod
+    def key(cls, username: str) -> str:
+        """
+        获取用户快照的 Redis 键名
+
+        参数:
+        - username (str): 用户名
+
+        返回:
+        - str: Redis 键名
+        """
+        return f"{cls.KEY}:{username}"
+
+    @classmethod
+    def get_local(cls, username: str) -> dict | None:
+        """
+        读取进程内快照
+
+        参数:
+        - username (str): 用户名
+
+        返回:
+        - dict | None: 用户快照，未命中或已过期返回None
+        """
+        item = cls._local.get(username)
+        if item is None:
+            return None
+        expire_at, version, snapshot = item
+        if expire_at < time.monotonic() or version != cls._version:
+            cls._local.pop(username, None)
+            return None
+        cls._local.move_to_end(username)
+        return snapshot
+
+    @classmethod
+    def set_local(cls, username: str, snapshot: dict) -> None:
+        """
+        写入进程内快照
+
+        参数:
+        - username (str): 用户名
+        - snapshot (dict): 用户快照
+        """
+        cls._local[username] = (time.monotonic() + settings.AUTH_USER_CACHE_LOCAL_TTL, cls._version, snapshot)
+        cls._local.move_to_end(username)
+        while len(cls._local) > settings.AUTH_USER_CACHE_SIZE:
+            cls._local.popitem(last=False)
+
+    @classmethod
+    async def check_online_and_get(cls, redis: Redis, token_key: str, username: str) -> tuple[bool, dict | None]:
+        """
+        一次往返内校验会话在线并读取 Redis 快照（进程内命中时只校验在线）
+
+        参数:
+        - redis (Redis): Redis 连接
+        - token_key (str): 访问令牌键名
+        - username (str): 用户名
+
+        返回:
+        - tuple[bool, dict | None]: (会话是否在线, 用户快照)
+        """
+        snapshot = cls.get_local(username)
+        if snapshot is not None:
+            return bool(await redis.exists(token_key)), snapshot
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.exists(token_key)
+            pipe.hgetall(cls.key(username))
+            online, cached = await pipe.execute()
+
+        if cached and int(cached.get("version") or -1) == cls._version:
+            try:
+                snapshot = json.loads(cached["data"])
+                cls.set_local(username, snapshot)
+            except Exception as e:
+                log.error(f"解析认证用户快照失败: {str(e)}")
+                snapshot = None
+        return bool(online), snapshot
+
+    @classmethod
+    def current_version(cls) -> int:
+        """
+        获取当前缓存版本号(需在查询数据库之前获取，写入缓存时传给 set)
+
+        返回:
+        - int: 版本号
+        """
+        return cls._version
+
+    @classmethod
+    async def set(cls, redis: Redis, user: UserModel, version: int) -> None:
+        """
+        写入两级缓存
+
+        查询期间发生失效(版本号已变化)时不写入，避免把旧数据以新版本号缓存
+
+        参数:
+        - redis (Redis): Redis 连接
+        - user (UserModel): 已过滤可用角色/岗位的用户对象
+        - version (int): 查询数据库之前获取的版本号
+        """
+        if version != cls._version:
+            return
+        snapshot = cls.dump(user)
+        cls.set_local(user.username, snapshot)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(cls.key(user.username), mapping={"version": version, "data": json.dumps(snapshot, ensure_ascii=False)})
+                pipe.expire(cls.key(user.username), settings.AUTH_USER_CACHE_REDIS_TTL)
+                await pipe.execute()
+        except Exception as e:
+            log.error(f"写入认证用户快照失败: {str(e)}")
+
+    @classmethod
+    def dump(cls, user: UserModel) -> dict:
+        """
+        将用户对象转换为可序列化的快照
+
+        参数:
+        - user (UserModel): 用户对象
+
+        返回:
+        - dict: 用户快照
+        """
+        return {
+            "id": user.id,
+            "username": user.username,
+            "name": user.name,
+            "status": user.status,
+            "is_superuser": user.is_superuser,
+            "dept_id": user.dept_id,
+            "dept": {"id": user.dept.id, "name": user.dept.name} if user.dept else None,
+            "positions": [{"id": pos.id, "name": pos.name, "status": pos.status} for pos in user.positions or []],
+            "roles": [
+                {
+                    "id": role.id,
+                    "name": role.name,
+                    "code": role.code,
+                    "status": role.status,
+                    "data_scope": role.data_scope,
+                    "depts": [{"id": dept.id, "name": dept.name} for dept in role.depts or []],
+                    "menus": [
+                        {"id": menu.id, "type": menu.type, "permission": menu.permission, "status": menu.status}
+                        for menu in role.menus or []
+                    ],
+                }
+                for role in user.roles or []
+            ],
+        }
+
+    @classmethod
+    def load(cls, snapshot: dict) -> UserModel:
+        """
+        由快照重建游离的用户对象（不关联任何会话）
+
+        参数:
+        - snapshot (dict): 用户快照
+
+        返回:
+        - UserModel: 用户对象
+        """
+        menus: dict[int, MenuModel] = {}
+        roles = []
+        for item in snapshot["roles"]:
+            role_menus = []
+            for menu in item["menus"]:
+                if menu["id"] not in menus:
+                    menus[menu["id"]] = MenuModel(**menu)
+                role_menus.append(menus[menu["id"]])
+            roles.append(RoleModel(
+                id=item["id"],
+                name=item["name"],
+                code=item["code"],
+                status=item["status"],
+                data_scope=item["data_scope"],
+                depts=[DeptModel(**dept) for dept in item["depts"]],
+                menus=role_menus,
+            ))
+        dept = snapshot["dept"]
+        return UserModel(
+            id=snapshot["id"],
+            username=snapshot["username"],
+            name=snapshot["name"],
+            status=snapshot["status"],
+            is_superuser=snapshot["is_superuser"],
+            dept_id=snapshot["dept_id"],
+            dept=DeptModel(**dept) if dept else None,
+            positions=[PositionModel(**pos) for pos in snapshot["positions"]],
+            roles=roles,
+        )
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空进程内缓存"""
+        cls._local.clear()
+        RolePermissionCache.clear()
+
+    @classmethod
+    async def invalidate(cls, db: AsyncSession | None = None) -> None:
+        """
+        使所有 worker 的认证用户缓存失效（传入会话时在事务提交后广播）
+
+        参数:
+        - db (AsyncSession | None): 当前数据库会话
+        """
+        cls.clear()
+        if not run_after_commit(db, cls.CHANNEL, cls.publish):
+            await cls.publish()
+
+    @classmethod
+    async def publish(cls) -> None:
+        """递增版本号并广播失效通知"""
+        cls.clear()
+        if cls._redis is None:
+            return
+        try:
+            cls._version = await cls._redis.incr(cls.VERSION_KEY)
+            await cls._redis.publish(cls.CHANNEL, cls._version)
+        except Exception as e:
+            log.error(f"广播认证用户缓存失效失败: {str(e)}")
+
+    @classmethod
+    async def listen(cls, redis: Redis) -> None:
+        """
+        订阅失效通知（常驻任务，由 lifespan 启动）
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        cls._redis = redis
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CHANNEL)
+                    # (重新)订阅后对齐版本号，补偿断线期间丢失的通知
+                    cls._sync_version(await redis.get(cls.VERSION_KEY))
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            cls._sync_version(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"认证用户缓存订阅异常，稍后重试: {str(e)}")
+                await asyncio.sleep(1)
+
+    @classmethod
+    def _sync_version(cls, value: Any) -> None:
+        """对齐版本号，变化时清空进程内缓存"""
+        version = int(value or 0)
+        if version != cls._version:
+            cls._version = version
+            cls.clear()
+
+
+class RolePermissionCache:
+    """
+    角色权限标识集合缓存（进程内 + Redis 哈希）
+
+    每个角色预先计算一次可用菜单的权限标识 frozenset，AuthPermission 直接做集合成员判断，
+    不再在每个请求中遍历角色 × 菜单。角色/菜单变更会递增 AuthUserCache 的版本号，
+    Redis 中按版本号分桶存放，旧版本数据随过期时间自然淘汰。
+    """
+
+    KEY: str = RedisInitKeyConfig.ROLE_PERMISSION.key
+
+    _local: dict[int, frozenset[str]] = {}
+
+    @classmethod
+    def key(cls) -> str:
+        """
+        获取当前版本的 Redis 哈希键名
+
+        返回:
+        - str: Redis 键名
+        """
+        return f"{cls.KEY}:{AuthUserCache._version}"
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空进程内缓存"""
+        cls._local = {}
+
+    @staticmethod
+    def compute(role: RoleModel) -> frozenset[str]:
+        """
+        计算角色的权限标识集合
+
+        参数:
+        - role (RoleModel): 角色对象（需已加载 menus）
+
+        返回:
+        - frozenset[str]: 权限标识集合
+        """
+        return frozenset(menu.permission for menu in role.menus or [] if menu.permission and menu.status)
+
+    @classmethod
+    async def get(cls, redis: Redis, roles: list[RoleModel]) -> list[frozenset[str]]:
+        """
+        获取多个角色的权限标识集合（进程内 -> Redis -> 现场计算并回写）
+
+        参数:
+        - redis (Redis): Redis 连接
+        - roles (list[RoleModel]): 可用角色列表
+
+        返回:
+        - list[frozenset[str]]: 与 roles 顺序一致的权限标识集合列表
+        """
+        local = cls._local
+        missing = [role for role in roles if role.id not in local]
+        if missing:
+            key = cls.key()
+            try:
+                cached = await redis.hmget(key, [str(role.id) for role in missing])
+            except Exception as e:
+                log.error(f"读取角色权限缓存失败: {str(e)}")
+                cached = [None] * len(missing)
+
+            computed = {}
+            for role, value in zip(missing, cached):
+                if value is not None:
+                    local[role.id] = frozenset(json.loads(value))
+                else:
+                    local[role.id] = computed[str(role.id)] = cls.compute(role)
+
+            if computed:
+                try:
+                    async with redis.pipeline(transaction=False) as pipe:
+                        pipe.hset(key, mapping={role_id: json.dumps(sorted(perms)) for role_id, perms in computed.items()})
+                        pipe.expire(key, settings.AUTH_USER_CACHE_REDIS_TTL)
+                        await pipe.execute()
+                except Exception as e:
+                    log.error(f"写入角色权限缓存失败: {str(e)}")
+        return [local[role.id] for role in roles]
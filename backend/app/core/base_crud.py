@@ -1,16 +1,26 @@
 # -*- coding: utf-8 -*-
 
+import json
+import base64
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
 from pydantic import BaseModel
-from typing import TypeVar, Sequence, Generic, Dict, Any, List, Optional, Type, Union
+from typing import AsyncIterator, TypeVar, Sequence, Generic, Dict, Any, List, Optional, Tuple, Type, Union
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy.orm import selectinload
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction, attributes, selectinload
 from sqlalchemy.engine import Result
-from sqlalchemy import asc, func, select, delete, Select, desc, update
+from sqlalchemy import and_, asc, false, func, or_, select, delete, insert, Select, desc, tuple_, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy import inspect as sa_inspect
 
+from app.config.setting import settings
 from app.core.base_model import MappedBase
 from app.core.exceptions import CustomException
 from app.core.permission import Permission
+from app.core.service_cache import ServiceCache
+from app.utils.common_util import uuid4_str
 from app.api.v1.module_system.auth.schema import AuthSchema
 
 ModelType = TypeVar("ModelType", bound=MappedBase)
@@ -93,6 +103,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"列表查询失败: {str(e)}")
 
+    async def stream(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, preload: Optional[List[Union[str, Any]]] = None, batch_size: Optional[int] = None) -> AsyncIterator[Sequence[ModelType]]:
+        """
+        以服务端游标分批读取对象列表(用于导出等大结果集，内存占用与总行数无关)
+        
+        参数:
+        - search (Optional[Dict]): 查询条件,格式同 list
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段,格式同 list
+        - preload (Optional[List[Union[str, Any]]]): 预加载关系(按批 selectinload)
+        - batch_size (Optional[int]): 每批行数，默认 EXPORT_BATCH_SIZE
+            
+        返回:
+        - AsyncIterator[Sequence[ModelType]]: 逐批产出的对象列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        try:
+            conditions = await self.__build_conditions(**search) if search else []
+            order = order_by or [{'id': 'asc'}]
+            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
+            for opt in self.__loader_options(preload):
+                sql = sql.options(opt)
+            sql = await self.__filter_permissions(sql)
+            sql = sql.execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE)
+            result = await self.auth.db.stream_scalars(sql)
+        except Exception as e:
+            raise CustomException(msg=f"列表查询失败: {str(e)}")
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
     async def tree_list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, children_attr: str = 'children', preload: Optional[List[Union[str, Any]]] = None) -> Sequence[ModelType]:
         """
         获取树形结构数据列表
@@ -133,7 +176,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"树形列表查询失败: {str(e)}")
     
-    async def page(self, offset: int, limit: int, order_by: List[Dict[str, str]], search: Dict, out_schema: Type[OutSchemaType], preload: Optional[List[Union[str, Any]]] = None) -> Dict:
+    async def page(self, offset: int, limit: int, order_by: List[Dict[str, str]], search: Dict, out_schema: Type[OutSchemaType], preload: Optional[List[Union[str, Any]]] = None, cursor: Optional[str] = None, with_total: bool = True) -> Dict:
         """
         获取分页数据
         
@@ -144,6 +187,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         - search (Dict): 查询条件
         - out_schema (Type[OutSchemaType]): 输出数据模型
         - preload (Optional[List[Union[str, Any]]]): 预加载关系
+        - cursor (Optional[str]): 游标分页标识，None 使用偏移分页，空字符串为游标分页首页
+        - with_total (bool): 游标分页时是否统计总数（偏移分页始终统计）
             
         返回:
         - Dict: 分页数据
@@ -154,28 +199,27 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             conditions = await self.__build_conditions(**search) if search else []
             order = order_by or [{'id': 'asc'}]
+
+            if cursor is not None:
+                # 游标分页：基于 (排序字段, 主键) 定位，避免深分页的 OFFSET 扫描
+                objs, next_cursor = await self.__cursor_objs(conditions=conditions, order_by=order, limit=limit, cursor=cursor, preload=preload)
+                total = await self.__count(conditions) if with_total else None
+                return {
+                    "page_no": None,
+                    "page_size": limit,
+                    "total": total,
+                    "has_next": next_cursor is not None,
+                    "next_cursor": next_cursor,
+                    "items": [out_schema.model_validate(obj).model_dump() for obj in objs]
+                }
+
             sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
             # 应用预加载选项
             for opt in self.__loader_options(preload):
                 sql = sql.options(opt)
             sql = await self.__filter_permissions(sql)
 
-            # 优化count查询：使用主键计数而非全表扫描
-            mapper = sa_inspect(self.model)
-            pk_cols = list(getattr(mapper, "primary_key", []))
-            if pk_cols:
-                # 使用主键的第一列进行计数（主键必定非NULL，性能更好）
-                count_sql = select(func.count(pk_cols[0])).select_from(self.model)
-            else:
-                # 降级方案：使用count(*)
-                count_sql = select(func.count()).select_from(self.model)
-            
-            if conditions:
-                count_sql = count_sql.where(*conditions)
-            count_sql = await self.__filter_permissions(count_sql)
-            
-            total_result = await self.auth.db.execute(count_sql)
-            total = total_result.scalar() or 0
+            total = await self.__count(conditions)
 
             result: Result = await self.auth.db.execute(sql.offset(offset).limit(limit))
             objs = result.scalars().all()
@@ -221,6 +265,123 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"创建失败: {str(e)}")
 
+    async def bulk_create(self, data: Sequence[Union[CreateSchemaType, Dict]], chunk_size: Optional[int] = None, refresh: bool = False) -> Union[List[int], Sequence[ModelType]]:
+        """
+        批量创建对象(每个分块一条多行 INSERT，不逐行 flush/refresh)
+        
+        参数:
+        - data (Sequence[Union[CreateSchemaType, Dict]]): 对象属性列表
+        - chunk_size (Optional[int]): 每条语句的行数，默认 BULK_CHUNK_SIZE
+        - refresh (bool): 是否返回重新查询的对象实例，默认只返回主键
+            
+        返回:
+        - Union[List[int], Sequence[ModelType]]: 与输入顺序一致的主键列表，或 refresh 时的对象列表
+            
+        异常:
+        - CustomException: 创建失败时抛出异常
+        """
+        try:
+            rows = self.__bulk_rows(data)
+            ids: List[int] = []
+            for chunk in self.__chunks(rows, chunk_size):
+                ids.extend(await self.__bulk_execute(insert(self.model), chunk, key_fields=["uuid"]))
+            return await self.__bulk_refresh(ids) if refresh else ids
+        except Exception as e:
+            raise CustomException(msg=f"批量创建失败: {str(e)}")
+
+    async def bulk_upsert(self, data: Sequence[Union[CreateSchemaType, Dict]], conflict_keys: List[str], update_fields: Optional[List[str]] = None, chunk_size: Optional[int] = None, refresh: bool = False) -> Union[List[int], Sequence[ModelType]]:
+        """
+        批量插入或更新对象(MySQL: INSERT ... ON DUPLICATE KEY UPDATE；PostgreSQL/SQLite: INSERT ... ON CONFLICT DO UPDATE)
+        
+        不经过数据权限过滤，调用方需先确认冲突行可被当前用户修改。
+        MySQL 按任意唯一索引判断冲突，conflict_keys 仅用于回查主键；PostgreSQL/SQLite 中 conflict_keys 须对应唯一索引。
+        
+        参数:
+        - data (Sequence[Union[CreateSchemaType, Dict]]): 对象属性列表
+        - conflict_keys (List[str]): 判断冲突的唯一字段
+        - update_fields (Optional[List[str]]): 冲突时更新的字段，默认为除主键、uuid、创建信息和冲突字段外的全部输入字段
+        - chunk_size (Optional[int]): 每条语句的行数，默认 BULK_CHUNK_SIZE
+        - refresh (bool): 是否返回重新查询的对象实例，默认只返回主键
+            
+        返回:
+        - Union[List[int], Sequence[ModelType]]: 与输入顺序一致的主键列表，或 refresh 时的对象列表
+            
+        异常:
+        - CustomException: 数据库不支持或执行失败时抛出异常
+        """
+        try:
+            rows = self.__bulk_rows(data)
+            if not rows:
+                return []
+            if update_fields is None:
+                protected = {"id", "uuid", "created_id", "created_time", *conflict_keys}
+                update_fields = [key for key in rows[0] if key not in protected]
+            # ON CONFLICT/ON DUPLICATE KEY 分支不会执行 Python 端 onupdate，需显式更新修改信息
+            update_fields = list(dict.fromkeys(update_fields))
+            audit = {}
+            if hasattr(self.model, "updated_time"):
+                audit["updated_time"] = datetime.now()
+            if self.auth.user and hasattr(self.model, "updated_id"):
+                audit["updated_id"] = self.auth.user.id
+
+            dialect = self.auth.db.get_bind().dialect.name
+            if dialect in ("mysql", "mariadb"):
+                sql = mysql.insert(self.model)
+                sql = sql.on_duplicate_key_update({
+                    **{field: sql.inserted[field] for field in update_fields},
+                    **audit,
+                })
+            elif dialect in ("postgresql", "sqlite"):
+                sql = (postgresql if dialect == "postgresql" else sqlite).insert(self.model)
+                sql = sql.on_conflict_do_update(
+                    index_elements=[getattr(self.model, key) for key in conflict_keys],
+                    set_={**{field: sql.excluded[field] for field in update_fields}, **audit},
+                )
+            else:
+                raise CustomException(msg=f"数据库 {dialect} 不支持批量 upsert")
+            ids: List[int] = []
+            for chunk in self.__chunks(rows, chunk_size):
+                ids.extend(await self.__bulk_execute(sql, chunk, key_fields=conflict_keys))
+            return await self.__bulk_refresh(ids) if refresh else ids
+        except CustomException:
+            raise
+        except Exception as e:
+            raise CustomException(msg=f"批量upsert失败: {str(e)}")
+
+    async def bulk_update(self, data: Sequence[Dict], update_fields: List[str], chunk_size: Optional[int] = None) -> int:
+        """
+        按主键批量更新对象(ORM 按主键批量 UPDATE，每个分块一次 executemany，不写入未列出的字段)
+        
+        不经过数据权限过滤，调用方需先确认这些行可被当前用户修改。
+        
+        参数:
+        - data (Sequence[Dict]): 对象属性列表，每项须包含主键
+        - update_fields (List[str]): 更新的字段
+        - chunk_size (Optional[int]): 每次执行的行数，默认 BULK_CHUNK_SIZE
+            
+        返回:
+        - int: 更新的行数
+            
+        异常:
+        - CustomException: 更新失败时抛出异常
+        """
+        try:
+            pk = sa_inspect(self.model).primary_key[0].key
+            audit = {}
+            if hasattr(self.model, "updated_time"):
+                audit["updated_time"] = datetime.now()
+            if self.auth.user and hasattr(self.model, "updated_id"):
+                audit["updated_id"] = self.auth.user.id
+            rows = [
+                {pk: item[pk], **{field: item[field] for field in update_fields if field in item}, **audit}
+                for item in data
+            ]
+            for chunk in self.__chunks(rows, chunk_size):
+                await self.auth.db.execute(update(self.model), chunk)
+            return len(rows)
+        except Exception as e:
+            raise CustomException(msg=f"批量更新失败: {str(e)}")
+
     async def update(self, id: int, data: Union[UpdateSchemaType, Dict]) -> ModelType:
         """
         更新对象
@@ -331,6 +492,66 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"批量更新失败: {str(e)}")
 
+    def __bulk_rows(self, data: Sequence[Union[CreateSchemaType, Dict]]) -> List[Dict]:
+        """
+        转换批量写入的行，补充创建/修改人与 uuid(用于不支持 RETURNING 的数据库回查主键)
+        """
+        rows = []
+        has_uuid = "uuid" in self.model.__table__.c
+        for item in data:
+            row = dict(item) if isinstance(item, dict) else item.model_dump()
+            if self.auth.user:
+                if hasattr(self.model, "created_id"):
+                    row.setdefault("created_id", self.auth.user.id)
+                if hasattr(self.model, "updated_id"):
+                    row.setdefault("updated_id", self.auth.user.id)
+            if has_uuid and not row.get("uuid"):
+                row["uuid"] = uuid4_str()
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def __chunks(rows: List[Dict], chunk_size: Optional[int] = None) -> List[List[Dict]]:
+        """按 chunk_size 切分行"""
+        size = chunk_size or settings.BULK_CHUNK_SIZE
+        return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    async def __bulk_execute(self, sql: Any, rows: List[Dict], key_fields: List[str]) -> List[int]:
+        """
+        执行一个分块并返回与输入顺序一致的主键
+        
+        支持 executemany RETURNING 的数据库(PostgreSQL/SQLite/MariaDB)直接返回主键；
+        MySQL 执行后按 key_fields 回查。
+        """
+        pk = sa_inspect(self.model).primary_key[0]
+        dialect = self.auth.db.get_bind().dialect
+        if dialect.insert_executemany_returning:
+            result = await self.auth.db.execute(sql.returning(pk, sort_by_parameter_order=True), rows)
+            return list(result.scalars().all())
+
+        await self.auth.db.execute(sql, rows)
+        key_fields = [key for key in key_fields if all(row.get(key) is not None for row in rows)]
+        if not key_fields:
+            return []
+        cols = [getattr(self.model, key) for key in key_fields]
+        values = [tuple(row[key] for key in key_fields) for row in rows]
+        if len(cols) == 1:
+            condition = cols[0].in_([value[0] for value in values])
+        else:
+            condition = tuple_(*cols).in_(values)
+        result = await self.auth.db.execute(select(pk, *cols).where(condition))
+        mapping = {tuple(item)[1:]: item[0] for item in result.all()}
+        return [mapping[value] for value in values if value in mapping]
+
+    async def __bulk_refresh(self, ids: List[int]) -> Sequence[ModelType]:
+        """按主键重新查询批量写入的对象(保持输入顺序)"""
+        pk = sa_inspect(self.model).primary_key[0]
+        objs = {}
+        for i in range(0, len(ids), 1000):
+            result = await self.auth.db.execute(select(self.model).where(pk.in_(ids[i:i + 1000])).execution_options(populate_existing=True))
+            objs.update({getattr(obj, pk.key): obj for obj in result.scalars().all()})
+        return [objs[id] for id in ids if id in objs]
+
     async def __filter_permissions(self, sql: Select) -> Select:
         """
         过滤数据权限（仅用于Select）。
@@ -341,6 +562,170 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return await filter.filter_query(sql)
 
+    async def __count(self, conditions: List[ColumnElement]) -> int:
+        """
+        统计符合条件且有权限的记录数
+        
+        参数:
+        - conditions (List[ColumnElement]): 查询条件
+            
+        返回:
+        - int: 记录总数
+        """
+        # 优化count查询：使用主键计数而非全表扫描
+        mapper = sa_inspect(self.model)
+        pk_cols = list(getattr(mapper, "primary_key", []))
+        if pk_cols:
+            # 使用主键的第一列进行计数（主键必定非NULL，性能更好）
+            count_sql = select(func.count(pk_cols[0])).select_from(self.model)
+        else:
+            # 降级方案：使用count(*)
+            count_sql = select(func.count()).select_from(self.model)
+        
+        if conditions:
+            count_sql = count_sql.where(*conditions)
+        count_sql = await self.__filter_permissions(count_sql)
+        
+        total_result = await self.auth.db.execute(count_sql)
+        return total_result.scalar() or 0
+
+    async def __cursor_objs(self, conditions: List[ColumnElement], order_by: List[Dict[str, str]], limit: int, cursor: str, preload: Optional[List[Union[str, Any]]] = None) -> Tuple[Sequence[ModelType], Optional[str]]:
+        """
+        游标（keyset）分页查询
+        
+        排序字段末尾自动追加主键作为唯一定位列，下一页条件为
+        (排序字段, 主键) 严格位于上一页最后一条记录之后，查询耗时与页码无关。
+        
+        参数:
+        - conditions (List[ColumnElement]): 查询条件
+        - order_by (List[Dict[str, str]]): 排序字段
+        - limit (int): 每页数量
+        - cursor (str): 上一页返回的游标，空字符串表示首页
+        - preload (Optional[List[Union[str, Any]]]): 预加载关系
+            
+        返回:
+        - Tuple[Sequence[ModelType], Optional[str]]: 当前页对象列表与下一页游标（无下一页时为None）
+            
+        异常:
+        - CustomException: 游标非法或排序字段不支持游标分页时抛出异常
+        """
+        mapper = sa_inspect(self.model)
+        pk_cols = list(getattr(mapper, "primary_key", []))
+        if len(pk_cols) != 1:
+            raise CustomException(msg="游标分页仅支持单一主键模型")
+        pk_name = pk_cols[0].key
+
+        keys: List[Tuple[str, str]] = []
+        for order in order_by:
+            for field, direction in order.items():
+                if not hasattr(self.model, field):
+                    raise CustomException(msg=f"排序字段不存在: {field}")
+                keys.append((field, 'desc' if direction.lower() == 'desc' else 'asc'))
+        if pk_name not in [field for field, _ in keys]:
+            keys.append((pk_name, keys[-1][1] if keys else 'asc'))
+
+        columns = [getattr(self.model, field) for field, _ in keys]
+        nullable = [bool(getattr(mapper.columns.get(field), "nullable", False)) for field, _ in keys]
+        ordering = []
+        for column, (_, direction), is_nullable in zip(columns, keys, nullable):
+            if is_nullable:
+                # 可空字段空值统一排在最后(MySQL 不支持 NULLS LAST，以 IS NULL 排序代替)
+                ordering.append(asc(column.is_(None)))
+            ordering.append(desc(column) if direction == 'desc' else asc(column))
+        sql = select(self.model).where(*conditions).order_by(*ordering)
+
+        if cursor:
+            values = self.__decode_cursor(cursor, keys)
+            directions = {direction for _, direction in keys}
+            if len(directions) == 1 and not any(nullable):
+                # 排序方向一致且无可空字段时使用行值比较，可直接命中 (排序字段, 主键) 联合索引
+                row, last = tuple_(*columns), tuple_(*values)
+                sql = sql.where(row < last if 'desc' in directions else row > last)
+            else:
+                # 展开为 (c1 在 v1 之后) OR (c1 = v1 AND c2 在 v2 之后) ...，空值排在最后
+                afters, equals = [], []
+                for column, (_, direction), value, is_nullable in zip(columns, keys, values, nullable):
+                    if value is None:
+                        afters.append(false())
+                        equals.append(column.is_(None))
+                        continue
+                    after = column < value if direction == 'desc' else column > value
+                    afters.append(or_(after, column.is_(None)) if is_nullable else after)
+                    equals.append(column == value)
+                sql = sql.where(or_(*[and_(*equals[:i], after) for i, after in enumerate(afters)]))
+
+        for opt in self.__loader_options(preload):
+            sql = sql.options(opt)
+        sql = await self.__filter_permissions(sql)
+
+        # 多取一条用于判断是否存在下一页，避免额外的 COUNT 查询
+        result: Result = await self.auth.db.execute(sql.limit(limit + 1))
+        objs = result.scalars().all()
+        if len(objs) <= limit:
+            return objs, None
+        objs = objs[:limit]
+        return objs, self.__encode_cursor(objs[-1], keys)
+
+    def __encode_cursor(self, obj: ModelType, keys: List[Tuple[str, str]]) -> str:
+        """
+        将最后一条记录的排序字段值编码为不透明游标
+        
+        参数:
+        - obj (ModelType): 当前页最后一条记录
+        - keys (List[Tuple[str, str]]): 排序字段及方向
+            
+        返回:
+        - str: base64 编码的游标
+        """
+        values = []
+        for field, _ in keys:
+            value = getattr(obj, field)
+            if isinstance(value, datetime):
+                values.append({"dt": value.isoformat()})
+            elif isinstance(value, date):
+                values.append({"d": value.isoformat()})
+            elif isinstance(value, Decimal):
+                values.append({"dec": str(value)})
+            else:
+                values.append(value)
+        payload = json.dumps({"k": keys, "v": values}, ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def __decode_cursor(self, cursor: str, keys: List[Tuple[str, str]]) -> List[Any]:
+        """
+        解析游标为排序字段值列表
+        
+        参数:
+        - cursor (str): base64 编码的游标
+        - keys (List[Tuple[str, str]]): 当前请求的排序字段及方向
+            
+        返回:
+        - List[Any]: 排序字段值列表
+            
+        异常:
+        - CustomException: 游标非法或与当前排序不一致时抛出异常
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            cursor_keys = [tuple(key) for key in payload["k"]]
+            raw_values = payload["v"]
+        except Exception:
+            raise CustomException(msg="游标无效")
+        if cursor_keys != keys or len(raw_values) != len(keys):
+            raise CustomException(msg="游标与当前排序条件不一致")
+
+        values = []
+        for value in raw_values:
+            if isinstance(value, dict) and "dt" in value:
+                values.append(datetime.fromisoformat(value["dt"]))
+            elif isinstance(value, dict) and "d" in value:
+                values.append(date.fromisoformat(value["d"]))
+            elif isinstance(value, dict) and "dec" in value:
+                values.append(Decimal(value["dec"]))
+            else:
+                values.append(value)
+        return values
+
     async def __build_conditions(self, **kwargs) -> List[ColumnElement]:
         """
         构建查询条件
@@ -447,3 +832,55 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 options.append(opt)
                 
         return options
+
+
+# ------------------------------------------------------------------ #
+# 缓存失效钩子: 收集每次 flush / 批量 DML 涉及的表，
+# 交由 ServiceCache 在事务提交后递增版本号并广播给所有 worker
+# ------------------------------------------------------------------ #
+_invalidate_tasks: set[asyncio.Task] = set()
+
+
+def _mark_tags(session: Session, tables: set[str]) -> None:
+    """登记表级标签。不在事件循环中(同步脚本、线程池)时不广播"""
+    tables = tables.difference(settings.CACHE_INVALIDATION_EXCLUDE_TABLES)
+    if not tables:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if not ServiceCache.mark(session, tables):
+        task = loop.create_task(ServiceCache.publish(tables))
+        _invalidate_tasks.add(task)
+        task.add_done_callback(_invalidate_tasks.discard)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush_tags(session: Session, flush_context: UOWTransaction) -> None:
+    """ORM 对象写入: 新增、修改、删除的对象所在表，以及变更的多对多关联表"""
+    tables: set[str] = set()
+    for obj in session.new:
+        tables.add(sa_inspect(obj).mapper.local_table.name)
+    for obj in session.deleted:
+        tables.add(sa_inspect(obj).mapper.local_table.name)
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        state = sa_inspect(obj)
+        tables.add(state.mapper.local_table.name)
+        for rel in state.mapper.relationships:
+            if rel.secondary is not None and attributes.get_history(obj, rel.key).has_changes():
+                tables.add(rel.secondary.name)
+    _mark_tags(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tags(orm_execute_state: ORMExecuteState) -> None:
+    """批量 INSERT/UPDATE/DELETE: 按语句的目标表失效"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is None or not hasattr(table, "name"):
+        return
+    _mark_tags(orm_execute_state.session, {table.name})
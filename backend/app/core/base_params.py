@@ -14,6 +14,8 @@ class PaginationQueryParam:
         page_no: int = Query(default=1, description="当前页码", ge=1),
         page_size: int = Query(default=10, description="每页数量", ge=1, le=100), 
         order_by: str | None = Query(default=None, description="排序字段,格式:[{'field1': 'asc'}, {'field2': 'desc'}]"),
+        cursor: str | None = Query(default=None, description="游标分页标识,传入后启用游标分页(首页传空字符串,后续传上一页返回的next_cursor)"),
+        with_total: bool = Query(default=False, description="游标分页时是否统计总数"),
     ) -> None:
         """
         初始化分页查询参数。
@@ -22,12 +24,16 @@ class PaginationQueryParam:
         - page_no (int | None): 当前页码，默认 None。
         - page_size (int | None): 每页数量，默认 None，最大 100。
         - order_by (str | None): 排序字段，格式 'field,asc;field2,desc'。
+        - cursor (str | None): 游标分页标识，None 表示使用偏移分页，空字符串表示游标分页首页。
+        - with_total (bool): 游标分页时是否额外执行 COUNT 查询，偏移分页始终统计总数。
         
         返回:
         - None
         """
         self.page_no = page_no
         self.page_size = page_size
+        self.cursor = cursor
+        self.with_total = with_total
         # 将字符串格式的order_by转换为服务层需要的List[Dict[str, str]]格式
         if order_by:
             try:
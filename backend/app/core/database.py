@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+from typing import Awaitable, Callable
 from redis.asyncio import Redis
 from redis import exceptions
 from fastapi import FastAPI
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, Engine, event
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
 from app.core.logger import log
@@ -94,6 +96,49 @@ def create_async_engine_and_session(
 engine, db_session = create_engine_and_session(settings.DB_URI)
 async_engine, async_db_session = create_async_engine_and_session(settings.ASYNC_DB_URI)
 
+# 事务提交后执行的回调（按名称去重），以及防止被回收的后台任务引用
+AFTER_COMMIT_KEY = "after_commit_callbacks"
+_after_commit_tasks: set[asyncio.Task] = set()
+
+
+def run_after_commit(db: AsyncSession | None, name: str, callback: Callable[[], Awaitable[None]]) -> bool:
+    """
+    注册在当前事务提交后执行的异步回调（回滚则丢弃）。
+
+    用于缓存失效广播等必须在数据可见后才能通知其它 worker 的场景。
+    
+    参数:
+    - db (AsyncSession | None): 当前数据库会话。
+    - name (str): 回调名称，同一事务内同名回调只执行一次。
+    - callback (Callable[[], Awaitable[None]]): 无参异步回调。
+    
+    返回:
+    - bool: 是否已延迟到提交后执行；会话不存在或不在事务中时返回False，由调用方立即执行。
+    """
+    if db is None or not db.in_transaction():
+        return False
+    db.info.setdefault(AFTER_COMMIT_KEY, {})[name] = callback
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    """事务提交后调度已注册的回调"""
+    callbacks = session.info.pop(AFTER_COMMIT_KEY, None)
+    if not callbacks:
+        return
+    loop = asyncio.get_running_loop()
+    for callback in callbacks.values():
+        task = loop.create_task(callback())
+        _after_commit_tasks.add(task)
+        task.add_done_callback(_after_commit_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    """事务回滚后丢弃已注册的回调"""
+    session.info.pop(AFTER_COMMIT_KEY, None)
+
 async def redis_connect(app: FastAPI, status: str) -> Redis | None:
     """
     创建或关闭Redis连接。
@@ -132,5 +177,5 @@ async def redis_connect(app: FastAPI, status: str) -> Redis | None:
             log.error(f"❌ 数据库 Redis 连接错误: {e}")
             raise
     else:
-        await app.state.redis.close()
+        await app.state.redis.aclose()
         log.info('✅️ Redis连接已关闭')
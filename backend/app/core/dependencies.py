@@ -12,7 +12,9 @@ from app.common.enums import RedisInitKeyConfig
 from app.core.exceptions import CustomException
 from app.core.database import async_db_session
 from app.core.redis_crud import RedisCURD
-from app.core.security import OAuth2Schema, decode_access_token
+from app.core.auth_cache import AuthUserCache, RolePermissionCache
+from app.config.setting import settings
+from app.core.security import OAuth2Schema, get_scope_token_payload
 from app.core.logger import log
 
 from app.api.v1.module_system.user.model import UserModel
@@ -65,7 +67,8 @@ async def get_current_user(
     if token.startswith('Bearer'):
         token = token.split(' ')[1]
 
-    payload = decode_access_token(token)
+    # 复用中间件已解析的结果，避免重复解码
+    payload = get_scope_token_payload(request.scope, token)
     if not payload or not hasattr(payload, 'is_refresh') or payload.is_refresh:
         raise CustomException(msg="非法凭证", code=10401, status_code=401)
         
@@ -77,40 +80,56 @@ async def get_current_user(
     if not session_id:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
-    # 检查用户是否在线
-    online_ok = await RedisCURD(redis).exists(key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
-    if not online_ok:
+    username = user_info.get("user_name")
+    if not username:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
     # 关闭数据权限过滤，避免当前用户查询被拦截
     auth = AuthSchema(db=db, check_data_scope=False)
-    username = user_info.get("user_name")
-    if not username:
+    token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
+
+    # 检查用户是否在线，并尝试读取用户快照缓存（同一次Redis往返）
+    snapshot = None
+    if settings.AUTH_USER_CACHE_ENABLE:
+        online_ok, snapshot = await AuthUserCache.check_online_and_get(redis=redis, token_key=token_key, username=username)
+    else:
+        online_ok = await RedisCURD(redis).exists(key=token_key)
+    if not online_ok:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
-    # 获取用户信息，使用深层预加载确保RoleModel.creator被正确加载
-    user = await UserCRUD(auth).get_by_username_crud(
-        username=username, 
-        preload=[
-            "dept", 
-            selectinload(UserModel.roles),
-            "positions", 
-            "created_by"
-        ]
-    )
-    if not user:
-        raise CustomException(msg="用户不存在", code=10401, status_code=401)
+
+    if snapshot is not None:
+        user = AuthUserCache.load(snapshot)
+    else:
+        # 查询前记录缓存版本号，查询期间发生失效时不回写缓存
+        cache_version = AuthUserCache.current_version()
+        # 获取用户信息，使用深层预加载确保RoleModel.creator被正确加载
+        user = await UserCRUD(auth).get_by_username_crud(
+            username=username, 
+            preload=[
+                "dept", 
+                selectinload(UserModel.roles),
+                "positions", 
+                "created_by"
+            ]
+        )
+        if not user:
+            raise CustomException(msg="用户不存在", code=10401, status_code=401)
+
+        # 过滤可用的角色和职位
+        if hasattr(user, 'roles'):
+            user.roles = [role for role in user.roles if role and role.status]
+        if hasattr(user, 'positions'):
+            user.positions = [pos for pos in user.positions if pos and pos.status]
+
+        if settings.AUTH_USER_CACHE_ENABLE:
+            await AuthUserCache.set(redis=redis, user=user, version=cache_version)
+
     if not user.status:
         raise CustomException(msg="用户已被停用", code=10401, status_code=401)
     
     # 设置请求上下文
     request.scope["user_id"] = user.id
     request.scope["user_username"] = user.username
-    
-    # 过滤可用的角色和职位
-    if hasattr(user, 'roles'):
-        user.roles = [role for role in user.roles if role and role.status]
-    if hasattr(user, 'positions'):
-        user.positions = [pos for pos in user.positions if pos and pos.status]
 
     auth.user = user
     return auth
@@ -130,12 +149,13 @@ class AuthPermission:
         self.permissions = permissions or []
         self.check_data_scope = check_data_scope
 
-    async def __call__(self, auth: AuthSchema = Depends(get_current_user)) -> AuthSchema:
+    async def __call__(self, auth: AuthSchema = Depends(get_current_user), redis: Redis = Depends(redis_getter)) -> AuthSchema:
         """
         调用权限验证
         
         参数:
         - auth (AuthSchema): 认证信息对象。
+        - redis (Redis): Redis连接。
         
         返回:
         - AuthSchema: 认证信息对象。
@@ -158,16 +178,12 @@ class AuthPermission:
         if not auth.user or not auth.user.roles:
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
         
-        # 获取用户权限集合
-        user_permissions = {
-            menu.permission 
-            for role in auth.user.roles
-            for menu in role.menus 
-            if role.status and menu.permission and menu.status
-        }
+        # 获取各角色预计算的权限标识集合
+        roles = [role for role in auth.user.roles if role.status]
+        role_permissions = await RolePermissionCache.get(redis=redis, roles=roles)
 
         # 权限验证 - 满足任一权限即可
-        if not any(perm in user_permissions for perm in self.permissions):
+        if not any(perm in perms for perms in role_permissions for perm in self.permissions):
             log.error(f"用户缺少任何所需的权限: {self.permissions}")
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
 
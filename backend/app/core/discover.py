@@ -6,6 +6,9 @@
 - 仅扫描 `app.api.v1` 包内，顶级目录以 `module_` 开头的模块。
 - 在各模块任意子目录下的 `controller.py` 中定义的 `APIRouter` 实例会自动被注册。
 - 顶级目录 `module_xxx` 会映射为容器路由前缀 `/<xxx>`。
+- 可通过 `python main.py build-routes` 生成路由清单(模块路径、容器前缀、路由变量名)，
+  非开发环境启动时按清单直接导入并注册，跳过模块属性遍历；清单记录应用版本与控制器文件指纹(相对路径 + 修改时间)，
+  新增、删除或修改控制器以及清单失效时自动回退为扫描。
 
 设计目标：
 - 稳定、可预测：有序扫描与注册，确定性日志输出。
@@ -16,15 +19,23 @@
 
 from __future__ import annotations
 
+import hashlib
 import importlib
+import json
 from enum import Enum
 from pathlib import Path
 from typing import Callable, Iterable, Any
 from functools import wraps
 from fastapi import APIRouter
 
+from app.common.enums import EnvironmentEnum
+from app.config.path_conf import ROUTE_MANIFEST_FILE
+from app.config.setting import settings
 from app.core.logger import log
 
+# 路由清单格式版本，结构变化时递增
+MANIFEST_VERSION = 2
+
 
 def _log_error_handling(func: Callable) -> Callable:
     """错误处理装饰器，用于统一捕获和记录方法执行过程中的异常"""
@@ -67,7 +78,8 @@ class DiscoverRouter:
         exclude_dirs: set[str] | None = None,
         exclude_files: set[str] | None = None,
         auto_discover: bool = True,
-        debug: bool = False
+        debug: bool = False,
+        manifest_file: Path | None = None
     ) -> None:
         """
         初始化路由发现注册器
@@ -80,6 +92,7 @@ class DiscoverRouter:
         - exclude_files: 排除的文件集合
         - auto_discover: 是否在初始化时自动执行发现和注册，默认为 True
         - debug: 是否启用调试模式，在调试模式下会输出更详细的错误信息，默认为 False
+        - manifest_file: 路由清单文件，存在时按清单注册路由，默认为 None(始终扫描)
         """
         self.module_prefix = module_prefix
         self.base_package = base_package
@@ -87,8 +100,10 @@ class DiscoverRouter:
         self.exclude_dirs = exclude_dirs or set()
         self.exclude_files = exclude_files or set()
         self.debug = debug
+        self.manifest_file = manifest_file
         self._router = APIRouter()
         self._seen_router_ids: set[int] = set()
+        self._manifest_entries: list[dict[str, Any]] = []
         self._discovery_stats: dict[str, int] = {
             "scanned_files": 0,
             "imported_modules": 0,
@@ -157,19 +172,24 @@ class DiscoverRouter:
         return prefix
     
     @_log_error_handling
-    def _include_module_routers(self, mod: object, container: APIRouter) -> int:
-        """将模块中的所有 `APIRouter` 实例包含到指定容器路由中。
+    def _include_module_routers(self, mod: object, container: APIRouter, names: list[str] | None = None) -> list[str]:
+        """将模块中的 `APIRouter` 实例包含到指定容器路由中。
+
+        参数:
+        - mod: 控制器模块
+        - container: 容器路由
+        - names: 路由变量名列表(来自路由清单)，为空时遍历模块属性查找
 
         返回:
-        - int: 新增注册的路由数量
+        - list[str]: 新增注册的路由变量名
         """
         from fastapi import APIRouter as _APIRouter
 
-        added = 0
+        added: list[str] = []
         mod_name = getattr(mod, "__name__", "<unknown>")
         router_count = 0
         
-        for attr_name in dir(mod):
+        for attr_name in (names if names is not None else dir(mod)):
             attr = getattr(mod, attr_name, None)
             if isinstance(attr, _APIRouter):
                 router_count += 1
@@ -180,18 +200,156 @@ class DiscoverRouter:
                 
                 self._seen_router_ids.add(rid)
                 container.include_router(attr)
-                added += 1
+                added.append(attr_name)
                 log.info(f"➕ 注册路由 {attr_name} 到容器")
+            elif names is not None:
+                raise AttributeError(f"路由清单中的 {attr_name} 在模块 {mod_name} 中不存在")
         
         if router_count == 0:
             log.warning(f"⚠️ 模块 {mod_name} 中未发现 APIRouter 实例")
         
         return added
+
+    def _scan_entries(self) -> list[dict[str, Any]]:
+        """扫描控制器文件，生成待注册条目(模块路径、容器前缀)。"""
+        base_dir, base_pkg = self._get_base_dir_and_pkg()
+        entries: list[dict[str, Any]] = []
+        for file in self._iter_controller_files(base_dir):
+            rel_path = file.relative_to(base_dir).as_posix()
+
+            if rel_path in self.exclude_files:
+                log.warning(f"⚠️ 文件 {rel_path} 被排除")
+                continue
+
+            parts = file.relative_to(base_dir).parts
+            if len(parts) < 2:
+                log.warning(f"⚠️ 文件路径不完整: {rel_path}，跳过")
+                continue
+
+            prefix = self._resolve_prefix(parts[0])
+            if not prefix:
+                continue
+
+            # 拼接模块导入路径
+            mod_path = ".".join((base_pkg,) + tuple(parts[:-1]) + ("controller",))
+            entries.append({"path": rel_path, "module": mod_path, "prefix": prefix, "routers": None})
+        return entries
+
+    def _fingerprint(self) -> str:
+        """控制器文件指纹(相对路径 + 修改时间)，新增、删除或修改控制器后改变。"""
+        base_dir, _ = self._get_base_dir_and_pkg()
+        digest = hashlib.sha1()
+        for file in self._iter_controller_files(base_dir):
+            digest.update(f"{file.relative_to(base_dir).as_posix()}:{file.stat().st_mtime_ns}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_manifest(self) -> list[dict[str, Any]] | None:
+        """读取路由清单，不存在、版本或基础包不匹配、应用版本或控制器文件变化时返回 None。"""
+        if not self.manifest_file or not self.manifest_file.exists():
+            return None
+        try:
+            manifest = json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except Exception as e:
+            log.warning(f"⚠️ 路由清单读取失败，改为扫描注册: {str(e)}")
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("base_package") != self.base_package:
+            log.warning(f"⚠️ 路由清单版本或基础包不匹配，改为扫描注册: {self.manifest_file}")
+            return None
+        if manifest.get("app_version") != settings.VERSION or manifest.get("fingerprint") != self._fingerprint():
+            log.warning(f"⚠️ 应用版本或控制器文件已变化，路由清单过期，改为扫描注册: {self.manifest_file}")
+            return None
+        log.info(f"📜 使用路由清单: {self.manifest_file}")
+        return manifest.get("routes", [])
+
+    def write_manifest(self, manifest_file: Path | None = None) -> Path:
+        """将本次扫描注册的结果写入路由清单。
+
+        参数:
+        - manifest_file: 清单文件路径，默认为初始化时指定的路径
+
+        返回:
+        - Path: 清单文件路径
+        """
+        path = manifest_file or self.manifest_file or ROUTE_MANIFEST_FILE
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "base_package": self.base_package,
+            "app_version": settings.VERSION,
+            "fingerprint": self._fingerprint(),
+            "routes": self._manifest_entries,
+        }
+        path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        log.info(f"📜 路由清单已生成: {path} ({len(self._manifest_entries)} 个控制器)")
+        return path
+
+    def _register_entries(self, entries: list[dict[str, Any]], strict: bool = False) -> dict[str, int]:
+        """导入控制器模块并注册到容器路由。
+
+        参数:
+        - entries: 待注册条目
+        - strict: 是否严格模式(按清单注册时导入失败直接抛出，由调用方回退为扫描)
+
+        返回:
+        - dict[str, int]: 统计信息
+        """
+        containers: dict[str, APIRouter] = {}
+        container_counts: dict[str, int] = {}
+        manifest_entries: list[dict[str, Any]] = []
+        imported_modules = 0
+        included_routers = 0
+
+        for entry in entries:
+            mod_path, prefix = entry["module"], entry["prefix"]
+            try:
+                mod = importlib.import_module(mod_path)
+                imported_modules += 1
+                log.info(f"📥 导入模块: {mod_path}")
+            except ModuleNotFoundError:
+                if strict:
+                    raise
+                log.error(f"❌️ 未找到控制器模块: {mod_path}")
+                continue
+            except ImportError as e:
+                if strict:
+                    raise
+                log.error(f"❌️ 导入控制器失败: {mod_path} -> {str(e)}")
+                continue
+
+            container = containers.setdefault(prefix, APIRouter(prefix=prefix))
+            try:
+                added = self._include_module_routers(mod, container, entry.get("routers"))
+                included_routers += len(added)
+                container_counts[prefix] = container_counts.get(prefix, 0) + len(added)
+                manifest_entries.append({**entry, "routers": added})
+            except Exception as e:
+                if strict:
+                    raise
+                log.error(f"❌️ 注册控制器路由失败: {mod_path} -> {str(e)}")
+
+        # 将容器路由按前缀名称排序后注册到根路由，保证顺序稳定
+        for prefix in sorted(containers.keys()):
+            container = containers[prefix]
+            rid = id(container)
+            if rid in self._seen_router_ids:
+                continue
+            self._seen_router_ids.add(rid)
+            self._router.include_router(container)
+            # 更丰富的注册日志（含路由数量）
+            count = container_counts.get(prefix, 0)
+            log.info(f"✅️ 已注册模块容器: {prefix} (路由数: {count})")
+
+        self._manifest_entries = manifest_entries
+        return {
+            "scanned_files": len(entries),
+            "imported_modules": imported_modules,
+            "included_routers": included_routers,
+            "container_count": len(containers)
+        }
     
     @_log_error_handling
     def discover_and_register(self) -> dict[str, int]:
         """
-        执行路由发现与注册
+        执行路由发现与注册(存在有效的路由清单时按清单注册)
         
         返回:
         - dict[str, int]: 包含发现统计信息的字典
@@ -201,81 +359,28 @@ class DiscoverRouter:
             - container_count: 容器数量
         """
         log.info("🚀 开始路由发现与注册...")
-        base_dir, base_pkg = self._get_base_dir_and_pkg()
-        containers: dict[str, APIRouter] = {}
-        container_counts: dict[str, int] = {}
-
-        scanned_files = 0
-        imported_modules = 0
-        included_routers = 0
 
         try:
-            for file in self._iter_controller_files(base_dir):
-                rel_path = file.relative_to(base_dir).as_posix()
-                scanned_files += 1
-
-                if rel_path in self.exclude_files:
-                    log.warning(f"⚠️ 文件 {rel_path} 被排除")
-                    continue
-
-                parts = file.relative_to(base_dir).parts
-                if len(parts) < 2:
-                    log.warning(f"⚠️ 文件路径不完整: {rel_path}，跳过")
-                    continue
-
-                top_module = parts[0]
-                prefix = self._resolve_prefix(top_module)
-                if not prefix:
-                    continue
-
-                # 拼接模块导入路径
-                mod_path = ".".join((base_pkg,) + tuple(parts[:-1]) + ("controller",))
+            stats = None
+            entries = self._load_manifest()
+            if entries is not None:
                 try:
-                    mod = importlib.import_module(mod_path)
-                    imported_modules += 1
-                    log.info(f"📥 导入模块: {mod_path}")
-                except ModuleNotFoundError:
-                    log.error(f"❌️ 未找到控制器模块: {mod_path}")
-                    continue
-                except ImportError as e:
-                    log.error(f"❌️ 导入控制器失败: {mod_path} -> {str(e)}")
-                    continue
-
-                container = containers.setdefault(prefix, APIRouter(prefix=prefix))
-                try:
-                    added = self._include_module_routers(mod, container)
-                    included_routers += added
-                    container_counts[prefix] = container_counts.get(prefix, 0) + added
+                    stats = self._register_entries(entries, strict=True)
                 except Exception as e:
-                    log.error(f"❌️ 注册控制器路由失败: {mod_path} -> {str(e)}")
-
-            # 将容器路由按前缀名称排序后注册到根路由，保证顺序稳定
-            for prefix in sorted(containers.keys()):
-                container = containers[prefix]
-                rid = id(container)
-                if rid in self._seen_router_ids:
-                    continue
-                self._seen_router_ids.add(rid)
-                self._router.include_router(container)
-                # 更丰富的注册日志（含路由数量）
-                count = container_counts.get(prefix, 0)
-                log.info(f"✅️ 已注册模块容器: {prefix} (路由数: {count})")
-
-            # 更新统计信息
-            stats = {
-                "scanned_files": scanned_files,
-                "imported_modules": imported_modules,
-                "included_routers": included_routers,
-                "container_count": len(containers)
-            }
+                    # 清单已过期(模块或路由变量被移除/重命名)，重置后改为扫描
+                    log.warning(f"⚠️ 路由清单已失效，改为扫描注册: {str(e)}")
+                    self._router = APIRouter()
+                    self._seen_router_ids.clear()
+            if stats is None:
+                stats = self._register_entries(self._scan_entries())
             self._discovery_stats = stats
 
             # 生成总结日志
             log.info(
                 (
-                    f"✅️ 路由发现完成: 扫描文件 {scanned_files}, "
-                    f"导入模块 {imported_modules}, 注册路由 {included_routers}, "
-                    f"容器 {len(containers)}"
+                    f"✅️ 路由发现完成: 扫描文件 {stats['scanned_files']}, "
+                    f"导入模块 {stats['imported_modules']}, 注册路由 {stats['included_routers']}, "
+                    f"容器 {stats['container_count']}"
                 )
             )
             
@@ -343,8 +448,10 @@ class DiscoverRouter:
             log.warning(f"⚠️ 路由已存在，跳过重复注册")
 
 
-# 创建默认实例并执行自动发现注册
-_discoverer = DiscoverRouter()
+# 创建默认实例并执行自动发现注册(开发环境代码频繁变化，始终扫描)
+_discoverer = DiscoverRouter(
+    manifest_file=ROUTE_MANIFEST_FILE if settings.ROUTE_MANIFEST_ENABLE and settings.ENVIRONMENT != EnvironmentEnum.DEV else None
+)
 
 # 保持向后兼容，导出原始的 router 变量
 router = _discoverer.router
@@ -2,19 +2,25 @@
 
 import json
 import time
+import zlib
 from starlette.middleware.cors import CORSMiddleware
-from starlette.types import ASGIApp
-from starlette.requests import Request
-from starlette.middleware.gzip import GZipMiddleware
-from starlette.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from app.common.response import ErrorResponse
 from app.config.setting import settings
 from app.core.logger import log
-from app.core.exceptions import CustomException
-from app.core.security import decode_access_token
-from app.api.v1.module_system.params.service import ParamsService
+from app.core.security import get_scope_token_payload
+from app.core.system_config import SystemConfigCache, SystemConfigSnapshot
 
 
 class CustomCORSMiddleware(CORSMiddleware):
@@ -30,175 +36,372 @@ class CustomCORSMiddleware(CORSMiddleware):
         )
 
 
-class RequestLogMiddleware(BaseHTTPMiddleware):
+def get_request_ip(scope: Scope) -> str | None:
+    """
+    获取客户端真实IP（优先 X-Forwarded-For 第一个地址）
+
+    参数:
+    - scope (Scope): ASGI scope
+
+    返回:
+    - str | None: 客户端IP
+    """
+    for name, value in scope.get("headers") or []:
+        if name == b"x-forwarded-for":
+            return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class RequestLogMiddleware:
     """
-    记录请求日志中间件: 提供一个基础的中间件类，允许你自定义请求和响应处理逻辑。
+    记录请求日志中间件(纯ASGI实现，不包装响应流，支持流式响应)
+
+    同时解析一次访问令牌并存入 scope，get_current_user 直接复用，避免重复解码JWT。
     """
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
 
     @staticmethod
-    def _extract_session_id_from_request(request: Request) -> str | None:
+    def _extract_session_id(scope: Scope) -> str | None:
         """
         从请求中提取session_id（支持从Token或已设置的scope中获取）
         
         参数:
-        - request (Request): 请求对象
+        - scope (Scope): ASGI scope
         
         返回:
         - str | None: 会话ID，如果无法提取则返回None
         """
         # 1. 先检查 scope 中是否已经有 session_id（登录接口会设置）
-        session_id = request.scope.get('session_id')
+        session_id = scope.get('session_id')
         if session_id:
             return session_id
         
         # 2. 尝试从 Authorization Header 中提取
         try:
-            authorization = request.headers.get("Authorization")
+            authorization = Headers(scope=scope).get("Authorization")
             if not authorization:
                 return None
             
             # 处理Bearer token
             token = authorization.replace('Bearer ', '').strip()
             
-            # 解码token
-            payload = decode_access_token(token)
+            # 解码token并缓存到scope，后续依赖直接复用
+            payload = get_scope_token_payload(scope, token)
             if not payload or not hasattr(payload, 'sub'):
                 return None
             
             # 从payload中提取session_id
-            user_info = json.loads(payload.sub)
-            session_id = user_info.get("session_id")
-            
-            # 同时设置到request.scope中，避免后续重复解析
+            session_id = json.loads(payload.sub).get("session_id")
             if session_id:
-                request.scope["session_id"] = session_id
-            
+                scope["session_id"] = session_id
             return session_id
         except Exception:
             # 解析失败静默处理，返回None（可能是未认证请求）
             return None
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
-        
-        # 尝试提取session_id
-        session_id = self._extract_session_id_from_request(request)
-        
-        # 组装请求日志字段
-        log_fields = [
-            
-            f"请求来源: {request.client.host if request.client else '未知'}",
-            f"请求方法: {request.method}",
-            f"请求路径: {request.url.path}",
-        ]
-        log.info(log_fields)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        self._extract_session_id(scope)
+        client = scope.get("client")
+        log.info([
+            f"请求来源: {client[0] if client else '未知'}",
+            f"请求方法: {scope['method']}",
+            f"请求路径: {scope['path']}",
+        ])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                content_length = Headers(raw=message.get("headers") or []).get('content-length', '0')
+                log.info(
+                    f"响应状态: {message['status']}, "
+                    f"响应内容长度: {content_length}, "
+                    f"处理时间: {round((time.perf_counter() - start_time) * 1000, 3)}ms"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class IpFilterMiddleware:
+    """
+    IP黑名单与演示模式拦截中间件(纯ASGI实现)
+
+    读取进程内系统配置快照，请求路径上无Redis访问。
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        path = scope.get("path")
+        method = scope["method"]
+        request_ip = get_request_ip(scope)
+
+        # 读取进程内系统配置快照(配置变更时由订阅任务刷新)
         try:
-            # 初始化响应变量
-            response = None
-            
-            # 获取请求路径
-            path = request.scope.get("path")
-            
-            # 尝试获取客户端真实IP
-            request_ip = None
-            x_forwarded_for = request.headers.get('X-Forwarded-For')
-            if x_forwarded_for:
-                # 取第一个 IP 地址，通常为客户端真实 IP
-                request_ip = x_forwarded_for.split(',')[0].strip()
-            else:
-                # 若没有 X-Forwarded-For 头，则使用 request.client.host
-                request_ip = request.client.host if request.client else None
-            
-            # 检查是否启用演示模式
-            demo_enable = False
-            ip_white_list = []
-            white_api_list_path = []
-            ip_black_list = []
-            
-            try:
-                # 从应用实例获取Redis连接
-                redis = request.app.state.redis
-                if not redis:
-                    raise Exception("无法获取Redis连接")
-                
-                # 使用ParamsService获取系统配置
-                system_config = await ParamsService.get_system_config_for_middleware(redis)
-                # 提取配置值
-                demo_enable = system_config["demo_enable"]
-                ip_white_list = system_config["ip_white_list"]
-                white_api_list_path = system_config["white_api_list_path"]
-                ip_black_list = system_config["ip_black_list"]
-                
-            except Exception as e:
-                log.error(f"获取系统配置失败: {e}")
-            
-            # 检查是否需要拦截请求
-            should_block = False
-            block_reason = ""
-            
-            # 1. 首先检查IP是否在黑名单中
-            if request_ip and request_ip in ip_black_list:
-                should_block = True
-                block_reason = f"IP地址 {request_ip} 在黑名单中"
-            
-            # 2. 如果不在黑名单中，检查是否在演示模式下需要拦截
-            elif demo_enable in ["true", "True"] and request.method != "GET":
-                # 在演示模式下，非GET请求需要检查白名单
-                is_ip_whitelisted = request_ip in ip_white_list
-                is_path_whitelisted = path in white_api_list_path
-                
-                if not is_ip_whitelisted and not is_path_whitelisted:
-                    should_block = True
-                    block_reason = f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}"
-            
-            if should_block:
-                # 增强安全审计：记录详细的拦截日志
-                log.warning([
-                    f"会话ID: {session_id or '未认证'}",
-                    f"请求被拦截: {block_reason}",
-                    f"请求来源: {request_ip}",
-                    f"请求方法: {request.method}",
-                    f"请求路径: {path}",
-                    f"用户代理: {request.headers.get('user-agent', '未知')}",
-                    f"演示模式: {demo_enable}"
-                ])
-                # 拦截请求
-                return ErrorResponse(msg="演示环境，禁止操作")
-            else:
-                # 正常处理请求
-                response = await call_next(request)
-            
-            # 计算处理时间并添加到响应头
-            process_time = round(time.time() - start_time, 5)
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            # 构建响应日志信息
-            
-            content_length = response.headers.get('content-length', '0')
-            response_info = (
-                f"响应状态: {response.status_code}, "
-                f"响应内容长度: {content_length}, "
-                f"处理时间: {round(process_time * 1000, 3)}ms"
-            )
-            log.info(response_info)
-            
-            return response
-        
-        except CustomException as e:
-            log.error(f"中间件处理异常: {str(e)}")
-            return ErrorResponse(msg=f"系统异常，请联系管理员", data=str(e))
+            config = await SystemConfigCache.get(scope["app"].state.redis)
+        except Exception as e:
+            log.error(f"获取系统配置失败: {e}")
+            config = SystemConfigSnapshot()
+
+        # 检查是否需要拦截请求
+        block_reason = ""
+
+        # 1. 首先检查IP是否在黑名单中
+        if request_ip and request_ip in config.ip_black_list:
+            block_reason = f"IP地址 {request_ip} 在黑名单中"
+
+        # 2. 如果不在黑名单中，检查是否在演示模式下需要拦截
+        elif config.demo_enable and method != "GET":
+            # 在演示模式下，非GET请求需要检查白名单
+            if request_ip not in config.ip_white_list and path not in config.white_api_list_path:
+                block_reason = f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}"
+
+        if not block_reason:
+            await self.app(scope, receive, send)
+            return
 
+        # 增强安全审计：记录详细的拦截日志
+        headers = Headers(scope=scope)
+        log.warning([
+            f"会话ID: {scope.get('session_id') or '未认证'}",
+            f"请求被拦截: {block_reason}",
+            f"请求来源: {request_ip}",
+            f"请求方法: {method}",
+            f"请求路径: {path}",
+            f"用户代理: {headers.get('user-agent', '未知')}",
+            f"演示模式: {config.demo_enable}"
+        ])
+        response = ErrorResponse(msg="演示环境，禁止操作")
+        await response(scope, receive, send)
 
-class CustomGZipMiddleware(GZipMiddleware):
-    """GZip压缩中间件"""
+
+class ProcessTimeMiddleware:
+    """响应头添加处理时间中间件(纯ASGI实现)"""
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(
-            app,
-            minimum_size=settings.GZIP_MIN_SIZE,
-            compresslevel=settings.GZIP_COMPRESS_LEVEL
-        )
\ No newline at end of file
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(round(time.perf_counter() - start_time, 5)))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class _Encoder:
+    """
+    流式压缩编码器
+
+    统一 gzip / brotli / zstd 的增量压缩接口：
+    - compress(data): 压缩一个分块并刷新已产生的数据(保证流式响应及时下发)
+    - finish(): 结束压缩流
+    """
+    def __init__(self, encoding: str, level: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        if self.encoding == "zstd":
+            return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._obj.flush(zlib.Z_FINISH)
+
+    def oneshot(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.finish()
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    内容协商压缩中间件(纯ASGI实现)
+
+    - 按 COMPRESSION_ALGORITHMS 顺序与 Accept-Encoding 协商 br / zstd / gzip(未安装的算法自动跳过)
+    - 压缩级别按内容类型前缀配置(COMPRESSION_LEVELS)，未配置时使用中等级别
+    - 跳过已压缩的媒体、Excel/zip 导出及 COMPRESSION_EXCLUDE_PATHS 下的文件
+    - 流式响应逐块压缩并刷新，不缓冲整个响应体
+    - 累计各算法的压缩前后字节数与耗时，可通过 stats() 读取；一次性响应附带 Server-Timing
+    """
+    DEFAULT_LEVELS: dict[str, int] = {"br": 4, "zstd": 3, "gzip": settings.GZIP_COMPRESS_LEVEL}
+    AVAILABLE: frozenset[str] = frozenset(
+        name for name, module in (("br", brotli), ("zstd", zstandard), ("gzip", zlib)) if module is not None
+    )
+
+    _stats: dict[str, dict[str, float]] = {}
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.minimum_size = settings.GZIP_MIN_SIZE
+        self.algorithms = [name for name in settings.COMPRESSION_ALGORITHMS if name in self.AVAILABLE]
+        self.exclude_types = tuple(settings.COMPRESSION_EXCLUDE_TYPES)
+        self.exclude_paths = tuple(settings.COMPRESSION_EXCLUDE_PATHS)
+        # 前缀越长越优先匹配
+        self.levels = sorted(settings.COMPRESSION_LEVELS.items(), key=lambda item: len(item[0]), reverse=True)
+
+    @classmethod
+    def stats(cls) -> dict[str, dict[str, float]]:
+        """
+        获取压缩统计
+
+        返回:
+        - dict[str, dict[str, float]]: 各算法的响应数、压缩前后字节数、压缩率与累计耗时(毫秒)
+        """
+        result = {}
+        for encoding, item in cls._stats.items():
+            result[encoding] = {
+                **item,
+                "ratio": round(item["bytes_out"] / item["bytes_in"], 4) if item["bytes_in"] else 0,
+            }
+        return result
+
+    @classmethod
+    def _record(cls, encoding: str, bytes_in: int, bytes_out: int, elapsed: float) -> None:
+        item = cls._stats.setdefault(encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "time_ms": 0.0})
+        item["responses"] += 1
+        item["bytes_in"] += bytes_in
+        item["bytes_out"] += bytes_out
+        item["time_ms"] += elapsed * 1000
+
+    def negotiate(self, accept_encoding: str) -> str | None:
+        """
+        根据 Accept-Encoding 选择压缩算法
+
+        参数:
+        - accept_encoding (str): 请求头 Accept-Encoding
+
+        返回:
+        - str | None: 选中的算法，无可用算法时返回None
+        """
+        accepted = {}
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+        for name in self.algorithms:
+            if accepted.get(name, accepted.get("*", 0)) > 0:
+                return name
+        return None
+
+    def level_for(self, content_type: str, encoding: str) -> int:
+        for prefix, levels in self.levels:
+            if content_type.startswith(prefix) and encoding in levels:
+                return levels[encoding]
+        return self.DEFAULT_LEVELS[encoding]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+        bytes_in = bytes_out = 0
+        elapsed = 0.0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough, bytes_in, bytes_out, elapsed
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = Headers(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(self.exclude_types)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = _Encoder(encoding, self.level_for(content_type, encoding))
+                mutable = MutableHeaders(raw=start_message["headers"])
+                mutable["Content-Encoding"] = encoding
+                mutable.add_vary_header("Accept-Encoding")
+
+                if not more_body:
+                    # 一次性响应：压缩后设置准确的 Content-Length
+                    begin = time.perf_counter()
+                    compressed = encoder.oneshot(body)
+                    elapsed = time.perf_counter() - begin
+                    mutable["Content-Length"] = str(len(compressed))
+                    mutable.append("Server-Timing", f"compress;dur={elapsed * 1000:.3f}")
+                    self._record(encoding, len(body), len(compressed), elapsed)
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                # 流式响应：长度未知，逐块压缩
+                del mutable["Content-Length"]
+                await send(start_message)
+
+            begin = time.perf_counter()
+            chunk = encoder.compress(body) if body else b""
+            if not more_body:
+                chunk += encoder.finish()
+            elapsed += time.perf_counter() - begin
+            bytes_in += len(body)
+            bytes_out += len(chunk)
+            if not more_body:
+                self._record(encoding, bytes_in, bytes_out, elapsed)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+        # 无响应体(如 HEAD)时补发响应头
+        if start_message is not None and encoder is None and not passthrough:
+            await send(start_message)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import insert
+
+from app.config.path_conf import LOG_DIR
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.core.logger import log
+from app.utils.ip_local_util import IpLocalUtil
+from app.api.v1.module_system.log.model import OperationLogModel
+
+
+class OperationLogWriter:
+    """
+    操作日志批量写入器
+
+    OperationLogRoute 只负责组装日志记录并放入进程内队列，由后台任务按
+    OPERATION_LOG_BATCH_SIZE 条或 OPERATION_LOG_FLUSH_INTERVAL_MS 毫秒批量 INSERT，
+    IP 归属地解析也在后台按批次去重完成，不再占用请求的响应时间。
+
+    队列满时先短暂等待(背压)，仍无法入队则按 OPERATION_LOG_OVERFLOW 策略落盘或丢弃；
+    落盘文件在下次启动时回放。应用关闭时 flush 队列中剩余的日志。
+    """
+
+    SPILL_FILE: Path = LOG_DIR / "operation_log_spill.jsonl"
+
+    _queue: asyncio.Queue | None = None
+    _task: asyncio.Task | None = None
+    dropped: int = 0
+    spilled: int = 0
+
+    @classmethod
+    def start(cls) -> None:
+        """启动后台写入任务（由 lifespan 调用）"""
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._queue = asyncio.Queue(maxsize=settings.OPERATION_LOG_QUEUE_SIZE)
+        cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止后台写入任务并 flush 剩余日志（由 lifespan 调用）"""
+        queue, task = cls._queue, cls._task
+        if queue is None or task is None:
+            return
+        # 关闭后新日志直接同步写入，避免丢失
+        cls._queue = None
+        try:
+            await asyncio.wait_for(queue.put(None), timeout=settings.OPERATION_LOG_SHUTDOWN_TIMEOUT)
+            await asyncio.wait_for(task, timeout=settings.OPERATION_LOG_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            task.cancel()
+            remaining = []
+            while not queue.empty():
+                record = queue.get_nowait()
+                if record is not None:
+                    remaining.append(record)
+            if remaining:
+                log.warning(f"操作日志 flush 超时，{len(remaining)} 条写入落盘文件")
+                cls._spill(remaining)
+        finally:
+            cls._task = None
+
+    @classmethod
+    async def submit(cls, record: dict) -> None:
+        """
+        提交一条操作日志
+
+        参数:
+        - record (dict): 日志记录(字段与 OperationLogModel 一致)
+        """
+        queue = cls._queue
+        if queue is None:
+            # 写入器未启动(如脚本、测试环境)时直接写入
+            await cls._write([record])
+            return
+        try:
+            queue.put_nowait(record)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if settings.OPERATION_LOG_PUT_TIMEOUT > 0:
+            try:
+                await asyncio.wait_for(queue.put(record), timeout=settings.OPERATION_LOG_PUT_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                pass
+        cls._overflow([record])
+
+    @classmethod
+    async def _run(cls) -> None:
+        """后台任务：按条数或时间窗口聚合批次并写入"""
+        queue = cls._queue
+        loop = asyncio.get_running_loop()
+        interval = settings.OPERATION_LOG_FLUSH_INTERVAL_MS / 1000
+        await cls._replay()
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + interval
+            closing = False
+            while len(batch) < settings.OPERATION_LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    closing = True
+                    break
+                batch.append(record)
+            await cls._write(batch)
+            if closing:
+                return
+
+    @classmethod
+    async def _write(cls, batch: list[dict]) -> None:
+        """
+        解析归属地并批量写入数据库，失败时按溢出策略处理
+
+        参数:
+        - batch (list[dict]): 日志记录列表
+        """
+        try:
+            await cls._resolve_location(batch)
+            async with async_db_session() as session:
+                async with session.begin():
+                    await session.execute(insert(OperationLogModel), batch)
+        except Exception as e:
+            log.error(f"批量写入操作日志失败({len(batch)}条): {str(e)}")
+            cls._overflow(batch)
+
+    @staticmethod
+    async def _resolve_location(batch: list[dict]) -> None:
+        """按批次去重解析 IP 归属地"""
+        ips = {record["request_ip"] for record in batch if record.get("request_ip") and not record.get("login_location")}
+        if not ips:
+            return
+        ips = list(ips)
+        locations = await asyncio.gather(*(IpLocalUtil.get_ip_location(ip) for ip in ips), return_exceptions=True)
+        mapping = {ip: loc for ip, loc in zip(ips, locations) if not isinstance(loc, BaseException)}
+        for record in batch:
+            if record.get("request_ip") and not record.get("login_location"):
+                record["login_location"] = mapping.get(record["request_ip"])
+
+    @classmethod
+    def _overflow(cls, records: list[dict]) -> None:
+        """
+        溢出处理：spill 落盘，drop 丢弃
+
+        参数:
+        - records (list[dict]): 无法写入的日志记录
+        """
+        if settings.OPERATION_LOG_OVERFLOW == "spill":
+            cls._spill(records)
+        else:
+            cls.dropped += len(records)
+            log.warning(f"操作日志队列已满，丢弃 {len(records)} 条(累计 {cls.dropped} 条)")
+
+    @classmethod
+    def _spill(cls, records: list[dict]) -> None:
+        """
+        追加写入落盘文件
+
+        参数:
+        - records (list[dict]): 日志记录
+        """
+        try:
+            cls.SPILL_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(cls.SPILL_FILE, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records))
+            cls.spilled += len(records)
+        except Exception as e:
+            cls.dropped += len(records)
+            log.error(f"操作日志落盘失败，丢弃 {len(records)} 条: {str(e)}")
+
+    @classmethod
+    async def _replay(cls) -> None:
+        """回放上次落盘的日志"""
+        if not cls.SPILL_FILE.exists():
+            return
+        # 先改名再读取，多 worker 时只有一个能拿到文件
+        replay_file = cls.SPILL_FILE.with_suffix(f".{os.getpid()}.replay")
+        try:
+            os.replace(cls.SPILL_FILE, replay_file)
+        except FileNotFoundError:
+            return
+
+        records = []
+        with open(replay_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for field in ("created_time", "updated_time"):
+                    if record.get(field):
+                        record[field] = datetime.fromisoformat(record[field])
+                records.append(record)
+        replay_file.unlink(missing_ok=True)
+
+        size = settings.OPERATION_LOG_BATCH_SIZE
+        for i in range(0, len(records), size):
+            await cls._write(records[i:i + size])
+        if records:
+            log.info(f"已回放落盘操作日志 {len(records)} 条")
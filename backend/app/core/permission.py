@@ -1,14 +1,187 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+from collections import OrderedDict
 from typing import Any
+from redis.asyncio.client import Redis
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import exists, or_, select
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.database import run_after_commit
 from app.api.v1.module_system.user.model import UserModel
-from app.api.v1.module_system.dept.model import DeptModel
+from app.api.v1.module_system.dept.model import DeptModel, DeptClosureModel
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.utils.common_util import get_child_id_map, get_child_recursion
 
 
+# 解析后的数据范围: (可访问部门ID集合, 按闭包表展开的子树根部门ID集合)，None 表示全部数据
+DataScope = tuple[frozenset[int], frozenset[int]] | None
+
+
+class DataScopeCache:
+    """
+    数据权限进程内缓存
+
+    - 部门闭包: 部门ID -> 自身及全部下级部门ID
+    - 用户数据范围: (用户ID, 部门ID, 角色ID列表) -> 解析后的可访问部门集合
+
+    部门/角色写操作提交后递增 Redis 中的版本号并通过 pub/sub 广播，
+    各 worker 收到通知后清空本地缓存，下次访问时按需重建。
+    """
+
+    VERSION_KEY: str = f"{RedisInitKeyConfig.DATA_SCOPE.key}:version"
+    CHANNEL: str = f"{RedisInitKeyConfig.DATA_SCOPE.key}:invalidate"
+    MAX_USER_SCOPES: int = 4096
+
+    _redis: Redis | None = None
+    _version: int = 0
+    _generation: int = 0
+    _child_map: dict[int, list[int]] | None = None
+    _descendants: dict[int, frozenset[int]] = {}
+    _user_scopes: OrderedDict[tuple, DataScope] = OrderedDict()
+
+    @classmethod
+    def generation(cls) -> int:
+        """
+        获取本地缓存代数，用于丢弃清空前开始计算的结果
+
+        返回:
+        - int: 当前缓存代数
+        """
+        return cls._generation
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空本地缓存"""
+        cls._generation += 1
+        cls._child_map = None
+        cls._descendants = {}
+        cls._user_scopes.clear()
+
+    @classmethod
+    async def get_dept_with_children(cls, db: AsyncSession, dept_id: int) -> frozenset[int]:
+        """
+        获取部门及其全部下级部门ID
+
+        参数:
+        - db (AsyncSession): 数据库会话
+        - dept_id (int): 部门ID
+
+        返回:
+        - frozenset[int]: 包含自身在内的部门ID集合
+        """
+        cached = cls._descendants.get(dept_id)
+        if cached is not None:
+            return cached
+
+        generation = cls._generation
+        child_map = cls._child_map
+        if child_map is None:
+            # 仅查询 id/parent_id 两列构建父子映射
+            result = await db.execute(select(DeptModel.id, DeptModel.parent_id))
+            child_map = get_child_id_map(result.all())
+
+        ids = frozenset(get_child_recursion(id=dept_id, id_map=child_map))
+        if generation == cls._generation:
+            cls._child_map = child_map
+            cls._descendants[dept_id] = ids
+        return ids
+
+    @classmethod
+    def get_user_scope(cls, key: tuple) -> tuple[bool, DataScope]:
+        """
+        读取用户数据范围缓存
+
+        参数:
+        - key (tuple): (用户ID, 部门ID, 角色ID列表)
+
+        返回:
+        - tuple[bool, DataScope]: (是否命中, 数据范围)
+        """
+        if key not in cls._user_scopes:
+            return False, None
+        cls._user_scopes.move_to_end(key)
+        return True, cls._user_scopes[key]
+
+    @classmethod
+    def set_user_scope(cls, key: tuple, scope: DataScope, generation: int) -> None:
+        """
+        写入用户数据范围缓存
+
+        参数:
+        - key (tuple): (用户ID, 部门ID, 角色ID列表)
+        - scope (DataScope): 数据范围，None 表示不限制
+        - generation (int): 开始计算时的缓存代数，期间发生失效则放弃写入
+        """
+        if generation != cls._generation:
+            return
+        cls._user_scopes[key] = scope
+        cls._user_scopes.move_to_end(key)
+        while len(cls._user_scopes) > cls.MAX_USER_SCOPES:
+            cls._user_scopes.popitem(last=False)
+
+    @classmethod
+    async def invalidate(cls, db: AsyncSession | None = None) -> None:
+        """
+        使所有 worker 的数据权限缓存失效
+
+        传入会话时在事务提交后再广播，避免其它 worker 读到未提交的旧数据。
+
+        参数:
+        - db (AsyncSession | None): 当前数据库会话
+        """
+        cls.clear()
+        if not run_after_commit(db, cls.CHANNEL, cls.publish):
+            await cls.publish()
+
+    @classmethod
+    async def publish(cls) -> None:
+        """递增版本号并广播失效通知"""
+        cls.clear()
+        if cls._redis is None:
+            return
+        try:
+            cls._version = await cls._redis.incr(cls.VERSION_KEY)
+            await cls._redis.publish(cls.CHANNEL, cls._version)
+        except Exception as e:
+            log.error(f"广播数据权限缓存失效失败: {str(e)}")
+
+    @classmethod
+    async def listen(cls, redis: Redis) -> None:
+        """
+        订阅失效通知（常驻任务，由 lifespan 启动）
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        cls._redis = redis
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CHANNEL)
+                    # (重新)订阅后对齐版本号，补偿断线期间丢失的通知
+                    version = int(await redis.get(cls.VERSION_KEY) or 0)
+                    if version != cls._version:
+                        cls._version = version
+                        cls.clear()
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        version = int(message.get("data") or 0)
+                        if version != cls._version:
+                            cls._version = version
+                            cls.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"数据权限缓存订阅异常，稍后重试: {str(e)}")
+                await asyncio.sleep(1)
+
+
 class Permission:
     """
     为业务模型提供数据权限过滤功能
@@ -88,6 +261,63 @@ class Permission:
                 return created_id_attr == self.auth.user.id
             return None
         
+        # 解析结果按 (用户, 部门, 角色) 缓存，部门/角色变更时由 DataScopeCache 统一失效
+        user_dept_id = getattr(self.auth.user, "dept_id", None)
+        scope_key = (self.auth.user.id, user_dept_id, tuple(sorted(role.id for role in roles)))
+        hit, scope = DataScopeCache.get_user_scope(scope_key)
+        if not hit:
+            generation = DataScopeCache.generation()
+            scope, cacheable = await self.__resolve_scope(roles=roles, user_dept_id=user_dept_id)
+            if cacheable:
+                DataScopeCache.set_user_scope(scope_key, scope, generation)
+
+        # 全部数据权限
+        if scope is None:
+            return None
+
+        # 如果有部门权限（2、3、5任一），使用部门过滤
+        dept_ids, subtree_root_ids = scope
+        if dept_ids or subtree_root_ids:
+            creator_rel = getattr(self.model, "created_by", None)
+            # 优先使用关系过滤（性能更好）
+            if creator_rel is not None and hasattr(UserModel, 'dept_id'):
+                user_dept_col = getattr(UserModel, 'dept_id')
+                clauses = []
+                if dept_ids:
+                    clauses.append(user_dept_col.in_(list(dept_ids)))
+                if subtree_root_ids:
+                    # 闭包表子查询：参数个数固定，不随部门树规模增长
+                    clauses.append(
+                        exists().where(
+                            DeptClosureModel.descendant_id == user_dept_col,
+                            DeptClosureModel.ancestor_id.in_(list(subtree_root_ids))
+                        )
+                    )
+                return creator_rel.has(or_(*clauses))
+            # 降级方案：如果模型没有created_by关系但有created_id，则只能查看自己的数据
+            else:
+                created_id_attr = getattr(self.model, "created_id", None)
+                if created_id_attr is not None:
+                    return created_id_attr == self.auth.user.id
+                return None
+        
+        # 处理仅本人数据权限（1）及默认情况：只能查看自己的数据
+        created_id_attr = getattr(self.model, "created_id", None)
+        if created_id_attr is not None:
+            return created_id_attr == self.auth.user.id
+        return None
+
+    async def __resolve_scope(self, roles: list, user_dept_id: int | None) -> tuple[DataScope, bool]:
+        """
+        解析用户所有角色的数据范围
+
+        参数:
+        - roles (list): 用户角色列表
+        - user_dept_id (int | None): 用户所属部门ID
+
+        返回:
+        - tuple[DataScope, bool]: (数据范围，None 表示全部数据；结果是否可缓存)
+        """
         # 获取用户所有角色的权限范围
         data_scopes = set()
         custom_dept_ids = set()  # 自定义权限（data_scope=5）关联的部门ID集合
@@ -101,11 +331,12 @@ class Permission:
         
         # 权限优先级处理：全部数据权限最高优先级
         if self.DATA_SCOPE_ALL in data_scopes:
-            return None
+            return None, True
 
         # 收集所有可访问的部门ID（2、3、5权限的并集）
         accessible_dept_ids = set()
-        user_dept_id = getattr(self.auth.user, "dept_id", None)
+        subtree_root_ids = set()
+        cacheable = True
         
         # 处理自定义数据权限（5）
         if self.DATA_SCOPE_CUSTOM in data_scopes:
@@ -118,42 +349,17 @@ class Permission:
             
         # 处理本部门及以下数据权限（3）
         if self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes:
-            if user_dept_id is not None:
+            if user_dept_id is not None and settings.DATA_SCOPE_USE_CLOSURE:
+                # 交由闭包表在数据库内展开子树
+                subtree_root_ids.add(user_dept_id)
+            elif user_dept_id is not None:
                 try:
-                    # 查询所有部门并递归获取子部门
-                    dept_sql = select(DeptModel)
-                    dept_result = await self.auth.db.execute(dept_sql)
-                    dept_objs = dept_result.scalars().all()
-                    id_map = get_child_id_map(dept_objs)
-                    # get_child_recursion返回的结果已包含自身ID和所有子部门ID
-                    dept_with_children_ids = get_child_recursion(id=user_dept_id, id_map=id_map)
+                    # 部门闭包由 DataScopeCache 缓存，结果已包含自身ID和所有子部门ID
+                    dept_with_children_ids = await DataScopeCache.get_dept_with_children(db=self.auth.db, dept_id=user_dept_id)
                     accessible_dept_ids.update(dept_with_children_ids)
                 except Exception:
-                    # 查询失败时降级到本部门
+                    # 查询失败时降级到本部门，且不缓存降级结果
                     accessible_dept_ids.add(user_dept_id)
+                    cacheable = False
 
-        # 如果有部门权限（2、3、5任一），使用部门过滤
-        if accessible_dept_ids:
-            creator_rel = getattr(self.model, "created_by", None)
-            # 优先使用关系过滤（性能更好）
-            if creator_rel is not None and hasattr(UserModel, 'dept_id'):
-                return creator_rel.has(getattr(UserModel, 'dept_id').in_(list(accessible_dept_ids)))
-            # 降级方案：如果模型没有created_by关系但有created_id，则只能查看自己的数据
-            else:
-                created_id_attr = getattr(self.model, "created_id", None)
-                if created_id_attr is not None:
-                    return created_id_attr == self.auth.user.id
-                return None
-        
-        # 处理仅本人数据权限（1）
-        if self.DATA_SCOPE_SELF in data_scopes:
-            created_id_attr = getattr(self.model, "created_id", None)
-            if created_id_attr is not None:
-                return created_id_attr == self.auth.user.id
-            return None
-
-        # 默认情况：如果用户有角色但没有任何有效权限范围，只能查看自己的数据
-        created_id_attr = getattr(self.model, "created_id", None)
-        if created_id_attr is not None:
-            return created_id_attr == self.auth.user.id
-        return None
\ No newline at end of file
+        return (frozenset(accessible_dept_ids), frozenset(subtree_root_ids)), cacheable
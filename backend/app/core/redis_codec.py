@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+import json
+import pickle
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+from app.config.setting import settings
+
+
+def _default(value: Any) -> Any:
+    """
+    序列化常见的非 JSON 原生类型(与旧版 default=str 的表示一致)，其它类型抛出 TypeError 交由兜底编解码器处理
+
+    参数:
+    - value (Any): 无法直接序列化的值
+
+    返回:
+    - Any: 可序列化的值
+    """
+    if isinstance(value, (datetime, date, time, Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"无法序列化的缓存值类型: {type(value).__name__}")
+
+
+class Codec(ABC):
+    """缓存值编解码器基类"""
+    name: str = ""
+    tag: int = 0
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """编码，无法表示的值抛出 TypeError"""
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """解码"""
+
+
+class JsonCodec(Codec):
+    """标准库 json"""
+    name, tag = "json", 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, default=_default, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """orjson(需安装 orjson)"""
+    name, tag = "orjson", 2
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """msgpack(需安装 msgpack)"""
+    name, tag = "msgpack", 3
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class PickleCodec(Codec):
+    """pickle(兜底，用于无法用其它编解码器表示的对象；反序列化可执行任意代码，需 REDIS_PICKLE_ENABLE 显式开启)"""
+    name, tag = "pickle", 4
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class RedisCodec:
+    """
+    Redis 缓存值编解码
+
+    非标量值按 REDIS_CODEC 编码，超过 REDIS_COMPRESS_THRESHOLD 字节时按 REDIS_COMPRESSION 压缩，
+    并写入 5 字节头部: MAGIC(3) + 编解码器标记(1) + 压缩标记(1)。
+    MAGIC 以 0xFE 开头(非法 UTF-8 首字节)，与普通字符串值不会混淆；无头部的值按 UTF-8 字符串返回，
+    因此旧数据及令牌、验证码等标量值读取方式不变。
+
+    pickle 默认禁用: 未开启 REDIS_PICKLE_ENABLE 时无法编码的值抛出 TypeError，读取到 pickle 数据时抛出 ValueError，
+    避免能写入 Redis 的一方借反序列化执行任意代码。
+    """
+
+    MAGIC: bytes = b"\xfeRC"
+    HEADER_SIZE: int = len(MAGIC) + 2
+
+    COMPRESS_NONE, COMPRESS_ZSTD, COMPRESS_LZ4 = 0, 1, 2
+
+    codecs: dict[int, Codec] = {codec.tag: codec for codec in (JsonCodec(), OrjsonCodec(), MsgpackCodec(), PickleCodec())}
+
+    @classmethod
+    def register(cls, codec: Codec) -> None:
+        """
+        注册自定义编解码器
+
+        参数:
+        - codec (Codec): 编解码器实例(tag 需唯一)
+        """
+        cls.codecs[codec.tag] = codec
+
+    @classmethod
+    def default_codec(cls) -> Codec:
+        """获取配置的编解码器，依赖未安装时退回标准库 json"""
+        available = {"orjson": orjson, "msgpack": msgpack, "pickle": pickle if settings.REDIS_PICKLE_ENABLE else None}
+        for codec in cls.codecs.values():
+            if codec.name == settings.REDIS_CODEC and available.get(codec.name, True) is not None:
+                return codec
+        return cls.codecs[JsonCodec.tag]
+
+    @classmethod
+    def _compress(cls, data: bytes) -> tuple[int, bytes]:
+        if len(data) < settings.REDIS_COMPRESS_THRESHOLD:
+            return cls.COMPRESS_NONE, data
+        if settings.REDIS_COMPRESSION == "zstd" and zstandard is not None:
+            return cls.COMPRESS_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+        if settings.REDIS_COMPRESSION == "lz4" and lz4_frame is not None:
+            return cls.COMPRESS_LZ4, lz4_frame.compress(data)
+        return cls.COMPRESS_NONE, data
+
+    @classmethod
+    def _decompress(cls, flag: int, data: bytes) -> bytes:
+        if flag == cls.COMPRESS_ZSTD:
+            return zstandard.ZstdDecompressor().decompress(data)
+        if flag == cls.COMPRESS_LZ4:
+            return lz4_frame.decompress(data)
+        return data
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        """
+        编码缓存值
+
+        参数:
+        - value (Any): 缓存值
+
+        返回:
+        - bytes: 带类型头部的字节串
+        """
+        codec = cls.default_codec()
+        try:
+            payload = codec.dumps(value)
+        except TypeError:
+            if not settings.REDIS_PICKLE_ENABLE:
+                raise
+            codec = cls.codecs[PickleCodec.tag]
+            payload = codec.dumps(value)
+        flag, payload = cls._compress(payload)
+        return cls.MAGIC + bytes((codec.tag, flag)) + payload
+
+    @classmethod
+    def decode(cls, data: bytes | str | None) -> Any:
+        """
+        解码缓存值(无头部的值按字符串原样返回)
+
+        参数:
+        - data (bytes | str | None): Redis 原始值
+
+        返回:
+        - Any: 缓存值
+        """
+        if data is None or isinstance(data, str):
+            return data
+        if not data.startswith(cls.MAGIC):
+            return data.decode("utf-8", errors="replace")
+        tag, flag = data[len(cls.MAGIC)], data[len(cls.MAGIC) + 1]
+        codec = cls.codecs.get(tag)
+        if codec is None:
+            raise ValueError(f"未知的缓存编解码器标记: {tag}")
+        if tag == PickleCodec.tag and not settings.REDIS_PICKLE_ENABLE:
+            raise ValueError("缓存值为 pickle 编码，但未开启 REDIS_PICKLE_ENABLE")
+        return codec.loads(cls._decompress(flag, data[cls.HEADER_SIZE:]))
@@ -1,18 +1,59 @@
 # -*- coding: utf-8 -*-
 
-import pickle
-from typing import Any, Awaitable
-from redis.asyncio.client import Redis
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Mapping
+from redis.asyncio.client import Pipeline, Redis
+from redis.client import NEVER_DECODE
 
+from app.config.setting import settings
 from app.core.logger import log
+from app.core.redis_codec import RedisCodec
 
 
 class RedisCURD:
-    """缓存工具类"""
+    """
+    缓存工具类
+
+    批量写入/删除可通过 pipeline() 合并为一次往返: 批量方法传入 pipe 时只排队命令，
+    由 pipeline() 退出时统一执行，例如:
+
+        async with RedisCURD(redis).pipeline(transaction=True) as pipe:
+            await RedisCURD(redis).mset({...}, expire=60, pipe=pipe)
+            await RedisCURD(redis).mdelete([...], pipe=pipe)
+    """
 
     def __init__(self, redis: Redis) -> None:
         """初始化"""
         self.redis = redis
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        """编码缓存值(标量按字符串保存，其余按配置的编解码器编码)
+        
+        参数:
+        - value (Any): 缓存值
+            
+        返回:
+        - bytes: 写入 Redis 的字节串
+        """
+        if isinstance(value, (int, float, str)):
+            return str(value).encode('utf-8')
+        return RedisCodec.encode(value)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Pipeline]:
+        """批量命令上下文，退出时在一次往返内执行所有排队的命令(异常退出时不执行)
+        
+        参数:
+        - transaction (bool, optional): 是否以 MULTI/EXEC 事务执行,默认值为False。
+            
+        返回:
+        - AsyncIterator[Pipeline]: Redis 管道
+        """
+        async with self.redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if len(pipe):
+                await pipe.execute()
         
     async def mget(self, keys: list) -> list:
         """批量获取缓存
@@ -21,17 +62,50 @@ class RedisCURD:
         - keys (list): 键名列表
             
         返回:
-        - list: 返回缓存值列表,如果获取失败则返回空列表
+        - list: 返回缓存值列表(已按编解码头部解码),如果获取失败则返回空列表
         """
         try:
-            data = await self.redis.mget(*[str(key) for key in keys])
-            return data
+            data = await self.redis.execute_command("MGET", *[str(key) for key in keys], **{NEVER_DECODE: True})
+            return [RedisCodec.decode(item) for item in data]
         except Exception as e:
             log.error(f"批量获取缓存失败: {str(e)}")
             return []
     
+    async def scan_batches(self, pattern: str = "*", count: int | None = None) -> AsyncIterator[list[str]]:
+        """按批次增量遍历缓存键名(SCAN，不阻塞 Redis)
+        
+        参数:
+        - pattern (str, optional): 匹配模式,默认值为"*"。
+        - count (int | None, optional): 每次 SCAN 的 COUNT 提示,默认使用 REDIS_SCAN_COUNT。
+            
+        返回:
+        - AsyncIterator[list[str]]: 键名批次迭代器(遍历期间有键变更时同一键可能重复出现)
+        """
+        cursor = 0
+        count = count or settings.REDIS_SCAN_COUNT
+        while True:
+            cursor, keys = await self.redis.scan(cursor=cursor, match=pattern, count=count)
+            if keys:
+                yield keys
+            if not cursor:
+                break
+
+    async def scan_iter(self, pattern: str = "*", count: int | None = None) -> AsyncIterator[str]:
+        """增量遍历缓存键名(SCAN，不阻塞 Redis)
+        
+        参数:
+        - pattern (str, optional): 匹配模式,默认值为"*"。
+        - count (int | None, optional): 每次 SCAN 的 COUNT 提示,默认使用 REDIS_SCAN_COUNT。
+            
+        返回:
+        - AsyncIterator[str]: 键名迭代器
+        """
+        async for keys in self.scan_batches(pattern=pattern, count=count):
+            for key in keys:
+                yield key
+
     async def get_keys(self, pattern: str = "*") -> list:
-        """获取缓存键名
+        """获取缓存键名(基于 SCAN 增量遍历并去重)
         
         参数:
         - pattern (str, optional): 匹配模式,默认值为"*"。
@@ -40,13 +114,33 @@ class RedisCURD:
         - list: 返回匹配的缓存键名列表,如果获取失败则返回空列表
         """
         try:
-            keys = await self.redis.keys(f"{pattern}")
-            return keys
+            keys = {}
+            async for key in self.scan_iter(pattern):
+                keys[key] = None
+            return list(keys)
         except Exception as e:
             log.error(f"获取缓存键名失败: {str(e)}")
             return []
         
-    
+    async def unlink(self, *keys: str, chunk_size: int | None = None) -> int:
+        """分块异步删除缓存(UNLINK，由 Redis 后台线程回收内存)，所有分块在一次往返内执行
+        
+        参数:
+        - keys (str): 缓存键名
+        - chunk_size (int | None, optional): 每条 UNLINK 命令包含的键数,默认使用 REDIS_UNLINK_CHUNK。
+            
+        返回:
+        - int: 删除的键数量
+        """
+        if not keys:
+            return 0
+        chunk_size = chunk_size or settings.REDIS_UNLINK_CHUNK
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(keys), chunk_size):
+                pipe.unlink(*keys[i:i + chunk_size])
+            result = await pipe.execute()
+        return sum(result)
+
     async def get(self, key: str) -> Any:
         """获取缓存
         
@@ -54,15 +148,12 @@ class RedisCURD:
         - key (str): 缓存键名
             
         返回:
-        - Any: 返回缓存值,如果缓存不存在则返回None
+        - Any: 返回缓存值(已按编解码头部解码),如果缓存不存在则返回None
         """
         try:
-            data = await self.redis.get(f"{key}")
-            
-            if data is None:
-                return None
-
-            return data
+            # 以原始字节读取，由 RedisCodec 根据头部解码(无头部的按字符串返回)
+            data = await self.redis.execute_command("GET", f"{key}", **{NEVER_DECODE: True})
+            return RedisCodec.decode(data)
 
         except Exception as e:
             log.error(f"获取缓存失败: {str(e)}")
@@ -80,15 +171,11 @@ class RedisCURD:
         - bool: 如果设置缓存成功则返回True,否则返回False
         """
         try:
-            # 根据数据类型选择序列化方式
-            if isinstance(value, (int, float, str)):
-                data = str(value).encode('utf-8')
-            else:
-                try:
-                    data = pickle.dumps(value)
-                except Exception as e:
-                    log.error(f"序列化数据失败: {str(e)}")
-                    return False
+            try:
+                data = self.encode(value)
+            except Exception as e:
+                log.error(f"序列化数据失败: {str(e)}")
+                return False
                     
             await self.redis.set(
                 name = key,
@@ -117,8 +204,64 @@ class RedisCURD:
             log.error(f"删除缓存失败: {str(e)}")
             return False
 
+    async def mset(self, mapping: Mapping[str, Any], expire: int | Mapping[str, int] | None = None, pipe: Pipeline | None = None) -> bool:
+        """批量设置缓存(一次往返)
+        
+        参数:
+        - mapping (Mapping[str, Any]): 键名 -> 缓存值
+        - expire (int | Mapping[str, int] | None, optional): 过期时间(秒),可为统一值或按键名指定,默认值为None。
+        - pipe (Pipeline | None, optional): 调用方的管道,传入时只排队不执行,默认值为None。
+            
+        返回:
+        - bool: 如果设置(或排队)成功则返回True,否则返回False
+        """
+        if not mapping:
+            return True
+        try:
+            items = [
+                (key, self.encode(value), expire.get(key) if isinstance(expire, Mapping) else expire)
+                for key, value in mapping.items()
+            ]
+        except Exception as e:
+            log.error(f"序列化数据失败: {str(e)}")
+            return False
+        try:
+            if pipe is not None:
+                for key, data, ex in items:
+                    pipe.set(name=key, value=data, ex=ex)
+                return True
+            async with self.pipeline(transaction=True) as pipe:
+                for key, data, ex in items:
+                    pipe.set(name=key, value=data, ex=ex)
+            return True
+        except Exception as e:
+            log.error(f"批量设置缓存失败: {str(e)}")
+            return False
+
+    async def mdelete(self, keys: list[str], pipe: Pipeline | None = None) -> bool:
+        """批量删除缓存(UNLINK，一次往返)
+        
+        参数:
+        - keys (list[str]): 缓存键名列表
+        - pipe (Pipeline | None, optional): 调用方的管道,传入时只排队不执行,默认值为None。
+            
+        返回:
+        - bool: 如果删除(或排队)成功则返回True,否则返回False
+        """
+        if not keys:
+            return True
+        try:
+            if pipe is not None:
+                pipe.unlink(*keys)
+            else:
+                await self.unlink(*keys)
+            return True
+        except Exception as e:
+            log.error(f"批量删除缓存失败: {str(e)}")
+            return False
+
     async def clear(self, pattern: str = "*") -> bool:
-        """清空缓存
+        """清空缓存(SCAN 增量遍历 + 分块 UNLINK)
         
         参数:
         - pattern (str, optional): 匹配模式,默认值为"*"。
@@ -127,9 +270,8 @@ class RedisCURD:
         - bool: 如果清空缓存成功则返回True,否则返回False
         """
         try:
-            keys = await self.redis.keys(f"{pattern}")
-            if keys:
-                await self.redis.delete(*keys)
+            async for keys in self.scan_batches(pattern):
+                await self.unlink(*keys)
             return True
         except Exception as e:
             log.error(f"清空缓存失败: {str(e)}")
@@ -228,13 +370,13 @@ class RedisCURD:
         - bool: 如果设置哈希缓存成功则返回True,否则返回False
         """
         try:
-            self.redis.hset(name=name, key=key, value=value)
+            await self.redis.hset(name=name, key=key, value=value)
             return True
         except Exception as e:
             log.error(f"设置哈希缓存失败: {str(e)}")
             return False
         
-    async def hash_get(self, name: str, keys: list[str]) -> Awaitable[list[Any]] | list[Any]:
+    async def hash_get(self, name: str, keys: list[str]) -> list[Any]:
         """获取哈希缓存
         
         参数:
@@ -242,11 +384,71 @@ class RedisCURD:
         - keys (list[str]): 哈希缓存键名列表
             
         返回:
-        - Awaitable[list[Any]] | list[Any]: 返回哈希缓存值列表,如果获取失败则返回空列表
+        - list[Any]: 返回哈希缓存值列表,如果获取失败则返回空列表
+        """
+        try:
+            return await self.redis.hmget(name=name, keys=keys)
+        except Exception as e:
+            log.error(f"获取哈希缓存失败: {str(e)}")
+            return []
+
+    async def hash_mset(self, name: str, mapping: Mapping[str, Any], expire: int | None = None, pipe: Pipeline | None = None) -> bool:
+        """批量设置哈希缓存字段(HSET + EXPIRE，一次往返)
+        
+        参数:
+        - name (str): 哈希缓存名称
+        - mapping (Mapping[str, Any]): 字段 -> 值(值需为标量)
+        - expire (int | None, optional): 过期时间,单位为秒,默认值为None。
+        - pipe (Pipeline | None, optional): 调用方的管道,传入时只排队不执行,默认值为None。
+            
+        返回:
+        - bool: 如果设置(或排队)成功则返回True,否则返回False
+        """
+        if not mapping:
+            return True
+        try:
+            if pipe is not None:
+                pipe.hset(name=name, mapping=mapping)
+                if expire:
+                    pipe.expire(name, expire)
+                return True
+            async with self.pipeline(transaction=True) as pipe:
+                pipe.hset(name=name, mapping=mapping)
+                if expire:
+                    pipe.expire(name, expire)
+            return True
+        except Exception as e:
+            log.error(f"批量设置哈希缓存失败: {str(e)}")
+            return False
+
+    async def hash_getall(self, name: str) -> dict:
+        """获取哈希缓存的全部字段
+        
+        参数:
+        - name (str): 哈希缓存名称
+            
+        返回:
+        - dict: 返回字段字典,如果获取失败则返回空字典
         """
         try:
-            data = self.redis.hmget(name=name, keys=keys)
-            return data
+            return await self.redis.hgetall(name)
         except Exception as e:
             log.error(f"获取哈希缓存失败: {str(e)}")
-            return []
\ No newline at end of file
+            return {}
+
+    async def hash_delete(self, name: str, *keys: str) -> bool:
+        """删除哈希缓存字段
+        
+        参数:
+        - name (str): 哈希缓存名称
+        - keys (str): 哈希缓存键名
+            
+        返回:
+        - bool: 如果删除成功则返回True,否则返回False
+        """
+        try:
+            await self.redis.hdel(name, *keys)
+            return True
+        except Exception as e:
+            log.error(f"删除哈希缓存字段失败: {str(e)}")
+            return False
@@ -2,17 +2,15 @@
 
 import time
 import json
+from datetime import datetime
 from typing import Any, Callable, Coroutine
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
 from user_agents import parse
 
-from app.core.database import async_db_session
 from app.config.setting import settings
-from app.utils.ip_local_util import IpLocalUtil
-from app.api.v1.module_system.auth.schema import AuthSchema
+from app.core.operation_log import OperationLogWriter
 from app.api.v1.module_system.log.schema import OperationLogCreateSchema
-from app.api.v1.module_system.log.service import OperationLogService
 
 """
 在 FastAPI 中，route_class 参数用于自定义路由的行为。
@@ -112,8 +110,6 @@ class OperationLogRoute(APIRoute):
                 if request.client:
                     request_ip = request.client.host
             
-            login_location = await IpLocalUtil.get_ip_location(request_ip) if request_ip else None
-            
             # 判断请求是否来自api文档
             referer = request.headers.get('referer')
             request_from_swagger = referer and referer.endswith('docs')
@@ -123,25 +119,25 @@ class OperationLogRoute(APIRoute):
                 # 如果请求来自api文档，则不记录日志
                 pass
             else:
-                async with async_db_session() as session:
-                    async with session.begin():
-                        auth = AuthSchema(db=session)
-                        await OperationLogService.create_log_service(data=OperationLogCreateSchema(
-                            type = log_type,
-                            request_path = request.url.path,
-                            request_method = request.method,
-                            request_payload = payload,
-                            request_ip = request_ip,
-                            login_location=login_location,
-                            request_os = user_agent.os.family,
-                            request_browser = user_agent.browser.family,
-                            response_code = response.status_code,
-                            response_json = response_data.decode() if isinstance(response_data, (bytes, bytearray)) else str(response_data),
-                            process_time = process_time,
-                            description = route.summary,
-                            created_id = current_user_id,
-                            updated_id = current_user_id,
-                        ), auth = auth) 
+                # 放入批量写入队列，IP归属地由后台写入任务解析
+                now = datetime.now()
+                record = OperationLogCreateSchema(
+                    type = log_type,
+                    request_path = request.url.path,
+                    request_method = request.method,
+                    request_payload = payload,
+                    request_ip = request_ip,
+                    request_os = user_agent.os.family,
+                    request_browser = user_agent.browser.family,
+                    response_code = response.status_code,
+                    response_json = response_data.decode() if isinstance(response_data, (bytes, bytearray)) else str(response_data),
+                    process_time = process_time,
+                    description = route.summary,
+                    created_id = current_user_id,
+                    updated_id = current_user_id,
+                ).model_dump()
+                record.update(created_time=now, updated_time=now)
+                await OperationLogWriter.submit(record)
             
             return response
 
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import jwt
+from typing import Any, MutableMapping
 from fastapi import Form, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.security.utils import get_authorization_scheme_param
@@ -155,3 +156,24 @@ def decode_access_token(token: str) -> JWTPayloadSchema:
 
     except jwt.InvalidTokenError:
         raise CustomException(msg="token已失效,请重新登录", code=10401, status_code=401)
+
+
+def get_scope_token_payload(scope: MutableMapping[str, Any], token: str) -> JWTPayloadSchema:
+    """
+    解析访问令牌，同一请求内只解码一次
+
+    中间件与 get_current_user 共用同一个 ASGI scope，首次解码结果缓存在 scope["token_payload"]。
+
+    参数:
+    - scope (MutableMapping[str, Any]): ASGI scope。
+    - token (str): JWT访问令牌字符串。
+
+    返回:
+    - JWTPayloadSchema: 解析后的JWT有效载荷。
+    """
+    cached = scope.get("token_payload")
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    payload = decode_access_token(token)
+    scope["token_payload"] = (token, payload)
+    return payload
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+from typing import Any
+
+import uvicorn
+
+from app.config.setting import settings
+from app.core.logger import log
+
+
+def run_server(
+    app: str,
+    workers: int,
+    reload: bool = False,
+    preload: bool = True,
+    loop: str = 'auto',
+    http: str = 'auto',
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
+    graceful_timeout: int = 30,
+) -> None:
+    """
+    启动 HTTP 服务
+
+    单进程(或开发热重载)时直接使用 uvicorn；多进程时由 gunicorn 管理 uvicorn worker，支持:
+    - 预加载: 主进程中创建应用并执行建表/缓存预热后再 fork，worker 共享已导入的模块，启动时版本戳一致跳过预热
+    - 平滑重启: 向主进程发送 HUP 信号逐个替换 worker(预加载模式下不会重新加载代码)
+    - worker 回收: 处理请求数达到 max_requests(加随机抖动)后平滑重启，缓解内存增长
+    Windows 不支持 gunicorn，退化为 uvicorn 多进程(由 uvicorn 主进程拉起退出的 worker，同样支持回收)。
+    单进程与热重载时没有进程管理器重新拉起进程，不启用 worker 回收，否则达到阈值后服务直接退出。
+
+    参数:
+    - app (str): 应用工厂导入路径，如 main:create_app
+    - workers (int): worker 进程数
+    - reload (bool): 是否热重载(仅开发环境)
+    - preload (bool): 多进程时是否在主进程预加载应用
+    - loop (str): 事件循环实现(auto/asyncio/uvloop)
+    - http (str): HTTP 协议解析实现(auto/h11/httptools)
+    - max_requests (int): worker 回收阈值，0 表示不回收
+    - max_requests_jitter (int): 回收阈值随机抖动
+    - graceful_timeout (int): 平滑重启/关闭的等待时间(秒)
+
+    返回:
+    - None
+    """
+    if reload or workers <= 1 or sys.platform == 'win32':
+        supervised = not reload and workers > 1
+        uvicorn.run(
+            app=app,
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            reload=reload,
+            workers=None if reload else workers,
+            loop=loop,
+            http=http,
+            limit_max_requests=(max_requests or None) if supervised else None,
+            timeout_graceful_shutdown=graceful_timeout,
+            factory=True,
+            log_config=None
+        )
+        return
+
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.importer import import_from_string
+    from uvicorn.workers import UvicornWorker
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": loop, "http": http, "log_config": None}
+
+    def on_starting(server: Any) -> None:
+        """主进程 fork worker 之前执行集群内只需一次的启动步骤"""
+        from app.plugin.init_app import warm_up
+        version = asyncio.run(warm_up())
+        log.info(f"✅ 主进程启动预热完成 (版本戳 {version})，开始启动 {workers} 个 worker")
+
+    class Application(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+                "workers": workers,
+                "worker_class": Worker,
+                "preload_app": preload,
+                "max_requests": max_requests,
+                "max_requests_jitter": max_requests_jitter,
+                "graceful_timeout": graceful_timeout,
+                "on_starting": on_starting,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return import_from_string(app)()
+
+    Application().run()
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import hashlib
+import inspect
+import json
+import random
+import secrets
+import time
+from collections import OrderedDict
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+from pydantic import BaseModel
+from redis.asyncio.client import Redis
+from redis.client import NEVER_DECODE
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.database import AFTER_COMMIT_KEY, run_after_commit
+from app.core.logger import log
+from app.core.redis_codec import RedisCodec
+from app.api.v1.module_system.auth.schema import AuthSchema
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class ServiceCache:
+    """
+    服务层读穿透缓存（进程内 LRU + Redis）
+
+    通过 cached 装饰器为服务方法加缓存，键名由模板和方法参数生成:
+    - L1: 进程内 LRU，保存编码后的字节串，命中时解码出新对象，调用方修改结果不会污染缓存
+    - L2: Redis，跨 worker 共享，冷启动后各 worker 不必重复查询数据库
+    - 同一进程内同一键只允许一个加载任务(single-flight)，跨 worker 通过短时 Redis 锁避免同时回源(按令牌释放，超时后不会误删他人的锁)
+    - 过期时间加随机抖动，避免大量键同时失效
+
+    每个缓存项记录生成时所依赖标签(表名)的版本号。base_crud 中的会话事件钩子收集
+    每次 flush / 批量 DML 涉及的表，事务提交后递增对应标签版本并广播，各 worker 据此淘汰进程内缓存，
+    Redis 中版本不一致的缓存项视为未命中。标签版本号键不存在(Redis 清空或淘汰)时以当前微秒时间戳重新初始化，
+    保证版本号单调递增，重置后旧缓存项不会因版本号恰好相同而被误判为命中。没有任何 cached 方法依赖的表不递增版本号也不广播。
+    """
+
+    KEY: str = RedisInitKeyConfig.SERVICE_CACHE.key
+    CHANNEL: str = f"{RedisInitKeyConfig.SERVICE_CACHE.key}:invalidate"
+    LOCK_POLL_INTERVAL: float = 0.05
+    # 释放回源锁: 仅删除本次加锁写入的令牌
+    UNLOCK_SCRIPT: str = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    _redis: Redis | None = None
+    _local: OrderedDict[str, tuple[float, dict[str, int], bytes]] = OrderedDict()
+    _tag_versions: dict[str, int] = {}
+    _inflight: dict[str, asyncio.Future] = {}
+    _readers: set[str] = set()
+
+    @classmethod
+    def tag_key(cls, tag: str) -> str:
+        return f"{cls.KEY}:tag:{tag}"
+
+    @classmethod
+    def watch(cls, tags: Iterable[str]) -> None:
+        """
+        登记 cached 方法依赖的表(由装饰器在导入时调用)
+
+        参数:
+        - tags (Iterable[str]): 依赖标签
+        """
+        cls._readers.update(tags)
+
+    @classmethod
+    def watched(cls, tags: Iterable[str]) -> set[str]:
+        """
+        过滤出有 cached 方法依赖的标签
+
+        参数:
+        - tags (Iterable[str]): 失效标签
+
+        返回:
+        - set[str]: 需要递增版本号的标签
+        """
+        return {tag for tag in tags if tag in cls._readers}
+
+    @classmethod
+    def versions(cls, tags: Iterable[str]) -> dict[str, int]:
+        """
+        获取标签在本进程已知的版本号
+
+        参数:
+        - tags (Iterable[str]): 标签
+
+        返回:
+        - dict[str, int]: 标签 -> 版本号
+        """
+        return {tag: cls._tag_versions.get(tag, 0) for tag in tags}
+
+    @classmethod
+    def get_local(cls, key: str) -> bytes | None:
+        """
+        读取进程内缓存(过期或依赖标签版本变化时视为未命中)
+
+        参数:
+        - key (str): 缓存键名
+
+        返回:
+        - bytes | None: 编码后的缓存值
+        """
+        item = cls._local.get(key)
+        if item is None:
+            return None
+        expire_at, versions, payload = item
+        if expire_at < time.monotonic() or versions != cls.versions(versions):
+            cls._local.pop(key, None)
+            return None
+        cls._local.move_to_end(key)
+        return payload
+
+    @classmethod
+    def set_local(cls, key: str, versions: dict[str, int], payload: bytes, ttl: int) -> None:
+        """
+        写入进程内缓存
+
+        参数:
+        - key (str): 缓存键名
+        - versions (dict[str, int]): 加载前的标签版本号
+        - payload (bytes): 编码后的缓存值
+        - ttl (int): 过期时间(秒)
+        """
+        cls._local[key] = (time.monotonic() + ttl, versions, payload)
+        cls._local.move_to_end(key)
+        while len(cls._local) > settings.SERVICE_CACHE_LOCAL_SIZE:
+            cls._local.popitem(last=False)
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空进程内缓存"""
+        cls._local.clear()
+
+    @classmethod
+    def evict(cls, versions: dict[str, int]) -> None:
+        """
+        更新标签版本号并淘汰依赖这些标签的进程内缓存
+
+        参数:
+        - versions (dict[str, int]): 标签 -> 新版本号
+        """
+        for tag, version in versions.items():
+            if version > cls._tag_versions.get(tag, 0):
+                cls._tag_versions[tag] = version
+        for key in [key for key, (_, deps, _) in cls._local.items() if deps.keys() & versions.keys()]:
+            cls._local.pop(key, None)
+
+    @classmethod
+    async def get_or_load(cls, key: str, loader: Callable[[], Awaitable[Any]], tags: tuple[str, ...] = (), ttl: int | None = None, local_ttl: int | None = None, l2: bool = True) -> Any:
+        """
+        读穿透获取缓存值
+
+        参数:
+        - key (str): 缓存键名
+        - loader (Callable[[], Awaitable[Any]]): 未命中时的加载函数
+        - tags (tuple[str, ...]): 依赖的失效标签
+        - ttl (int | None): Redis 过期时间(秒)，默认 SERVICE_CACHE_TTL
+        - local_ttl (int | None): 进程内过期时间(秒)，默认 SERVICE_CACHE_LOCAL_TTL
+        - l2 (bool): 是否使用 Redis 缓存(已有专用 Redis 键的服务只启用进程内缓存)
+
+        返回:
+        - Any: 缓存值
+        """
+        payload = cls.get_local(key)
+        if payload is not None:
+            return RedisCodec.decode(payload)
+
+        # 同一键已有加载任务时等待其结果；加载方被取消则重新竞争
+        while (future := cls._inflight.get(key)) is not None:
+            try:
+                return RedisCodec.decode(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            payload = await cls._load(key, loader, tags, ttl, local_ttl, l2)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 无其他等待者时消费异常，避免 "Future exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(payload)
+        finally:
+            cls._inflight.pop(key, None)
+        return RedisCodec.decode(payload)
+
+    @classmethod
+    async def _load(cls, key: str, loader: Callable[[], Awaitable[Any]], tags: tuple[str, ...], ttl: int | None, local_ttl: int | None, l2: bool) -> bytes:
+        """L2 -> 回源加载，返回编码后的缓存值并写入两级缓存"""
+        local_ttl = local_ttl or settings.SERVICE_CACHE_LOCAL_TTL
+        redis = cls._redis if l2 else None
+        if redis is None:
+            versions = cls.versions(tags)
+            payload = RedisCodec.encode(await loader())
+            cls.set_local(key, versions, payload, local_ttl)
+            return payload
+
+        cache_key = f"{cls.KEY}:{key}"
+        lock_key = f"{cache_key}:lock"
+        lock_token = secrets.token_hex(8)
+        try:
+            versions, payload = await cls._get_remote(redis, cache_key, tags)
+            if payload is not None:
+                cls.set_local(key, versions, payload, local_ttl)
+                return payload
+            # 跨 worker 回源互斥: 未拿到锁时等待持锁方写入，超时后自行加载
+            lock_timeout = settings.SERVICE_CACHE_LOCK_TIMEOUT
+            if not await redis.set(lock_key, lock_token, nx=True, ex=lock_timeout):
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(cls.LOCK_POLL_INTERVAL)
+                    versions, payload = await cls._get_remote(redis, cache_key, tags)
+                    if payload is not None:
+                        cls.set_local(key, versions, payload, local_ttl)
+                        return payload
+                lock_key = None
+        except Exception as e:
+            log.error(f"读取服务缓存失败: {str(e)}")
+            versions, lock_key = cls.versions(tags), None
+
+        try:
+            payload = RedisCodec.encode(await loader())
+            cls.set_local(key, versions, payload, local_ttl)
+            try:
+                ttl = ttl or settings.SERVICE_CACHE_TTL
+                ttl = int(ttl * (1 + random.uniform(0, settings.SERVICE_CACHE_TTL_JITTER)))
+                await redis.set(cache_key, cls._pack(versions, payload), ex=ttl)
+            except Exception as e:
+                log.error(f"写入服务缓存失败: {str(e)}")
+            return payload
+        finally:
+            if lock_key:
+                try:
+                    await redis.eval(cls.UNLOCK_SCRIPT, 1, lock_key, lock_token)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _seed() -> int:
+        """标签版本号键不存在时的初始值(微秒时间戳，大于重置前的任何版本号)"""
+        return time.time_ns() // 1000
+
+    @classmethod
+    async def _get_remote(cls, redis: Redis, cache_key: str, tags: tuple[str, ...]) -> tuple[dict[str, int], bytes | None]:
+        """一次往返读取 Redis 缓存项与当前标签版本号，返回 (标签版本号, 版本一致时的缓存值)"""
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.execute_command("GET", cache_key, **{NEVER_DECODE: True})
+            if tags:
+                pipe.mget([cls.tag_key(tag) for tag in tags])
+            result = await pipe.execute()
+        values = result[1] if tags else []
+        if None in values:
+            # 版本号键丢失: 无法判断缓存项是否过期，重新初始化版本号后按未命中处理
+            async with redis.pipeline(transaction=False) as pipe:
+                for tag, value in zip(tags, values):
+                    if value is None:
+                        pipe.set(cls.tag_key(tag), cls._seed(), nx=True)
+                pipe.mget([cls.tag_key(tag) for tag in tags])
+                values = (await pipe.execute())[-1]
+            result[0] = None
+        versions = {tag: int(value or 0) for tag, value in zip(tags, values)}
+        cls.evict({tag: version for tag, version in versions.items() if version > cls._tag_versions.get(tag, 0)})
+        if result[0] is not None:
+            cached_versions, payload = cls._unpack(result[0])
+            if cached_versions == versions:
+                return versions, payload
+        return versions, None
+
+    @staticmethod
+    def _pack(versions: dict[str, int], payload: bytes) -> bytes:
+        """Redis 缓存项: 标签版本号 JSON + 换行 + 编码后的缓存值"""
+        return json.dumps(versions, sort_keys=True).encode("utf-8") + b"\n" + payload
+
+    @staticmethod
+    def _unpack(data: bytes) -> tuple[dict[str, int] | None, bytes]:
+        """解析 Redis 缓存项，格式不符时版本号返回 None"""
+        head, sep, payload = data.partition(b"\n")
+        try:
+            return (json.loads(head) if sep else None), payload
+        except ValueError:
+            return None, payload
+
+    @classmethod
+    def mark(cls, session: Any, tags: Iterable[str]) -> bool:
+        """
+        登记当前事务内变更的标签，事务提交后合并为一次广播(回滚则丢弃)
+
+        供 CRUDBase 的会话事件钩子(同步上下文)调用，同时立即淘汰本进程依赖这些标签的缓存。
+
+        参数:
+        - session (Any): 数据库会话(AsyncSession 或其同步 Session)
+        - tags (Iterable[str]): 失效标签
+
+        返回:
+        - bool: 是否已延迟到提交后广播(没有需要失效的标签时也返回True)；会话不在事务中时返回False，由调用方立即广播
+        """
+        tags = cls.watched(tags)
+        if not tags:
+            return True
+        cls.evict({tag: cls._tag_versions.get(tag, 0) for tag in tags})
+        callback = session.info.get(AFTER_COMMIT_KEY, {}).get(cls.CHANNEL) if session is not None else None
+        if isinstance(callback, partial):
+            callback.args[0].update(tags)
+            return True
+        return run_after_commit(session, cls.CHANNEL, partial(cls.publish, tags))
+
+    @classmethod
+    async def invalidate(cls, *tags: str, db: AsyncSession | None = None) -> None:
+        """
+        使依赖指定标签的缓存失效（传入会话时在事务提交后广播，同一事务内的标签合并为一次广播）
+
+        参数:
+        - tags (str): 失效标签
+        - db (AsyncSession | None): 当前数据库会话
+        """
+        if tags and not cls.mark(db, tags):
+            await cls.publish(set(tags))
+
+    @classmethod
+    async def publish(cls, tags: set[str]) -> None:
+        """
+        递增标签版本号并广播失效通知(版本号键不存在时先重新初始化)
+
+        参数:
+        - tags (set[str]): 失效标签
+        """
+        tags = cls.watched(tags)
+        if not tags:
+            return
+        if cls._redis is None:
+            cls.evict({tag: cls._tag_versions.get(tag, 0) + 1 for tag in tags})
+            return
+        try:
+            tags = sorted(tags)
+            seed = cls._seed()
+            async with cls._redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.set(cls.tag_key(tag), seed, nx=True)
+                    pipe.incr(cls.tag_key(tag))
+                versions = dict(zip(tags, (await pipe.execute())[1::2]))
+            cls.evict(versions)
+            await cls._redis.publish(cls.CHANNEL, json.dumps(versions))
+        except Exception as e:
+            log.error(f"广播服务缓存失效失败: {str(e)}")
+
+    @classmethod
+    async def listen(cls, redis: Redis) -> None:
+        """
+        订阅失效通知（常驻任务，由 lifespan 启动）
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        cls._redis = redis
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CHANNEL)
+                    # (重新)订阅后断线期间的通知可能丢失，清空进程内缓存，依赖标签的版本号在下次读取 Redis 时对齐
+                    cls.clear()
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            cls.evict(json.loads(message.get("data")))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"服务缓存订阅异常，稍后重试: {str(e)}")
+                await asyncio.sleep(1)
+
+    @staticmethod
+    def key_part(value: Any) -> str:
+        """
+        将方法参数转换为键名片段
+
+        - 标量原样使用
+        - AuthSchema 转换为数据权限范围: 不受限时为 "*"，否则为用户/部门/角色组合的摘要
+        - 其余对象(查询参数、排序条件等)取 JSON 摘要
+
+        参数:
+        - value (Any): 参数值
+
+        返回:
+        - str: 键名片段
+        """
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return str(value)
+        if isinstance(value, AuthSchema):
+            user = value.user
+            if not user or not value.check_data_scope or user.is_superuser:
+                return "*"
+            value = [user.id, user.dept_id, sorted(role.id for role in user.roles or [])]
+        elif isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        elif hasattr(value, "__dict__"):
+            value = vars(value)
+        raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def cached(key: str | None = None, tags: Iterable[str] = (), ttl: int | None = None, local_ttl: int | None = None, l2: bool = True) -> Callable[[F], F]:
+    """
+    服务方法读穿透缓存装饰器（置于 @classmethod 之下）
+
+    示例:
+        @classmethod
+        @cached(key="menu_tree:{auth}:{search}:{order_by}", tags=("sys_menu",))
+        async def get_menu_tree_service(cls, auth, search=None, order_by=None): ...
+
+    参数:
+    - key (str | None): 键名模板，占位符为方法参数名，缺省时使用全部参数(会话、Redis 连接除外)
+    - tags (Iterable[str]): 依赖的失效标签(表名)
+    - ttl (int | None): Redis 过期时间(秒)
+    - local_ttl (int | None): 进程内过期时间(秒)
+    - l2 (bool): 是否使用 Redis 缓存
+
+    返回:
+    - Callable[[F], F]: 装饰器
+    """
+    tags = tuple(tags)
+    ServiceCache.watch(tags)
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+        skip = {name for name in signature.parameters if name in ("cls", "self")}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not settings.SERVICE_CACHE_ENABLE:
+                return await func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            parts = {
+                name: ServiceCache.key_part(value)
+                for name, value in bound.arguments.items()
+                if name not in skip and not isinstance(value, (AsyncSession, Redis))
+            }
+            suffix = key.format_map(parts) if key else ":".join(parts.values())
+            return await ServiceCache.get_or_load(
+                key=f"{func.__qualname__}:{suffix}",
+                loader=lambda: func(*args, **kwargs),
+                tags=tags,
+                ttl=ttl,
+                local_ttl=local_ttl,
+                l2=l2,
+            )
+
+        return wrapper
+
+    return decorator
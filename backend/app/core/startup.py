@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from redis.asyncio.client import Redis
+from redis.exceptions import LockError
+from sqlalchemy import select
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.path_conf import SCRIPT_DIR
+from app.config.setting import settings
+from app.core.base_model import MappedBase
+from app.core.database import async_db_session
+from app.core.exceptions import CustomException
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+from app.api.v1.module_common.health.model import StartupStampModel
+
+
+@dataclass
+class StartupStep:
+    """
+    启动步骤
+
+    - name: 步骤名称
+    - func: 步骤函数
+    - depends: 依赖的步骤名称，依赖全部完成后才开始执行
+    - once: 是否集群内只执行一次(按版本戳跳过，由抢到锁的实例执行，其余实例等待版本戳)
+    - persist: 版本戳是否同时写入数据库(用于建表和基础数据等持久状态，Redis 清空后无需重做)
+    - sentinel: 预热数据的 Redis 键匹配模式，没有匹配键(被清理或淘汰)时即使版本戳一致也重新执行
+    """
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    depends: tuple[str, ...] = ()
+    once: bool = False
+    persist: bool = False
+    sentinel: str | None = None
+    status: str = field(default="pending")
+    elapsed: float = field(default=0.0)
+
+
+class StartupOrchestrator:
+    """
+    应用启动编排器
+
+    按依赖关系并发执行启动步骤，互不依赖的步骤同时进行。集群内只需执行一次的步骤(建表、缓存预热等)
+    以"应用版本 + 表结构 + 初始化数据"生成版本戳，版本戳保存在 Redis(持久状态同时保存在数据库)，
+    版本一致时直接跳过；版本变化时由抢到锁的实例执行，其余实例等待其写入版本戳，
+    避免多 worker、多实例滚动发布时重复执行相同的预热查询。
+
+    全部步骤完成后 ready 置为 True，供就绪探针(/health/ready)使用。
+    """
+
+    STAMP_KEY: str = RedisInitKeyConfig.STARTUP_STAMP.key
+
+    def __init__(self, redis: Redis) -> None:
+        """
+        初始化编排器
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        self.redis = redis
+        self.version = self.build_version()
+        self.steps: dict[str, StartupStep] = {}
+        self.ready: bool = False
+
+    @staticmethod
+    def build_version() -> str:
+        """
+        生成版本戳(应用版本、表结构与初始化数据文件任一变化时改变)
+
+        返回:
+        - str: 版本戳
+        """
+        digest = hashlib.sha1(settings.VERSION.encode())
+        for name, table in sorted(MappedBase.metadata.tables.items()):
+            digest.update(name.encode())
+            for column in table.columns:
+                digest.update(f"{column.name}:{column.type!r}:{column.nullable}".encode())
+        for path in sorted(SCRIPT_DIR.glob("*.json")):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        return digest.hexdigest()[:16]
+
+    def add(self, name: str, func: Callable[[], Awaitable[Any]], depends: tuple[str, ...] = (), once: bool = False, persist: bool = False, sentinel: str | None = None) -> None:
+        """
+        注册启动步骤
+
+        参数:
+        - name (str): 步骤名称
+        - func (Callable[[], Awaitable[Any]]): 步骤函数
+        - depends (tuple[str, ...]): 依赖的步骤名称
+        - once (bool): 是否集群内只执行一次
+        - persist (bool): 版本戳是否同时写入数据库
+        - sentinel (str | None): 预热数据的 Redis 键匹配模式
+        """
+        for dep in depends:
+            if dep not in self.steps:
+                raise CustomException(msg=f"启动步骤 {name} 依赖的步骤 {dep} 未注册")
+        self.steps[name] = StartupStep(name=name, func=func, depends=depends, once=once, persist=persist, sentinel=sentinel)
+
+    async def run(self) -> None:
+        """
+        执行全部启动步骤，任一步骤失败时取消其余步骤并抛出异常
+        """
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(step: StartupStep) -> None:
+            for dep in step.depends:
+                await tasks[dep]
+            start = time.perf_counter()
+            step.status = "running"
+            try:
+                if step.once:
+                    step.status = "done" if await self.__run_once(step) else "skipped"
+                else:
+                    await step.func()
+                    step.status = "done"
+            except BaseException:
+                step.status = "failed"
+                raise
+            finally:
+                step.elapsed = time.perf_counter() - start
+            log.info(f"✅ 启动步骤 {step.name} {'已跳过(版本一致)' if step.status == 'skipped' else '完成'} ({step.elapsed * 1000:.0f} ms)")
+
+        # 依赖必须先注册，按注册顺序创建任务即可保证等待的任务已存在
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.create_task(run_step(step), name=f"startup:{step.name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        self.ready = True
+
+    def status(self) -> dict[str, Any]:
+        """
+        获取启动状态
+
+        返回:
+        - dict[str, Any]: 就绪状态、版本戳与各步骤状态
+        """
+        return {
+            "ready": self.ready,
+            "version": self.version,
+            "steps": {
+                step.name: {"status": step.status, "elapsed_ms": round(step.elapsed * 1000)}
+                for step in self.steps.values()
+            },
+        }
+
+    async def __run_once(self, step: StartupStep) -> bool:
+        """
+        集群内只执行一次的步骤: 版本戳一致时跳过，否则抢锁执行或等待持锁实例完成
+
+        参数:
+        - step (StartupStep): 启动步骤
+
+        返回:
+        - bool: 本实例是否执行了该步骤
+        """
+        stamp_key = f"{self.STAMP_KEY}:{step.name}"
+        lock = self.redis.lock(f"{stamp_key}:lock", timeout=settings.STARTUP_LOCK_TIMEOUT)
+        deadline = time.monotonic() + settings.STARTUP_WAIT_TIMEOUT
+        while True:
+            if await self.__is_stamped(step, stamp_key):
+                return False
+            if await lock.acquire(blocking=False):
+                try:
+                    # 抢到锁前持锁实例可能刚好完成
+                    if await self.__is_stamped(step, stamp_key):
+                        return False
+                    await step.func()
+                    if step.persist:
+                        await self.__set_db_stamp(step.name)
+                    await self.redis.set(stamp_key, self.version)
+                    return True
+                finally:
+                    try:
+                        await lock.release()
+                    except LockError:
+                        log.warning(f"⚠️ 启动步骤 {step.name} 执行时间超过锁超时时间")
+            if time.monotonic() > deadline:
+                raise CustomException(msg=f"等待其他实例完成启动步骤 {step.name} 超时")
+            await asyncio.sleep(0.5)
+
+    async def __is_stamped(self, step: StartupStep, stamp_key: str) -> bool:
+        """
+        版本戳是否与当前版本一致且预热数据仍在(Redis 未命中时回查数据库并回填)
+
+        参数:
+        - step (StartupStep): 启动步骤
+        - stamp_key (str): Redis 版本戳键名
+
+        返回:
+        - bool: 是否一致
+        """
+        if step.sentinel and not await self.__has_sentinel(step.sentinel):
+            return False
+        if await self.redis.get(stamp_key) == self.version:
+            return True
+        if step.persist and await self.__get_db_stamp(step.name) == self.version:
+            await self.redis.set(stamp_key, self.version)
+            return True
+        return False
+
+    async def __has_sentinel(self, pattern: str) -> bool:
+        """
+        是否存在匹配的预热数据键(找到第一个即返回)
+
+        参数:
+        - pattern (str): Redis 键匹配模式
+
+        返回:
+        - bool: 是否存在
+        """
+        async for _ in RedisCURD(self.redis).scan_iter(pattern):
+            return True
+        return False
+
+    @staticmethod
+    async def __get_db_stamp(name: str) -> str | None:
+        """
+        读取数据库中的版本戳
+
+        参数:
+        - name (str): 步骤名称
+
+        返回:
+        - str | None: 版本戳，首次部署(表尚未创建)时为 None
+        """
+        try:
+            async with async_db_session() as session:
+                return await session.scalar(select(StartupStampModel.version).where(StartupStampModel.name == name))
+        except Exception:
+            return None
+
+    async def __set_db_stamp(self, name: str) -> None:
+        """
+        写入数据库中的版本戳
+
+        参数:
+        - name (str): 步骤名称
+        """
+        async with async_db_session() as session:
+            async with session.begin():
+                obj = await session.get(StartupStampModel, name)
+                if obj:
+                    obj.version = self.version
+                else:
+                    session.add(StartupStampModel(name=name, version=self.version))
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import ipaddress
+from dataclasses import dataclass, field
+from typing import Any
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.core.database import run_after_commit
+from app.core.logger import log
+
+
+class IpMatcher:
+    """
+    IP名单匹配器
+
+    精确IP编译为集合；CIDR网段按前缀长度分组，每组保存掩码后的网络地址集合，
+    匹配时每个前缀长度只需一次掩码 + 集合查找。
+    """
+
+    def __init__(self, items: list[str] | None = None) -> None:
+        """
+        编译IP名单
+
+        参数:
+        - items (list[str] | None): IP或CIDR网段列表
+        """
+        exact, networks = set(), {}
+        for item in items or []:
+            item = str(item).strip()
+            if not item:
+                continue
+            if "/" not in item:
+                exact.add(item)
+                continue
+            try:
+                network = ipaddress.ip_network(item, strict=False)
+            except ValueError:
+                log.error(f"IP名单中存在无效网段: {item}")
+                continue
+            networks.setdefault((network.version, network.prefixlen), set()).add(int(network.network_address))
+        self.exact: frozenset[str] = frozenset(exact)
+        self.networks: dict[tuple[int, int], frozenset[int]] = {key: frozenset(value) for key, value in networks.items()}
+
+    def __contains__(self, ip: str | None) -> bool:
+        if not ip:
+            return False
+        if ip in self.exact:
+            return True
+        if not self.networks:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        value, bits = int(address), address.max_prefixlen
+        for (version, prefixlen), prefixes in self.networks.items():
+            if version != address.version:
+                continue
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            if value & mask in prefixes:
+                return True
+        return False
+
+
+@dataclass(frozen=True)
+class SystemConfigSnapshot:
+    """中间件使用的系统配置快照"""
+    demo_enable: bool = False
+    ip_white_list: IpMatcher = field(default_factory=IpMatcher)
+    white_api_list_path: frozenset[str] = frozenset()
+    ip_black_list: IpMatcher = field(default_factory=IpMatcher)
+
+
+class SystemConfigCache:
+    """
+    系统配置进程内快照
+
+    RequestLogMiddleware 每个请求直接读取进程内快照，不再访问 Redis。
+    ParamsService 创建/更新/删除配置并提交后递增版本号并广播，
+    各 worker 收到通知后从 Redis 重新加载并编译快照。
+    """
+
+    # 版本号不放在 system_config:* 命名空间下，避免清理配置缓存时一并删除
+    VERSION_KEY: str = RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key
+    CHANNEL: str = f"{RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key}:invalidate"
+
+    _redis: Redis | None = None
+    _version: int = -1
+    _snapshot: SystemConfigSnapshot | None = None
+
+    @classmethod
+    async def get(cls, redis: Redis) -> SystemConfigSnapshot:
+        """
+        获取当前快照（未加载时从 Redis 加载一次）
+
+        参数:
+        - redis (Redis): Redis 连接
+
+        返回:
+        - SystemConfigSnapshot: 系统配置快照
+        """
+        snapshot = cls._snapshot
+        if snapshot is None:
+            snapshot = await cls.reload(redis)
+        return snapshot
+
+    @classmethod
+    async def reload(cls, redis: Redis) -> SystemConfigSnapshot:
+        """
+        从 Redis 重新加载并编译快照
+
+        参数:
+        - redis (Redis): Redis 连接
+
+        返回:
+        - SystemConfigSnapshot: 系统配置快照
+        """
+        # 延迟导入: ParamsService 在配置变更后会调用本类
+        from app.api.v1.module_system.params.service import ParamsService
+
+        config = await ParamsService.get_system_config_for_middleware(redis)
+        snapshot = SystemConfigSnapshot(
+            demo_enable=str(config["demo_enable"]) in ("true", "True"),
+            ip_white_list=IpMatcher(config["ip_white_list"]),
+            white_api_list_path=frozenset(config["white_api_list_path"] or []),
+            ip_black_list=IpMatcher(config["ip_black_list"]),
+        )
+        cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    async def invalidate(cls, redis: Redis, db: Any = None) -> None:
+        """
+        通知所有 worker 重新加载快照（传入会话时在事务提交后广播）
+
+        参数:
+        - redis (Redis): Redis 连接
+        - db (AsyncSession | None): 当前数据库会话
+        """
+        cls._redis = cls._redis or redis
+        if not run_after_commit(db, cls.CHANNEL, cls.publish):
+            await cls.publish()
+
+    @classmethod
+    async def publish(cls) -> None:
+        """递增版本号并广播通知"""
+        redis = cls._redis
+        if redis is None:
+            return
+        try:
+            await cls.reload(redis)
+            version = await redis.incr(cls.VERSION_KEY)
+            await redis.publish(cls.CHANNEL, version)
+        except Exception as e:
+            log.error(f"广播系统配置变更失败: {str(e)}")
+
+    @classmethod
+    async def listen(cls, redis: Redis) -> None:
+        """
+        订阅配置变更通知（常驻任务，由 lifespan 启动）
+
+        参数:
+        - redis (Redis): Redis 连接
+        """
+        cls._redis = redis
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CHANNEL)
+                    # (重新)订阅后对齐版本号，补偿断线期间丢失的通知
+                    await cls._sync_version(redis, await redis.get(cls.VERSION_KEY))
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            await cls._sync_version(redis, message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"系统配置订阅异常，稍后重试: {str(e)}")
+                await asyncio.sleep(1)
+
+    @classmethod
+    async def _sync_version(cls, redis: Redis, value: Any) -> None:
+        """对齐版本号，变化时重新加载快照"""
+        version = int(value or 0)
+        if version != cls._version or cls._snapshot is None:
+            await cls.reload(redis)
+            cls._version = version
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 from re import T
 from starlette.responses import HTMLResponse
-from typing import Any, AsyncGenerator
+from functools import partial
+from typing import Any, AsyncGenerator, Awaitable, Callable
 from fastapi import Depends, FastAPI, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.concurrency import asynccontextmanager
@@ -12,24 +14,122 @@ from fastapi.openapi.docs import (
     get_swagger_ui_oauth2_redirect_html
 )
 from fastapi_limiter import FastAPILimiter
+from redis.asyncio import Redis
 from fastapi_limiter.depends import RateLimiter, WebSocketRateLimiter
 from starlette.websockets import WebSocket
 from math import ceil
 
+from app.common.enums import RedisInitKeyConfig
 from app.config.setting import settings
 from app.core.logger import log
 from app.core.discover import router
 from app.core.exceptions import CustomException, handle_exception
+from app.core.permission import DataScopeCache
+from app.core.auth_cache import AuthUserCache
+from app.core.service_cache import ServiceCache
+from app.core.operation_log import OperationLogWriter
+from app.core.startup import StartupOrchestrator
+from app.core.system_config import SystemConfigCache
+from app.core.database import async_engine
 from app.utils.common_util import import_module, import_modules_async
+from app.utils.hash_bcrpy_util import PwdUtil
 from app.scripts.initialize import InitializeData
 
 from app.api.v1.module_application.job.tools.ap_scheduler import SchedulerUtil
+from app.api.v1.module_application.job.tools.job_log_writer import JobLogWriter
 from app.api.v1.module_system.params.service import ParamsService
 from app.api.v1.module_system.dict.service import DictDataService
+from app.api.v1.module_monitor.online.service import OnlineSessionRegistry
 
 # 导入WebSocket路由器
 from app.api.v1.module_application.ai.ws import WS_AI
 
+def add_cluster_steps(startup: StartupOrchestrator, redis: Redis) -> None:
+    """
+    注册集群内只需执行一次的启动步骤(建表/基础数据、系统配置与数据字典预热)。
+
+    参数:
+    - startup (StartupOrchestrator): 启动编排器。
+    - redis (Redis): Redis 连接。
+
+    返回:
+    - None
+    """
+    startup.add("init_db", InitializeData().init_db, once=True, persist=True)
+    startup.add(
+        "system_config", partial(ParamsService.init_config_service, redis=redis), depends=("init_db",), once=True,
+        sentinel=f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:*",
+    )
+    startup.add(
+        "system_dict", partial(DictDataService.init_dict_service, redis=redis), depends=("init_db",), once=True,
+        sentinel=f"{RedisInitKeyConfig.SYSTEM_DICT.key}:*",
+    )
+
+async def warm_up() -> str:
+    """
+    在多进程主进程中 fork worker 之前执行集群内只需一次的启动步骤，worker 启动时版本戳一致直接跳过。
+
+    完成后关闭临时 Redis 连接并释放数据库连接池，避免 worker 继承主进程的连接。
+
+    返回:
+    - str: 版本戳。
+    """
+    redis = Redis.from_url(url=settings.REDIS_URI, encoding='utf-8', decode_responses=True)
+    try:
+        startup = StartupOrchestrator(redis=redis)
+        add_cluster_steps(startup, redis)
+        await startup.run()
+        return startup.version
+    finally:
+        await redis.aclose()
+        await async_engine.dispose()
+
+def build_startup(app: FastAPI) -> StartupOrchestrator:
+    """
+    编排应用启动步骤。
+
+    建表/基础数据和 Redis 预热集群内只执行一次(按版本戳跳过)，其余为每个 worker 的进程内初始化；
+    互不依赖的步骤并发执行。
+
+    参数:
+    - app (FastAPI): FastAPI 应用实例。
+
+    返回:
+    - StartupOrchestrator: 启动编排器。
+    """
+    redis = app.state.redis
+    startup = StartupOrchestrator(redis=redis)
+
+    def start_listener(attr: str, listen: Callable[..., Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+        async def start() -> None:
+            setattr(app.state, attr, asyncio.create_task(listen(redis=redis)))
+        return start
+
+    async def start_operation_log() -> None:
+        OperationLogWriter.start()
+
+    async def start_job_log() -> None:
+        JobLogWriter.start()
+
+    async def init_limiter() -> None:
+        await FastAPILimiter.init(
+            redis=redis,
+            prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
+            http_callback=http_limit_callback,
+        )
+
+    add_cluster_steps(startup, redis)
+    startup.add("online_session", partial(OnlineSessionRegistry.rebuild, redis=redis))
+    startup.add("system_config_listener", start_listener("system_config_listener", SystemConfigCache.listen), depends=("system_config",))
+    startup.add("data_scope_listener", start_listener("data_scope_listener", DataScopeCache.listen))
+    startup.add("auth_user_listener", start_listener("auth_user_listener", AuthUserCache.listen))
+    startup.add("service_cache_listener", start_listener("service_cache_listener", ServiceCache.listen))
+    startup.add("operation_log", start_operation_log)
+    startup.add("job_log", start_job_log)
+    startup.add("scheduler", partial(SchedulerUtil.init_system_scheduler, redis=redis), depends=("init_db", "job_log"))
+    startup.add("limiter", init_limiter)
+    return startup
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     """
@@ -42,26 +142,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     - AsyncGenerator[Any, Any]: 生命周期上下文生成器。
     """
     try:
-        await InitializeData().init_db()
-        log.info(f"✅ {settings.DATABASE_TYPE}数据库初始化完成")
         await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=True)
         log.info("✅ 全局事件模块加载完成")
-        await ParamsService().init_config_service(redis=app.state.redis)
-        log.info("✅ Redis系统配置初始化完成")
-        await DictDataService().init_dict_service(redis=app.state.redis)
-        log.info("✅ Redis数据字典初始化完成")
-        await SchedulerUtil.init_system_scheduler()
+        app.state.startup = build_startup(app)
+        await app.state.startup.run()
+        log.info(f"✅ 应用启动步骤全部完成 (版本戳 {app.state.startup.version})")
         scheduler_jobs_count = len(SchedulerUtil.get_all_jobs())
         scheduler_status = SchedulerUtil.get_job_status()
-        log.info(f"✅ 定时任务调度器初始化完成 ({scheduler_jobs_count} 个任务)")
-
-        # 6. 初始化请求限制器
-        await FastAPILimiter.init(
-            redis=app.state.redis,
-            prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
-            http_callback=http_limit_callback,
-        )
-        log.info("✅ 请求限制器初始化完成")
         
         # 导入并显示最终的启动信息面板
         from app.utils.console import run as console_run
@@ -81,13 +168,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
 
     yield
     
+    # 关闭期间就绪探针返回未就绪，负载均衡不再转发新请求
+    app.state.startup.ready = False
     try:
-        await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=False)
-        log.info("✅ 全局事件模块卸载完成")
+        app.state.system_config_listener.cancel()
+        log.info("✅ 系统配置快照订阅已关闭")
+        app.state.data_scope_listener.cancel()
+        log.info("✅ 数据权限缓存订阅已关闭")
+        app.state.auth_user_listener.cancel()
+        log.info("✅ 认证用户缓存订阅已关闭")
+        app.state.service_cache_listener.cancel()
+        log.info("✅ 服务层缓存订阅已关闭")
+        await OperationLogWriter.stop()
+        log.info("✅ 操作日志已刷新并关闭写入")
+        PwdUtil.shutdown()
+        log.info("✅ 密码哈希进程池已关闭")
+        # 调度器释放租约与请求限制器都依赖 Redis，须在断开 Redis 前关闭
         await SchedulerUtil.close_system_scheduler()
         log.info("✅ 定时任务调度器已关闭")
+        await JobLogWriter.stop()
+        log.info("✅ 任务执行日志已刷新并关闭写入")
         await FastAPILimiter.close()
         log.info("✅ 请求限制器已关闭")
+        await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=False)
+        log.info("✅ 全局事件模块卸载完成")
 
     except Exception as e:
         log.error(f"❌ 应用关闭过程中发生错误: {str(e)}")
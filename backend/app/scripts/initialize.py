@@ -2,8 +2,9 @@
 
 import asyncio
 import json
-from sqlalchemy import select, func
+from sqlalchemy import Connection, inspect, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateColumn
 
 from app.api.v1.module_system.position.model import PositionModel
 from app.config.path_conf import SCRIPT_DIR
@@ -14,6 +15,8 @@ from app.core.base_model import MappedBase
 from app.api.v1.module_system.user.model import UserModel, UserRolesModel
 from app.api.v1.module_system.role.model import RoleModel
 from app.api.v1.module_system.dept.model import DeptModel
+from app.api.v1.module_system.dept.crud import DeptCRUD
+from app.api.v1.module_system.auth.schema import AuthSchema
 from app.api.v1.module_system.menu.model import MenuModel
 from app.api.v1.module_system.params.model import ParamsModel
 from app.api.v1.module_system.dict.model import DictTypeModel, DictDataModel
@@ -49,6 +52,7 @@ class InitializeData:
             # 使用引擎创建所有表
             async with async_engine.begin() as conn:
                 await conn.run_sync(MappedBase.metadata.create_all)
+                await conn.run_sync(self.__add_missing_columns)
             log.info("✅️ 数据库表结构初始化完成")
         except asyncio.exceptions.TimeoutError:
             log.error("❌️ 数据库表结构初始化超时")
@@ -57,6 +61,34 @@ class InitializeData:
             log.error(f"❌️ 数据库表结构初始化失败: {str(e)}")
             raise
 
+    @staticmethod
+    def __add_missing_columns(conn: Connection) -> None:
+        """
+        为已存在的表补充模型中新增的可空列
+
+        create_all 只创建不存在的表，已有安装(或由 sql 目录下的脚本导入的数据库)不会自动加列；
+        可空列可以直接 ALTER TABLE ADD COLUMN，非空列需要迁移脚本填充数据，只记录警告。
+
+        参数:
+        - conn (Connection): 数据库连接。
+        """
+        inspector = inspect(conn)
+        preparer = conn.dialect.identifier_preparer
+        for table in MappedBase.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    log.warning(f"⚠️ 表 {table.name} 缺少非空列 {column.name}，请执行数据库迁移")
+                    continue
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                # 列注释中可能含有冒号，直接执行 DDL 避免被 text() 解析为绑定参数
+                conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+                log.info(f"✅️ 表 {table.name} 已补充列 {column.name}")
+
     async def __init_data(self, db: AsyncSession) -> None:
         """
         初始化基础数据
@@ -150,6 +182,20 @@ class InitializeData:
             
         return objs
 
+    async def __init_dept_closure(self, db: AsyncSession) -> None:
+        """
+        初始化部门闭包表（闭包表与部门表不一致时按 parent_id 重建）
+
+        参数:
+        - db (AsyncSession): 异步数据库会话。
+        """
+        try:
+            if await DeptCRUD(AuthSchema(db=db, check_data_scope=False)).rebuild_closure_crud():
+                log.info("✅️ 已重建 sys_dept_closure 部门闭包表")
+        except Exception as e:
+            log.error(f"❌️ 初始化部门闭包表失败: {str(e)}")
+            raise
+
     async def __get_data(self, filename: str) -> list[dict]:
         """
         读取初始化数据文件
@@ -185,6 +231,7 @@ class InitializeData:
         async with async_db_session() as session:
             async with session.begin():
                 await self.__init_data(session)
+                await self.__init_dept_closure(session)
                 # session.add_all(objs)
                 # 确保提交事务
                 await session.commit()
@@ -1,32 +1,86 @@
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+import dataclasses
 import io
-import pandas as pd
-from typing import Any
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, PatternFill
-from openpyxl.worksheet.datavalidation import DataValidation
+import json
+import re
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import IO, TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterator, Literal, Sequence
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.core.exceptions import CustomException
+from app.core.logger import log
+
+# pandas/openpyxl 导入耗时较长，仅在首次导入/导出时加载
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 与 openpyxl.cell.cell.ILLEGAL_CHARACTERS_RE 一致
+ILLEGAL_CHARACTERS_RE = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+# 以这些字符开头的文本会被表格软件当作公式执行(CSV/公式注入)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
 
 
 class ExcelUtil:
     """Excel文件处理工具类"""
     
+    MEDIA_TYPES = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
     @classmethod
-    def __mapping_list(cls, list_data: list[dict[str, Any]], mapping_dict: dict) -> list:
+    def __cell_value(cls, value: Any) -> Any:
         """
-        工具方法：将列表数据中的字段名映射为对应的中文字段名。
+        工具方法：将导出值转换为 Excel 单元格可接受的值。
 
         参数:
-        - list_data (list[dict[str, Any]]): 数据列表。
-        - mapping_dict (dict): 字段名映射字典。
+        - value (Any): 原始值。
 
         返回:
-        - list: 映射后的数据列表。
+        - Any: 单元格值(去除时区、非法控制字符，转义公式前缀，超长文本截断)。
         """
-        mapping_data = [{mapping_dict.get(key): item.get(key) for key in mapping_dict} for item in list_data]
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if value is None or isinstance(value, (bool, int, float, Decimal, date, time)):
+            return value
+        if isinstance(value, (dict, list, tuple)):
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        # Excel 单元格最多 32767 个字符
+        return cls.__escape_formula(ILLEGAL_CHARACTERS_RE.sub('', str(value)))[:32767]
+
+    @staticmethod
+    def __escape_formula(value: Any) -> Any:
+        """工具方法：以公式前缀开头的文本前加单引号，按普通文本显示。"""
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    @classmethod
+    def __append_rows(cls, ws: Any, rows: list[list[Any]]) -> None:
+        """工具方法：向只写工作表追加多行。"""
+        for row in rows:
+            ws.append(row)
 
-        return mapping_data
+    @classmethod
+    def __csv_rows(cls, rows: list[list[Any]]) -> bytes:
+        """工具方法：将多行编码为 CSV 字节串。"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode('utf-8')
     
     @classmethod
     def get_excel_template(cls, header_list: list[str], selector_header_list: list[str], option_list: list[dict[str, list[str]]]) -> bytes:
@@ -41,6 +95,11 @@ class ExcelUtil:
         返回:
         - bytes: Excel 文件的二进制数据。
         """
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+        from openpyxl.styles import Alignment, PatternFill
+        from openpyxl.worksheet.datavalidation import DataValidation
+
         wb = Workbook()
         ws = wb.active
         if not ws:
@@ -91,9 +150,475 @@ class ExcelUtil:
         返回:
         - bytes: Excel 文件的二进制数据。
         """
-        mapping_data = cls.__mapping_list(list_data, mapping_dict)
-        df = pd.DataFrame(mapping_data)
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title='Sheet1')
+        ws.append(list(mapping_dict.values()))
+        cls.__append_rows(ws, [[cls.__cell_value(item.get(key)) for key in mapping_dict] for item in list_data])
         buffer = io.BytesIO()
-        df.to_excel(buffer, index=False, engine='openpyxl')
-        binary_data = buffer.getvalue()
-        return binary_data
+        wb.save(buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    async def stream_export(cls, batches: AsyncIterable[Sequence[dict[str, Any]]], mapping_dict: dict, file_format: Literal['xlsx', 'csv'] = 'xlsx') -> AsyncIterator[bytes]:
+        """
+        流式导出 Excel/CSV，内存占用与总行数无关。
+
+        - csv: 每批数据编码后立即输出(带 UTF-8 BOM，便于 Excel 直接打开)；
+        - xlsx: 使用 openpyxl 只写模式，行数据落盘到临时文件，生成完成后分块输出。
+
+        参数:
+        - batches (AsyncIterable[Sequence[dict[str, Any]]]): 分批产出的数据(通常来自 CRUDBase.stream)。
+        - mapping_dict (dict): 字段名映射字典。
+        - file_format (Literal['xlsx', 'csv']): 导出格式。
+
+        返回:
+        - AsyncIterator[bytes]: 文件内容字节流，可直接作为 StreamResponse 的 data。
+        """
+        keys = list(mapping_dict)
+        header = [mapping_dict[key] for key in keys]
+        if file_format == 'csv':
+            yield codecs.BOM_UTF8 + cls.__csv_rows([header])
+            async for batch in batches:
+                yield cls.__csv_rows([[cls.__escape_formula(item.get(key)) for key in keys] for item in batch])
+            return
+
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title='Sheet1')
+        ws.append(header)
+        tmp = tempfile.TemporaryFile()
+        try:
+            async for batch in batches:
+                rows = [[cls.__cell_value(item.get(key)) for key in keys] for item in batch]
+                await asyncio.to_thread(cls.__append_rows, ws, rows)
+            await asyncio.to_thread(wb.save, tmp)
+            tmp.seek(0)
+            while chunk := await asyncio.to_thread(tmp.read, 64 * 1024):
+                yield chunk
+        finally:
+            tmp.close()
+
+
+@dataclasses.dataclass
+class ImportColumn:
+    """
+    导入列定义
+
+    - header: Excel 表头
+    - field: 对应的字段名
+    - type: 目标类型(str/int/float/datetime)，按列整体转换
+    - required: 是否必填(设置了 default 时空值取默认值)
+    - choices: 显示值到存储值的映射(如 {'男': '0'})，未设置 default 时不在映射中的值视为错误
+    - default: 空值或不在 choices 中时的默认值
+    - max_length: 字符串最大长度
+    - unique: 是否要求在整个文件内唯一
+    """
+    header: str
+    field: str
+    type: Literal["str", "int", "float", "datetime"] = "str"
+    required: bool = False
+    choices: dict[str, Any] | None = None
+    default: Any = None
+    max_length: int | None = None
+    unique: bool = False
+
+
+@dataclasses.dataclass
+class ImportResult:
+    """导入结果统计"""
+    processed: int = 0
+    success: int = 0
+    failed: int = 0
+    errors: list[str] = dataclasses.field(default_factory=list)
+
+    def add_error(self, row: int | str, msg: str, count: int = 1) -> None:
+        """
+        记录一行(或一段行)的错误，超过 IMPORT_MAX_ERRORS 的错误只计数不保留
+
+        参数:
+        - row (int | str): 行号(不含表头，从1开始)或行号范围。
+        - msg (str): 错误信息。
+        - count (int): 失败行数。
+        """
+        self.failed += count
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append(f"第{row}行: {msg}")
+
+    def message(self) -> str:
+        """
+        生成导入结果消息
+
+        返回:
+        - str: 导入结果消息。
+        """
+        result = f"成功导入 {self.success} 条数据"
+        if self.errors:
+            result += "\n错误信息:\n" + "\n".join(self.errors)
+            if self.failed > len(self.errors):
+                result += f"\n... 共 {self.failed} 行失败，其余错误未显示"
+        return result
+
+
+class ImportProgress:
+    """
+    导入进度(Redis Hash)，前端以任务编号轮询
+
+    键名按发起导入的用户隔离，其他用户无法查询或覆盖(进度信息中含行错误明细)。
+    字段: status(running/success/failed)、total(预估总行数)、processed、success、failed、message
+    """
+
+    def __init__(self, redis: Redis | None, task_id: str | None, user_id: int | None = None) -> None:
+        """
+        初始化
+
+        参数:
+        - redis (Redis | None): Redis客户端，为空时不记录进度。
+        - task_id (str | None): 任务编号，为空时不记录进度。
+        - user_id (int | None): 发起导入的用户ID，为空时不记录进度。
+        """
+        self.redis = redis
+        self.task_id = task_id
+        self.user_id = user_id
+
+    @staticmethod
+    def key(user_id: int, task_id: str) -> str:
+        """进度键名"""
+        return f"{RedisInitKeyConfig.IMPORT_PROGRESS.key}:{user_id}:{task_id}"
+
+    async def update(self, **fields: Any) -> None:
+        """
+        更新进度(失败只记录日志，不影响导入)
+
+        参数:
+        - **fields (Any): 进度字段。
+        """
+        if self.redis is None or not self.task_id or self.user_id is None:
+            return
+        key = self.key(self.user_id, self.task_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={k: str(v) for k, v in fields.items()})
+                pipe.expire(key, settings.IMPORT_PROGRESS_EXPIRE)
+                await pipe.execute()
+        except Exception as e:
+            log.error(f"更新导入进度失败: {str(e)}")
+
+    @classmethod
+    async def get(cls, redis: Redis, user_id: int, task_id: str) -> dict[str, Any]:
+        """
+        查询导入进度
+
+        参数:
+        - redis (Redis): Redis客户端。
+        - user_id (int): 发起导入的用户ID。
+        - task_id (str): 任务编号。
+
+        返回:
+        - dict[str, Any]: 进度信息，任务不存在时为空字典。
+        """
+        data: dict[str, Any] = await redis.hgetall(cls.key(user_id, task_id))
+        for field in ("total", "processed", "success", "failed"):
+            if field in data:
+                data[field] = int(data[field])
+        return data
+
+
+# 分块写入回调: (独立会话, [(行号, 行数据)], 导入结果) -> 成功写入行数
+ImportWriter = Callable[[AsyncSession, list[tuple[int, dict[str, Any]]], ImportResult], Awaitable[int]]
+
+
+class ExcelImporter:
+    """
+    流式 Excel/CSV 导入引擎
+
+    - 读取: openpyxl 只读模式(CSV 使用 pandas 分块)按 IMPORT_CHUNK_SIZE 行逐块读取，不把整个文件读入内存；
+    - 校验: 按 ImportColumn 对整列做类型转换、必填、映射、长度和文件内唯一校验，可选再经 schema 逐行校验；
+    - 写入: 每块校验通过的行交给 writer，在独立的短事务中写入(通常为 bulk_create/bulk_upsert)，
+      某块写入失败时回滚该块，再在一个事务中逐行重试(每行一个 SAVEPOINT)，只有写入失败的行记为错误；
+    - 进度: 每块处理完后写入 Redis，前端通过任务编号轮询。
+    """
+
+    def __init__(
+        self,
+        columns: list[ImportColumn],
+        schema: type[BaseModel] | None = None,
+        exclude: set[str] | None = None,
+        chunk_size: int | None = None,
+        redis: Redis | None = None,
+        task_id: str | None = None,
+        user_id: int | None = None,
+    ) -> None:
+        """
+        初始化
+
+        参数:
+        - columns (list[ImportColumn]): 导入列定义。
+        - schema (type[BaseModel] | None): 逐行校验使用的模型，校验后以 model_dump() 结果写入。
+        - exclude (set[str] | None): model_dump 时排除的字段。
+        - chunk_size (int | None): 每块行数，默认 IMPORT_CHUNK_SIZE。
+        - redis (Redis | None): 记录进度使用的 Redis 客户端。
+        - task_id (str | None): 进度任务编号。
+        - user_id (int | None): 发起导入的用户ID(进度按用户隔离)。
+        """
+        self.columns = columns
+        self.schema = schema
+        self.exclude = exclude
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.progress = ImportProgress(redis=redis, task_id=task_id, user_id=user_id)
+        self.total = 0
+        self._seen: dict[str, set] = {column.field: set() for column in columns if column.unique}
+
+    def _iter_frames(self, fileobj: IO[bytes], filename: str) -> Iterator[pd.DataFrame]:
+        """
+        分块读取文件，DataFrame 的索引为数据行号(不含表头，从1开始)
+
+        参数:
+        - fileobj (IO[bytes]): 文件对象。
+        - filename (str): 文件名(用于判断是否为 CSV)。
+
+        返回:
+        - Iterator[pd.DataFrame]: 分块数据。
+        """
+        import pandas as pd
+
+        if filename.lower().endswith(".csv"):
+            start = 1
+            for df in pd.read_csv(fileobj, chunksize=self.chunk_size, dtype=object, skip_blank_lines=False):
+                df.index = range(start, start + len(df))
+                start += len(df)
+                yield df
+            return
+
+        from openpyxl import load_workbook
+
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            if not ws:
+                raise CustomException(msg="不存在活动工作表")
+            self.total = max((ws.max_row or 1) - 1, 0)
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(value).strip() if value is not None else "" for value in header]
+            buffer: list[tuple] = []
+            start = 1
+            for row in rows:
+                buffer.append(row[:len(header)])
+                if len(buffer) >= self.chunk_size:
+                    yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer)))
+                    start += len(buffer)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer)))
+        finally:
+            wb.close()
+
+    def _check_headers(self, df: pd.DataFrame) -> None:
+        """检查表头是否完整"""
+        missing_headers = [column.header for column in self.columns if column.header not in df.columns]
+        if missing_headers:
+            raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
+
+    def _convert(self, column: ImportColumn, series: pd.Series, errors: dict[int, list[str]]) -> pd.Series:
+        """
+        整列转换与校验
+
+        参数:
+        - column (ImportColumn): 列定义。
+        - series (pd.Series): 原始列数据。
+        - errors (dict[int, list[str]]): 行号到错误信息的映射(原地追加)。
+
+        返回:
+        - pd.Series: 转换后的列(空值为 None/NA)。
+        """
+        import pandas as pd
+
+        def fail(mask: pd.Series, msg: Callable[[Any], str]) -> None:
+            for row, value in series[mask].items():
+                errors.setdefault(row, []).append(msg(value))
+
+        # Excel 中的整数可能以浮点数保存(如手机号)，先去掉小数部分再统一按字符串处理
+        series = series.map(lambda v: int(v) if isinstance(v, float) and v.is_integer() else v)
+        text = series.astype("string").str.strip()
+        blank = text.fillna("").eq("")
+        text = text.mask(blank)
+
+        if column.choices is not None:
+            value = text.map(column.choices)
+            invalid = ~blank & value.isna()
+            if column.default is None:
+                fail(invalid, lambda v: f"{column.header}的值 {v} 不在可选范围内")
+            else:
+                value = value.mask(invalid, column.default)
+        elif column.type == "int":
+            number = pd.to_numeric(text, errors="coerce")
+            invalid = ~blank & (number.isna() | (number % 1 != 0))
+            fail(invalid, lambda v: f"{column.header}的值 {v} 不是整数")
+            value = number.mask(invalid).astype("Int64")
+        elif column.type == "float":
+            value = pd.to_numeric(text, errors="coerce")
+            fail(~blank & value.isna(), lambda v: f"{column.header}的值 {v} 不是数字")
+        elif column.type == "datetime":
+            value = pd.to_datetime(series.mask(blank), errors="coerce")
+            fail(~blank & value.isna(), lambda v: f"{column.header}的值 {v} 不是有效的日期时间")
+        else:
+            value = text
+            if column.max_length:
+                fail(text.str.len().fillna(0) > column.max_length, lambda v: f"{column.header}长度不能超过{column.max_length}")
+
+        if column.default is not None:
+            value = value.astype(object).mask(blank, column.default)
+        elif column.required:
+            fail(blank, lambda v: f"{column.header}不能为空")
+
+        if column.unique:
+            seen = self._seen[column.field]
+            duplicated = ~blank & (value.duplicated(keep="first") | value.isin(list(seen)))
+            fail(duplicated, lambda v: f"{column.header} {v} 在文件中重复")
+            seen.update(value[~blank & ~duplicated].tolist())
+        return value
+
+    def validate(self, df: pd.DataFrame, result: ImportResult) -> list[tuple[int, dict[str, Any]]]:
+        """
+        校验并转换一块数据，错误行计入 result
+
+        参数:
+        - df (pd.DataFrame): 原始数据块。
+        - result (ImportResult): 导入结果。
+
+        返回:
+        - list[tuple[int, dict[str, Any]]]: 校验通过的 (行号, 行数据) 列表。
+        """
+        import pandas as pd
+
+        # 跳过空行
+        df = df[~df.isna().all(axis=1)]
+        if df.empty:
+            return []
+
+        errors: dict[int, list[str]] = {}
+        frame = pd.DataFrame(
+            {column.field: self._convert(column, df[column.header], errors) for column in self.columns},
+            index=df.index,
+        )
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        rows = []
+        headers = {column.field: column.header for column in self.columns}
+        for row, data in zip(frame.index, frame.to_dict(orient="records")):
+            if row in errors:
+                result.add_error(row, "；".join(errors[row]))
+                continue
+            if self.schema:
+                try:
+                    data = self.schema.model_validate(data).model_dump(exclude=self.exclude)
+                except ValidationError as e:
+                    result.add_error(row, "；".join(
+                        f"{headers.get(str(err['loc'][0]), err['loc'][0]) if err['loc'] else ''} {err['msg']}".strip()
+                        for err in e.errors()
+                    ))
+                    continue
+            rows.append((row, data))
+        return rows
+
+    @staticmethod
+    async def _write(rows: list[tuple[int, dict[str, Any]]], writer: ImportWriter, result: ImportResult) -> None:
+        """
+        写入一块数据: 整块写入失败时逐行重试，定位具体的失败行
+
+        writer 在失败的事务中记录的错误随事务一起撤销，避免与逐行重试的错误重复计数。
+
+        参数:
+        - rows (list[tuple[int, dict[str, Any]]]): 校验通过的 (行号, 行数据) 列表。
+        - writer (ImportWriter): 分块写入回调。
+        - result (ImportResult): 导入结果。
+        """
+        failed, errors = result.failed, len(result.errors)
+        try:
+            async with async_db_session() as db:
+                async with db.begin():
+                    result.success += await writer(db, rows, result)
+            return
+        except Exception as e:
+            result.failed = failed
+            del result.errors[errors:]
+            if len(rows) == 1:
+                result.add_error(rows[0][0], f"写入失败: {str(e)}")
+                return
+            log.warning(f"导入第{rows[0][0]}-{rows[-1][0]}行批量写入失败，逐行重试: {str(e)}")
+
+        success = 0
+        try:
+            async with async_db_session() as db:
+                async with db.begin():
+                    for row in rows:
+                        row_failed, row_errors = result.failed, len(result.errors)
+                        try:
+                            async with db.begin_nested():
+                                success += await writer(db, [row], result)
+                        except Exception as e:
+                            result.failed = row_failed
+                            del result.errors[row_errors:]
+                            result.add_error(row[0], f"写入失败: {str(e)}")
+        except Exception as e:
+            # 提交失败时整块回滚，逐行重试期间的结果一并撤销
+            log.error(f"导入第{rows[0][0]}-{rows[-1][0]}行写入失败: {str(e)}")
+            result.failed = failed
+            del result.errors[errors:]
+            result.add_error(f"{rows[0][0]}-{rows[-1][0]}", f"写入失败: {str(e)}", count=len(rows))
+            return
+        result.success += success
+
+    async def run(self, file: UploadFile, writer: ImportWriter) -> ImportResult:
+        """
+        执行导入
+
+        参数:
+        - file (UploadFile): 上传的 Excel/CSV 文件。
+        - writer (ImportWriter): 分块写入回调。
+
+        返回:
+        - ImportResult: 导入结果。
+
+        异常:
+        - CustomException: 文件为空或缺少必要的列时抛出。
+        """
+        result = ImportResult()
+        frames = self._iter_frames(file.file, file.filename or "")
+        checked = False
+        await self.progress.update(status="running", total=0, processed=0, success=0, failed=0, message="")
+        try:
+            while True:
+                # 文件解析是同步阻塞操作，逐块放到线程中执行
+                df = await asyncio.to_thread(next, frames, None)
+                if df is None:
+                    break
+                if not checked:
+                    self._check_headers(df)
+                    checked = True
+                rows = self.validate(df, result)
+                if rows:
+                    await self._write(rows, writer, result)
+                result.processed += len(df)
+                await self.progress.update(
+                    total=max(self.total, result.processed),
+                    processed=result.processed,
+                    success=result.success,
+                    failed=result.failed,
+                )
+            if not checked or result.processed == 0:
+                raise CustomException(msg="导入文件为空")
+        except Exception as e:
+            await self.progress.update(status="failed", message=str(e))
+            raise
+        finally:
+            frames.close()
+            await file.close()
+
+        await self.progress.update(status="success", total=result.processed, message=result.message())
+        return result
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import hashlib
+import multiprocessing
 import os
-from typing import Any
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Sequence, TypeVar
 
 from passlib.context import CryptContext
 from cryptography.hazmat.backends.openssl import backend
@@ -10,22 +13,103 @@ from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from itsdangerous import URLSafeSerializer
 
+from app.config.setting import settings
 from app.core.logger import log
 
 
+T = TypeVar("T")
+
+
 # 密码加密配置
 PwdContext = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12  # 设置加密轮数,增加安全性
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,  # 设置加密轮数,增加安全性
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS  # 低于该轮数的哈希视为需要更新
 )
 
 
+def _hash(password: str) -> str:
+    """进程池任务: 计算密码哈希"""
+    return PwdContext.hash(password)
+
+
+def _verify(plain_password: str, password_hash: str) -> bool:
+    """进程池任务: 校验密码"""
+    return PwdContext.verify(plain_password, password_hash)
+
+
+def _verify_and_update(plain_password: str, password_hash: str) -> tuple[bool, str | None]:
+    """进程池任务: 校验密码，并在哈希策略过期时返回新哈希"""
+    return PwdContext.verify_and_update(plain_password, password_hash)
+
+
 class PwdUtil:
     """
     密码工具类,提供密码加密和验证功能
+
+    bcrypt 是 CPU 密集型计算(12 轮约 250ms)，在事件循环中直接调用会阻塞整个 worker。
+    协程中请使用 *_async 方法，计算会被转移到有界进程池中执行。
     """
 
+    _executor: Executor | None = None
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        """
+        获取(懒加载)密码哈希执行器
+
+        返回:
+        - Executor: PASSWORD_HASH_WORKERS > 0 时为进程池，否则为线程池。
+        """
+        if cls._executor is None:
+            workers = settings.PASSWORD_HASH_WORKERS
+            if workers > 0:
+                # 使用 spawn 避免在已运行事件循环/线程的进程中 fork
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                cls._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwd-hash")
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, func: Callable[..., T], *args: Any) -> T:
+        """
+        在密码哈希执行器中运行任务
+
+        参数:
+        - func (Callable[..., T]): 模块级任务函数(需可被 pickle)。
+        - *args (Any): 任务参数。
+
+        返回:
+        - T: 任务结果。
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(cls._get_executor(), func, *args)
+        except BrokenExecutor:
+            # 子进程异常退出后进程池不可再用，重建后重试一次
+            log.warning("密码哈希进程池已损坏，正在重建")
+            cls.shutdown(wait=False)
+            return await loop.run_in_executor(cls._get_executor(), func, *args)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True) -> None:
+        """
+        关闭密码哈希执行器
+
+        参数:
+        - wait (bool): 是否等待进行中的任务完成。
+
+        返回:
+        - None
+        """
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=wait, cancel_futures=True)
+            cls._executor = None
+
     @classmethod
     def verify_password(cls, plain_password: str, password_hash: str) -> bool:
         """
@@ -38,7 +122,7 @@ class PwdUtil:
         返回:
         - bool: 密码是否匹配。
         """
-        return PwdContext.verify(plain_password, password_hash)
+        return _verify(plain_password, password_hash)
 
     @classmethod 
     def set_password_hash(cls, password: str) -> str:
@@ -51,7 +135,79 @@ class PwdUtil:
         返回:
         - str: 加密后的密码哈希值。
         """
-        return PwdContext.hash(password)
+        return _hash(password)
+
+    @classmethod
+    def needs_rehash(cls, password_hash: str) -> bool:
+        """
+        判断密码哈希是否不符合当前加密策略(算法或轮数)
+
+        参数:
+        - password_hash (str): 加密后的密码哈希值。
+
+        返回:
+        - bool: 是否需要重新加密。
+        """
+        return PwdContext.needs_update(password_hash)
+
+    @classmethod
+    async def verify_password_async(cls, plain_password: str, password_hash: str) -> bool:
+        """
+        异步校验密码是否匹配(不阻塞事件循环)
+
+        参数:
+        - plain_password (str): 明文密码。
+        - password_hash (str): 加密后的密码哈希值。
+
+        返回:
+        - bool: 密码是否匹配。
+        """
+        return await cls._run(_verify, plain_password, password_hash)
+
+    @classmethod
+    async def set_password_hash_async(cls, password: str) -> str:
+        """
+        异步对密码进行加密(不阻塞事件循环)
+
+        参数:
+        - password (str): 明文密码。
+
+        返回:
+        - str: 加密后的密码哈希值。
+        """
+        return await cls._run(_hash, password)
+
+    @classmethod
+    async def verify_and_update_async(cls, plain_password: str, password_hash: str) -> tuple[bool, str | None]:
+        """
+        异步校验密码，并在哈希不符合当前加密策略时生成新哈希(用于登录时透明升级)
+
+        参数:
+        - plain_password (str): 明文密码。
+        - password_hash (str): 加密后的密码哈希值。
+
+        返回:
+        - tuple[bool, str | None]: (密码是否匹配, 需要更新时的新哈希，否则为None)。
+        """
+        return await cls._run(_verify_and_update, plain_password, password_hash)
+
+    @classmethod
+    async def bulk_password_hash_async(cls, passwords: Sequence[str]) -> list[str]:
+        """
+        批量异步加密密码(批量导入场景)
+
+        相同的明文只计算一次哈希，不同明文在进程池中并行计算。
+
+        参数:
+        - passwords (Sequence[str]): 明文密码列表。
+
+        返回:
+        - list[str]: 与输入顺序一致的密码哈希列表。
+        """
+        unique = list(dict.fromkeys(passwords))
+        hashes = await asyncio.gather(*(cls._run(_hash, password) for password in unique))
+        mapping = dict(zip(unique, hashes))
+        return [mapping[password] for password in passwords]
 
     @classmethod
     def check_password_strength(cls, password: str) -> str | None:
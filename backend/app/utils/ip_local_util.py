@@ -1,16 +1,43 @@
 # -*- coding: utf-8 -*-
 
 import re
+import csv
+import mmap
+import socket
+import struct
 import httpx
+from collections import OrderedDict
+from pathlib import Path
 
+from app.config.path_conf import BASE_DIR
+from app.config.setting import settings
 from app.core.logger import log
 
 
 class IpLocalUtil:
     """
     获取IP归属地工具类
+
+    优先查询本地离线IP库(按起始IP排序的区间表，mmap 映射后二分查找)，
+    结果进入进程内 LRU 缓存；离线库不存在时回退到远程API(IP_LOCATION_REMOTE_ENABLE 为 False 时除外)，
+    IP_LOCATION_REMOTE_ENABLE 为 True 时离线库未命中也回退。离线库由 python main.py build-ipdb 生成。
+
+    离线库文件格式(小端):
+    - 头部: magic(4s)=b"IPDB" + 记录数(uint32)
+    - 索引: 记录数 × [起始IP(uint32), 结束IP(uint32), 归属地偏移(uint32), 归属地长度(uint16)]
+    - 数据: UTF-8 编码的归属地字符串
     """
-    
+
+    DB_MAGIC: bytes = b"IPDB"
+    DB_HEADER = struct.Struct("<4sI")
+    DB_RECORD = struct.Struct("<IIIH")
+    UNKNOWN: str = "未知"
+
+    _db: mmap.mmap | None = None
+    _db_count: int = 0
+    _db_loaded: bool = False
+    _cache: OrderedDict[str, str] = OrderedDict()
+    _client: httpx.AsyncClient | None = None
     @classmethod
     def is_valid_ip(cls, ip: str) -> bool:
         """
@@ -39,6 +66,119 @@ class IpLocalUtil:
         priv_pattern = r'^(127\.|10\.|172\.(1[6-9]|2[0-9]|3[01])\.|192\.168\.)'
         return bool(re.match(priv_pattern, ip))
 
+    @classmethod
+    def load_database(cls, path: str | Path | None = None) -> bool:
+        """
+        加载(或重新加载)离线IP库。
+        
+        参数:
+        - path (str | Path | None): 离线库路径，默认使用 IP_LOCATION_DB_PATH。
+        
+        返回:
+        - bool: 是否加载成功。
+        """
+        cls._db_loaded = True
+        db_path = Path(path or settings.IP_LOCATION_DB_PATH)
+        if not db_path.is_absolute():
+            db_path = BASE_DIR / db_path
+        if not db_path.exists():
+            log.warning(f"离线IP库不存在: {db_path}")
+            return False
+
+        try:
+            with open(db_path, "rb") as f:
+                db = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = cls.DB_HEADER.unpack_from(db, 0)
+            if magic != cls.DB_MAGIC:
+                db.close()
+                log.error(f"离线IP库格式不正确: {db_path}")
+                return False
+        except Exception as e:
+            log.error(f"加载离线IP库失败: {e}")
+            return False
+
+        if cls._db is not None:
+            cls._db.close()
+        cls._db, cls._db_count = db, count
+        cls._cache.clear()
+        return True
+
+    @classmethod
+    def lookup_local(cls, ip: str) -> str | None:
+        """
+        在离线IP库中二分查找IP所在区间。
+        
+        参数:
+        - ip (str): IPv4地址。
+        
+        返回:
+        - str | None: IP归属地信息，未命中或离线库不可用时返回None。
+        """
+        if not cls._db_loaded:
+            cls.load_database()
+        db = cls._db
+        if db is None:
+            return None
+
+        value = struct.unpack("!I", socket.inet_aton(ip))[0]
+        base, size = cls.DB_HEADER.size, cls.DB_RECORD.size
+        lo, hi = 0, cls._db_count - 1
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            start, end, offset, length = cls.DB_RECORD.unpack_from(db, base + mid * size)
+            if value < start:
+                hi = mid - 1
+            elif value > end:
+                lo = mid + 1
+            else:
+                return db[offset:offset + length].decode("utf-8")
+        return None
+
+    @classmethod
+    def build_database(cls, source: str | Path, target: str | Path | None = None) -> int:
+        """
+        由 CSV 区间表生成离线IP库文件。
+        
+        参数:
+        - source (str | Path): CSV文件，每行为 起始IP,结束IP,归属地(IP可为点分格式或整数)。
+        - target (str | Path | None): 输出路径，默认使用 IP_LOCATION_DB_PATH。
+        
+        返回:
+        - int: 写入的区间数。
+        """
+        def to_int(ip: str) -> int:
+            ip = ip.strip()
+            return int(ip) if ip.isdigit() else struct.unpack("!I", socket.inet_aton(ip))[0]
+
+        ranges = []
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if len(row) < 3 or row[0].startswith("#"):
+                    continue
+                ranges.append((to_int(row[0]), to_int(row[1]), row[2].strip()))
+        ranges.sort()
+
+        pool = bytearray()
+        offsets: dict[str, tuple[int, int]] = {}
+        data_start = cls.DB_HEADER.size + cls.DB_RECORD.size * len(ranges)
+        index = bytearray()
+        for start, end, location in ranges:
+            if location not in offsets:
+                encoded = location.encode("utf-8")
+                offsets[location] = (data_start + len(pool), len(encoded))
+                pool += encoded
+            index += cls.DB_RECORD.pack(start, end, *offsets[location])
+
+        db_path = Path(target or settings.IP_LOCATION_DB_PATH)
+        if not db_path.is_absolute():
+            db_path = BASE_DIR / db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(db_path, "wb") as f:
+            f.write(cls.DB_HEADER.pack(cls.DB_MAGIC, len(ranges)))
+            f.write(index)
+            f.write(pool)
+        return len(ranges)
+
     @classmethod
     async def get_ip_location(cls, ip: str) -> str | None:
         """
@@ -48,38 +188,81 @@ class IpLocalUtil:
         - ip (str): IP地址。
         
         返回:
-        - str | None: IP归属地信息，失败时返回"未知"或None。
+        - str | None: IP归属地信息，失败时返回"未知"。
         """
         # 校验IP格式
         if not cls.is_valid_ip(ip):
             log.error(f"IP格式不合法: {ip}")
-            return "未知"
+            return cls.UNKNOWN
         
         # 内网IP直接返回
         if cls.is_private_ip(ip):
             return '内网IP'
-            
+
+        location = cls._cache.get(ip)
+        if location is not None:
+            cls._cache.move_to_end(ip)
+            return location
+
+        location = cls.lookup_local(ip)
+        if location is None and cls.remote_enabled():
+            location = await cls.get_remote_location(ip)
+            if location is None:
+                # 远程失败不缓存，下次再试
+                return cls.UNKNOWN
+
+        location = location or cls.UNKNOWN
+        cls._cache[ip] = location
+        if len(cls._cache) > settings.IP_LOCATION_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return location
+
+    @classmethod
+    def remote_enabled(cls) -> bool:
+        """
+        是否回退到远程API(未显式配置时仅在离线库不可用时回退)。
+        
+        返回:
+        - bool: 是否回退。
+        """
+        if settings.IP_LOCATION_REMOTE_ENABLE is not None:
+            return settings.IP_LOCATION_REMOTE_ENABLE
+        if not cls._db_loaded:
+            cls.load_database()
+        return cls._db is None
+
+    @classmethod
+    async def get_remote_location(cls, ip: str) -> str | None:
+        """
+        通过远程API获取IP归属地信息。
+        
+        参数:
+        - ip (str): IP地址。
+        
+        返回:
+        - str | None: IP归属地信息，失败时返回None。
+        """
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(timeout=settings.IP_LOCATION_REMOTE_TIMEOUT)
+        client = cls._client
         try:
-            # 使用ip-api.com API获取IP归属地信息
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # 尝试使用 ip9.com.cn API
-                url = f'https://ip9.com.cn/get?ip={ip}'
-                response = await cls._make_api_request(client, url)
-                if response and response.json().get('ret') == 200:
-                    result = response.json().get('data', {})
-                    return f"{result.get('country','')}-{result.get('prov','')}-{result.get('city','')}-{result.get('area','')}-{result.get('isp','')}"
-
-                # 尝试使用百度 API
-                url = f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={ip}'
-                response = await cls._make_api_request(client, url)
-                if response and response.json().get('code') == "Success":
-                    data = response.json().get('data', {})
-                    # 修正原代码中的格式错误
-                    return f"{data.get('country','')}-{data.get('prov','')}-{data.get('city','')}-{data.get('district','')}-{data.get('isp','')}"
+            # 尝试使用 ip9.com.cn API
+            url = f'https://ip9.com.cn/get?ip={ip}'
+            response = await cls._make_api_request(client, url)
+            if response and response.json().get('ret') == 200:
+                result = response.json().get('data', {})
+                return f"{result.get('country','')}-{result.get('prov','')}-{result.get('city','')}-{result.get('area','')}-{result.get('isp','')}"
+
+            # 尝试使用百度 API
+            url = f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={ip}'
+            response = await cls._make_api_request(client, url)
+            if response and response.json().get('code') == "Success":
+                data = response.json().get('data', {})
+                return f"{data.get('country','')}-{data.get('prov','')}-{data.get('city','')}-{data.get('district','')}-{data.get('isp','')}"
 
         except Exception as e:
             log.error(f"获取IP归属地失败: {e}")
-            return "未知"
+        return None
 
     @classmethod
     async def _make_api_request(cls, client, url):
@@ -93,10 +276,10 @@ class IpLocalUtil:
         返回:
         - Response | None: 响应对象，失败时返回None。
         """
-        max_retries = 3
+        max_retries = 2
         for attempt in range(max_retries):
             try:
-                response = await client.get(url, timeout=10)
+                response = await client.get(url)
                 if response.status_code == 200:
                     return response
             except Exception as e:
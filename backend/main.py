@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import os
-from typing import Annotated
-import uvicorn
+from typing import Annotated, Optional
 import typer
 from fastapi import FastAPI
 from alembic import command
@@ -49,8 +48,15 @@ def create_app() -> FastAPI:
 
 # typer.Option是非必填；typer.Argument是必填
 @fastapiadmin_cli.command(name="run", help="启动 FastapiAdmin 服务, 运行 python main.py run --env=dev 不加参数默认 dev 环境")
-def run(env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")] = EnvironmentEnum.DEV) -> None:
-    """启动FastAPI服务"""
+def run(
+    env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")] = EnvironmentEnum.DEV,
+    workers: Annotated[Optional[int], typer.Option("--workers", help="worker 进程数(生产环境)，默认取 SERVER_WORKERS")] = None,
+    preload: Annotated[Optional[bool], typer.Option("--preload/--no-preload", help="多进程时主进程预加载应用并完成预热，默认取 SERVER_PRELOAD")] = None,
+    loop: Annotated[Optional[str], typer.Option("--loop", help="事件循环实现 (auto, asyncio, uvloop)，默认取 SERVER_LOOP")] = None,
+    http: Annotated[Optional[str], typer.Option("--http", help="HTTP 协议解析实现 (auto, h11, httptools)，默认取 SERVER_HTTP")] = None,
+    max_requests: Annotated[Optional[int], typer.Option("--max-requests", help="worker 处理请求数达到该值后平滑重启，默认取 SERVER_MAX_REQUESTS")] = None,
+) -> None:
+    """启动FastAPI服务(生产环境多进程时由 gunicorn 管理 worker，kill -HUP 主进程平滑重启)"""
 
     try:
         # 设置环境变量
@@ -69,14 +75,19 @@ def run(env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境
         from app.utils.banner import worship
         worship(env.value)
         
-        # 启动uvicorn服务
-        uvicorn.run(
-            app=f'main:create_app', 
-            host=settings.SERVER_HOST,
-            port=settings.SERVER_PORT,
-            reload=True if env.value == EnvironmentEnum.DEV.value else False,
-            factory=True,
-            log_config=None
+        # 启动服务(开发环境单进程热重载，生产环境按配置启动多进程)
+        from app.core.server import run_server
+        dev = env.value == EnvironmentEnum.DEV.value
+        run_server(
+            app='main:create_app',
+            workers=1 if dev else (workers or settings.SERVER_WORKERS),
+            reload=dev,
+            preload=settings.SERVER_PRELOAD if preload is None else preload,
+            loop=loop or settings.SERVER_LOOP,
+            http=http or settings.SERVER_HTTP,
+            max_requests=settings.SERVER_MAX_REQUESTS if max_requests is None else max_requests,
+            max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+            graceful_timeout=settings.SERVER_GRACEFUL_TIMEOUT,
         )
         
     except KeyboardInterrupt:
@@ -102,6 +113,119 @@ def upgrade(env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行
     command.upgrade(alembic_cfg, "head")
     typer.echo("所有迁移已应用。")
 
+@fastapiadmin_cli.command(name="build-ipdb", help="由 CSV 区间表生成离线IP库, 运行 python main.py build-ipdb ip.csv")
+def build_ipdb(
+    source: Annotated[str, typer.Argument(help="CSV文件，每行为 起始IP,结束IP,归属地(IP可为点分格式或整数)")],
+    target: Annotated[Optional[str], typer.Option("--target", help="输出路径，默认取 IP_LOCATION_DB_PATH")] = None,
+) -> None:
+    """生成离线IP库，生成后 IP 归属地优先查询离线库"""
+    from app.utils.ip_local_util import IpLocalUtil
+    count = IpLocalUtil.build_database(source=source, target=target)
+    typer.echo(f"离线IP库已生成: {count} 个区间")
+
+@fastapiadmin_cli.command(name="bench-middleware", help="测试全局中间件栈的吞吐量, 运行 python main.py bench-middleware --requests=5000")
+def bench_middleware(
+    requests: Annotated[int, typer.Option("--requests", help="每轮请求数")] = 5000,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="并发数")] = 50,
+) -> None:
+    """对比启用/不启用全局中间件栈时的每秒请求数(进程内ASGI调用，不含网络开销)"""
+    import asyncio
+    import time
+    import httpx
+    from loguru import logger
+    from app.plugin.init_app import register_middlewares
+    from app.core.system_config import SystemConfigCache, SystemConfigSnapshot
+
+    # 屏蔽日志输出并使用空配置快照，只测量中间件本身的开销
+    logger.remove()
+    SystemConfigCache._snapshot = SystemConfigSnapshot()
+
+    def build(with_stack: bool) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping() -> dict:
+            return {"msg": "pong", "data": list(range(500))}
+
+        if with_stack:
+            register_middlewares(app)
+        return app
+
+    async def bench(app: FastAPI) -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def worker(count: int) -> None:
+                for _ in range(count):
+                    await client.get("/ping", headers={"Accept-Encoding": "gzip"})
+
+            await worker(100)  # 预热
+            start = time.perf_counter()
+            per_worker, rest = divmod(requests, concurrency)
+            await asyncio.gather(*(worker(per_worker + (1 if i < rest else 0)) for i in range(concurrency)))
+            return requests / (time.perf_counter() - start)
+
+    bare = asyncio.run(bench(build(with_stack=False)))
+    stacked = asyncio.run(bench(build(with_stack=True)))
+    typer.echo(f"无中间件: {bare:.0f} req/s")
+    typer.echo(f"全局中间件栈: {stacked:.0f} req/s ({stacked / bare * 100:.1f}%)")
+
+
+@fastapiadmin_cli.command(name="build-routes", help="生成路由清单(部署时执行), 运行 python main.py build-routes --env=prod")
+def build_routes(env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")] = EnvironmentEnum.PROD) -> None:
+    """扫描全部控制器并生成路由清单，非开发环境启动时按清单注册路由"""
+    os.environ["ENVIRONMENT"] = env.value
+    from app.core.discover import DiscoverRouter
+    path = DiscoverRouter().write_manifest()
+    typer.echo(f"路由清单已生成: {path}")
+
+@fastapiadmin_cli.command(name="bench-startup", help="分析冷启动导入耗时, 运行 python main.py bench-startup --env=prod --top=20")
+def bench_startup(
+    env: Annotated[EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")] = EnvironmentEnum.PROD,
+    runs: Annotated[int, typer.Option("--runs", help="冷启动次数")] = 3,
+    top: Annotated[int, typer.Option("--top", help="显示最慢的模块/包数量")] = 20,
+) -> None:
+    """在子进程中以 python -X importtime 创建应用(不执行 lifespan)，统计冷启动耗时与最慢的导入"""
+    import subprocess
+    import sys
+    import time
+    from collections import defaultdict
+
+    cmd = [sys.executable, "-X", "importtime", "-c", "import main; main.create_app()"]
+    child_env = {**os.environ, "ENVIRONMENT": env.value}
+    walls: list[float] = []
+    stderr = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=child_env, cwd=os.path.dirname(os.path.abspath(__file__)))
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            typer.echo(proc.stderr[-4000:], err=True)
+            raise typer.Exit(proc.returncode)
+        stderr = proc.stderr
+
+    # 解析 "import time: self [us] | cumulative | imported package"
+    modules: list[tuple[int, int, str]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((int(parts[0]), int(parts[1]), parts[2].strip()))
+
+    packages: dict[str, int] = defaultdict(int)
+    for self_us, _, name in modules:
+        packages[name.split(".")[0]] += self_us
+
+    typer.echo(f"冷启动耗时({runs} 次): 最短 {min(walls):.2f}s, 平均 {sum(walls) / len(walls):.2f}s")
+    typer.echo(f"模块导入总耗时: {sum(m[0] for m in modules) / 1e6:.2f}s ({len(modules)} 个模块)")
+    typer.echo(f"\n按顶级包统计的导入耗时(前 {top}):")
+    for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        typer.echo(f"  {self_us / 1000:>9.1f} ms  {name}")
+    typer.echo(f"\n累计耗时最长的模块(前 {top}):")
+    for _, cumulative, name in sorted(modules, key=lambda item: item[1], reverse=True)[:top]:
+        typer.echo(f"  {cumulative / 1000:>9.1f} ms  {name}")
+
 
 if __name__ == '__main__':
     
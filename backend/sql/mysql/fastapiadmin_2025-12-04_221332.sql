@@ -114,6 +114,8 @@ CREATE TABLE `app_job_log` (
   `job_trigger` varchar(255) DEFAULT NULL COMMENT '任务触发器',
   `job_message` varchar(500) DEFAULT NULL COMMENT '日志信息',
   `exception_info` varchar(2000) DEFAULT NULL COMMENT '异常信息',
+  `duration_ms` int DEFAULT NULL COMMENT '执行耗时(毫秒)',
+  `latency_ms` int DEFAULT NULL COMMENT '排队延迟(毫秒):计划执行时间到实际开始执行的间隔',
   `job_id` int DEFAULT NULL COMMENT '任务ID',
   `id` int NOT NULL AUTO_INCREMENT COMMENT '主键ID',
   `uuid` varchar(64) NOT NULL COMMENT 'UUID全局唯一标识',
@@ -385,6 +385,8 @@ CREATE TABLE public.app_job_log (
     job_trigger character varying(255),
     job_message character varying(500),
     exception_info character varying(2000),
+    duration_ms integer,
+    latency_ms integer,
     job_id integer,
     id integer NOT NULL,
     uuid character varying(64) NOT NULL,
@@ -467,6 +469,20 @@ COMMENT ON COLUMN public.app_job_log.job_message IS '日志信息';
 COMMENT ON COLUMN public.app_job_log.exception_info IS '异常信息';
 
 
+--
+-- Name: COLUMN app_job_log.duration_ms; Type: COMMENT; Schema: public; Owner: tao
+--
+
+COMMENT ON COLUMN public.app_job_log.duration_ms IS '执行耗时(毫秒)';
+
+
+--
+-- Name: COLUMN app_job_log.latency_ms; Type: COMMENT; Schema: public; Owner: tao
+--
+
+COMMENT ON COLUMN public.app_job_log.latency_ms IS '排队延迟(毫秒):计划执行时间到实际开始执行的间隔';
+
+
 --
 -- Name: COLUMN app_job_log.job_id; Type: COMMENT; Schema: public; Owner: tao
 --
@@ -2,13 +2,20 @@
 
 import sys
 import os
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 # 导入 main 模块，确保路径正确
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from main import create_app
+from app.core.base_model import MappedBase
 
 # 创建测试客户端
 app = create_app()
@@ -16,4 +23,43 @@ app = create_app()
 @pytest.fixture(scope="module")
 def test_client():
     with TestClient(app) as client:
-        yield client 
\ No newline at end of file
+        yield client
+
+@pytest.fixture
+def db_sessionmaker(tmp_path):
+    """
+    基于临时 SQLite 文件的异步会话工厂(已创建全部表并开启外键约束，支持 SAVEPOINT)
+
+    测试函数使用普通的 def 定义，在 asyncio.run 中使用该会话工厂
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+        # 由 SQLAlchemy 显式发出 BEGIN，否则 pysqlite 的隐式事务会破坏 SAVEPOINT
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async def create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(MappedBase.metadata.create_all)
+
+    asyncio.run(create_all())
+    yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+@pytest.fixture
+def redis_factory():
+    """
+    内存 Redis 工厂(每个测试独立的 FakeServer，支持 Lua 脚本)
+
+    Redis 连接绑定事件循环，需在 asyncio.run 内部调用工厂创建连接
+    """
+    server = FakeServer()
+    return lambda: FakeRedis(server=server, decode_responses=True)
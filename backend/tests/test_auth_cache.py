@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+认证用户缓存测试
+
+执行命令: pytest tests/test_auth_cache.py
+"""
+
+import asyncio
+
+from app.core.auth_cache import AuthUserCache
+from app.api.v1.module_system.user.model import UserModel
+
+
+def make_user() -> UserModel:
+    return UserModel(id=1, username="admin", name="管理员", status="0", is_superuser=True, dept_id=None, dept=None, positions=[], roles=[])
+
+
+def test_set_skips_snapshot_loaded_before_invalidation(redis_factory):
+    """查询数据库期间缓存失效时，旧快照不应以新版本号写入两级缓存"""
+    async def main():
+        redis = redis_factory()
+        AuthUserCache.clear()
+        AuthUserCache._version = 1
+
+        version = AuthUserCache.current_version()
+        # 模拟查询期间其他请求修改了用户并广播失效
+        AuthUserCache._sync_version(2)
+        await AuthUserCache.set(redis=redis, user=make_user(), version=version)
+        assert AuthUserCache.get_local("admin") is None
+        assert await redis.exists(AuthUserCache.key("admin")) == 0
+
+        await AuthUserCache.set(redis=redis, user=make_user(), version=AuthUserCache.current_version())
+        assert AuthUserCache.get_local("admin")["username"] == "admin"
+        online, snapshot = await AuthUserCache.check_online_and_get(redis=redis, token_key="missing", username="admin")
+        assert snapshot["id"] == 1
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        AuthUserCache.clear()
+        AuthUserCache._version = 0
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+CRUDBase 测试
+
+执行命令: pytest tests/test_base_crud.py
+"""
+
+import asyncio
+from pydantic import BaseModel, ConfigDict
+
+from app.core.base_crud import CRUDBase
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.position.model import PositionModel
+
+
+class PositionItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    description: str | None = None
+
+
+DESCRIPTIONS = ["b", None, "a", "c", None, "a", None]
+
+
+def collect_pages(db_sessionmaker, order_by: list[dict]) -> list[int]:
+    """按游标逐页读取全部岗位，返回读取到的主键顺序"""
+    async def main() -> list[int]:
+        async with db_sessionmaker() as session:
+            session.add_all([PositionModel(name=f"岗位{i}", description=desc) for i, desc in enumerate(DESCRIPTIONS)])
+            await session.commit()
+
+        ids, cursor = [], ""
+        async with db_sessionmaker() as session:
+            crud = CRUDBase(model=PositionModel, auth=AuthSchema(db=session, check_data_scope=False))
+            while True:
+                page = await crud.page(offset=0, limit=2, order_by=order_by, search={}, out_schema=PositionItem, cursor=cursor, with_total=False)
+                ids.extend(item["id"] for item in page["items"])
+                if not page["has_next"]:
+                    return ids
+                cursor = page["next_cursor"]
+
+    return asyncio.run(main())
+
+
+def test_cursor_page_nullable_asc(db_sessionmaker):
+    """可空排序字段游标分页: 空值排在最后，逐页读取不重复不遗漏"""
+    ids = collect_pages(db_sessionmaker, [{"description": "asc"}])
+    # 主键从 1 开始: a(3,6) b(1) c(4) 之后为空值(2,5,7)
+    assert ids == [3, 6, 1, 4, 2, 5, 7]
+
+
+def test_cursor_page_nullable_desc(db_sessionmaker):
+    """可空排序字段倒序游标分页: 空值同样排在最后，主键随排序方向倒序"""
+    ids = collect_pages(db_sessionmaker, [{"description": "desc"}])
+    assert ids == [4, 1, 6, 3, 7, 5, 2]
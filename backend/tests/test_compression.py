@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+响应压缩中间件测试
+
+执行命令: pytest tests/test_compression.py
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.core.middlewares import CompressionMiddleware
+from app.api.v1.module_monitor.server.service import ServerService
+
+
+def test_compression_stats_are_exposed_by_runtime_service():
+    """gzip 响应被记录到压缩统计，并可通过运行时统计服务读取"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+    body = "hello compression " * 200
+
+    @app.get("/text")
+    async def text() -> PlainTextResponse:
+        return PlainTextResponse(body)
+
+    CompressionMiddleware._stats = {}
+    try:
+        with TestClient(app) as client:
+            response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+            raw = client.get("/text", headers={"Accept-Encoding": "identity"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == body
+        assert "content-encoding" not in raw.headers
+
+        result = asyncio.run(ServerService.get_runtime_stats_service())
+        stats = result["compression"]["gzip"]
+        assert stats["responses"] == 1
+        assert stats["bytes_in"] == len(body)
+        assert stats["bytes_out"] < len(body)
+        assert 0 < stats["ratio"] < 1
+    finally:
+        CompressionMiddleware._stats = {}
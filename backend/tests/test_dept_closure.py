@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+部门闭包表测试
+
+执行命令: pytest tests/test_dept_closure.py
+"""
+
+import asyncio
+from sqlalchemy import select, update
+
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.dept.crud import DeptCRUD
+from app.api.v1.module_system.dept.model import DeptClosureModel, DeptModel
+
+
+async def closure_rows(session) -> set[tuple[int, int, int]]:
+    result = await session.execute(select(DeptClosureModel.ancestor_id, DeptClosureModel.descendant_id, DeptClosureModel.depth))
+    return set(result.tuples().all())
+
+
+def test_rebuild_closure_repairs_moved_dept(db_sessionmaker):
+    """部门移动后闭包表行数不变但祖先路径错误，重建时应识别并修复"""
+    async def main():
+        async with db_sessionmaker() as session:
+            async with session.begin():
+                # 1 -> 2 -> 3
+                session.add_all([
+                    DeptModel(id=1, name="总部"),
+                    DeptModel(id=2, name="研发部", parent_id=1),
+                    DeptModel(id=3, name="测试组", parent_id=2),
+                ])
+                await session.flush()
+                crud = DeptCRUD(AuthSchema(db=session, check_data_scope=False))
+                assert await crud.rebuild_closure_crud() is True
+                assert await crud.rebuild_closure_crud() is False
+
+                # 绕过闭包维护直接移动部门 3 到部门 1 下，闭包表仍为旧路径
+                await session.execute(update(DeptModel).where(DeptModel.id == 3).values(parent_id=1))
+                assert await crud.rebuild_closure_crud() is True
+                assert await closure_rows(session) == {
+                    (1, 1, 0), (2, 2, 0), (3, 3, 0),
+                    (1, 2, 1), (1, 3, 1),
+                }
+
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+路由发现与路由清单测试
+
+执行命令: pytest tests/test_discover.py
+"""
+
+import importlib
+import sys
+
+import pytest
+
+from app.config.setting import settings
+from app.core.discover import DiscoverRouter
+
+
+CONTROLLER = '''
+from fastapi import APIRouter
+
+{name} = APIRouter(prefix="/{path}")
+
+@{name}.get("/ping")
+async def ping() -> dict:
+    return {{"msg": "{path}"}}
+'''
+
+
+def write_controller(root, package: str, name: str, path: str) -> None:
+    directory = root / "discover_demo" / "module_demo" / package
+    directory.mkdir(parents=True)
+    (directory / "__init__.py").write_text("")
+    (directory / "controller.py").write_text(CONTROLLER.format(name=name, path=path))
+    importlib.invalidate_caches()
+
+
+def route_paths(discoverer: DiscoverRouter) -> set[str]:
+    return {route.path for route in discoverer.router.routes}
+
+
+@pytest.fixture
+def demo_package(tmp_path, monkeypatch):
+    """临时控制器包 discover_demo，测试结束后移除已导入的模块"""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for directory in (tmp_path / "discover_demo", tmp_path / "discover_demo" / "module_demo"):
+        directory.mkdir()
+        (directory / "__init__.py").write_text("")
+    write_controller(tmp_path, "first", "FirstRouter", "first")
+    yield tmp_path
+    for name in [name for name in sys.modules if name.split(".")[0] == "discover_demo"]:
+        sys.modules.pop(name)
+
+
+def test_manifest_is_rescanned_when_controllers_change(demo_package, monkeypatch):
+    """新增控制器后路由清单指纹不一致，回退为扫描注册，新控制器不会被遗漏"""
+    manifest = demo_package / "routes.json"
+
+    DiscoverRouter(base_package="discover_demo", manifest_file=manifest).write_manifest()
+
+    # 清单有效时不扫描目录
+    def no_scan(self):
+        raise AssertionError("路由清单有效时不应扫描")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(DiscoverRouter, "_scan_entries", no_scan)
+        assert route_paths(DiscoverRouter(base_package="discover_demo", manifest_file=manifest)) == {"/demo/first/ping"}
+
+    write_controller(demo_package, "second", "SecondRouter", "second")
+    discoverer = DiscoverRouter(base_package="discover_demo", manifest_file=manifest)
+    assert route_paths(discoverer) == {"/demo/first/ping", "/demo/second/ping"}
+
+
+def test_manifest_is_rescanned_when_app_version_changes(demo_package, monkeypatch):
+    """应用版本变化时路由清单失效"""
+    manifest = demo_package / "routes.json"
+    DiscoverRouter(base_package="discover_demo", manifest_file=manifest).write_manifest()
+
+    monkeypatch.setattr(settings, "VERSION", f"{settings.VERSION}-next")
+    assert DiscoverRouter(base_package="discover_demo", manifest_file=manifest, auto_discover=False)._load_manifest() is None
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+流式导出测试
+
+执行命令: pytest tests/test_excel_export.py
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+
+from openpyxl import load_workbook
+
+from app.utils.excel_util import ExcelUtil
+
+
+ROWS = [
+    {"name": "=HYPERLINK(\"http://evil\")", "remark": "+1", "amount": -3},
+    {"name": "@SUM(A1)", "remark": "-cmd", "amount": 2},
+    {"name": "正常文本", "remark": None, "amount": 0},
+]
+MAPPING = {"name": "名称", "remark": "备注", "amount": "金额"}
+
+
+def export(file_format: str) -> bytes:
+    async def batches():
+        yield ROWS
+
+    async def main() -> bytes:
+        return b"".join([chunk async for chunk in ExcelUtil.stream_export(batches(), MAPPING, file_format=file_format)])
+
+    return asyncio.run(main())
+
+
+def test_csv_export_escapes_formula_cells():
+    """CSV 导出时以 = + - @ 开头的文本加单引号前缀，数字不受影响"""
+    data = export("csv")
+    assert data.startswith(codecs.BOM_UTF8)
+    rows = list(csv.reader(io.StringIO(data[len(codecs.BOM_UTF8):].decode("utf-8"))))
+    assert rows[0] == ["名称", "备注", "金额"]
+    assert rows[1] == ["'=HYPERLINK(\"http://evil\")", "'+1", "-3"]
+    assert rows[2] == ["'@SUM(A1)", "'-cmd", "2"]
+    assert rows[3] == ["正常文本", "", "0"]
+
+
+def test_xlsx_export_escapes_formula_cells():
+    """xlsx 导出时公式前缀文本保存为普通字符串而不是公式"""
+    ws = load_workbook(io.BytesIO(export("xlsx"))).active
+    values = [[cell.value for cell in row] for row in ws.iter_rows(min_row=2)]
+    assert values[0] == ["'=HYPERLINK(\"http://evil\")", "'+1", -3]
+    assert values[1] == ["'@SUM(A1)", "'-cmd", 2]
+    assert all(cell.data_type != "f" for row in ws.iter_rows() for cell in row)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+流式导入测试
+
+执行命令: pytest tests/test_excel_import.py
+"""
+
+import asyncio
+import io
+
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.base_crud import CRUDBase
+from app.utils import excel_util
+from app.utils.excel_util import ExcelImporter, ImportColumn, ImportResult
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.position.model import PositionModel
+
+
+def test_failed_chunk_is_retried_row_by_row(db_sessionmaker, monkeypatch):
+    """整块写入因外键约束失败时逐行重试，只有违反约束的行记为错误"""
+    monkeypatch.setattr(excel_util, "async_db_session", db_sessionmaker)
+    content = "岗位名称,创建人\n岗位1,\n岗位2,999\n岗位3,\n".encode("utf-8")
+    columns = [
+        ImportColumn(header="岗位名称", field="name", required=True),
+        ImportColumn(header="创建人", field="created_id", type="int"),
+    ]
+
+    async def writer(db: AsyncSession, rows: list[tuple[int, dict]], result: ImportResult) -> int:
+        await CRUDBase(model=PositionModel, auth=AuthSchema(db=db, check_data_scope=False)).bulk_create(data=[item for _, item in rows])
+        return len(rows)
+
+    async def main() -> tuple[ImportResult, list[str]]:
+        file = UploadFile(file=io.BytesIO(content), filename="position.csv")
+        result = await ExcelImporter(columns=columns).run(file=file, writer=writer)
+        async with db_sessionmaker() as session:
+            names = list((await session.scalars(select(PositionModel.name).order_by(PositionModel.id))).all())
+            assert await session.scalar(select(func.count()).select_from(PositionModel)) == 2
+        return result, names
+
+    result, names = asyncio.run(main())
+    assert names == ["岗位1", "岗位3"]
+    assert (result.success, result.failed) == (2, 1)
+    assert len(result.errors) == 1 and result.errors[0].startswith("第2行")
+
+
+def test_import_progress_is_scoped_to_its_owner(redis_factory):
+    """导入进度按发起用户隔离，其他用户使用相同任务编号既查不到也覆盖不了"""
+    from types import SimpleNamespace
+
+    import pytest
+
+    from app.core.exceptions import CustomException
+    from app.utils.excel_util import ImportProgress
+    from app.api.v1.module_common.file.service import FileService
+
+    def auth(user_id):
+        return SimpleNamespace(user=SimpleNamespace(id=user_id))
+
+    async def main():
+        redis = redis_factory()
+        await ImportProgress(redis=redis, task_id="t1", user_id=1).update(status="running", failed=1, message="第2行: admin 已存在")
+        await ImportProgress(redis=redis, task_id="t1", user_id=2).update(status="success", failed=0, message="")
+
+        progress = await FileService.import_progress_service(auth=auth(1), redis=redis, task_id="t1")
+        assert progress["status"] == "running"
+        assert progress["failed"] == 1
+        assert (await FileService.import_progress_service(auth=auth(2), redis=redis, task_id="t1"))["status"] == "success"
+        with pytest.raises(CustomException):
+            await FileService.import_progress_service(auth=auth(3), redis=redis, task_id="t1")
+
+        # 未指定用户时不记录进度
+        await ImportProgress(redis=redis, task_id="t2").update(status="running")
+        assert await redis.keys("*t2*") == []
+        await redis.aclose()
+
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+数据库初始化测试
+
+执行命令: pytest tests/test_initialize.py
+"""
+
+import asyncio
+
+from sqlalchemy import inspect
+
+from app.scripts.initialize import InitializeData
+
+
+def test_missing_nullable_columns_are_added_to_existing_tables(db_sessionmaker):
+    """已有的任务日志表(旧版本或 sql 脚本导入)缺少新增的可空列时，初始化时补充"""
+    engine = db_sessionmaker.kw["bind"]
+
+    def columns(conn) -> set[str]:
+        return {column["name"] for column in inspect(conn).get_columns("app_job_log")}
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("ALTER TABLE app_job_log DROP COLUMN duration_ms")
+            await conn.exec_driver_sql("ALTER TABLE app_job_log DROP COLUMN latency_ms")
+            assert {"duration_ms", "latency_ms"}.isdisjoint(await conn.run_sync(columns))
+
+        async with engine.begin() as conn:
+            await conn.run_sync(InitializeData._InitializeData__add_missing_columns)
+            assert {"duration_ms", "latency_ms"} <= await conn.run_sync(columns)
+            # 再次执行时列已存在，不重复添加
+            await conn.run_sync(InitializeData._InitializeData__add_missing_columns)
+
+    asyncio.run(main())
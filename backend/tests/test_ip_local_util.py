@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+IP归属地测试
+
+执行命令: pytest tests/test_ip_local_util.py
+"""
+
+import asyncio
+import pytest
+
+from app.config.setting import settings
+from app.utils.ip_local_util import IpLocalUtil
+
+
+@pytest.fixture(autouse=True)
+def reset_ip_util(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "IP_LOCATION_DB_PATH", str(tmp_path / "ip_location.db"))
+    monkeypatch.setattr(settings, "IP_LOCATION_REMOTE_ENABLE", None)
+    IpLocalUtil._db, IpLocalUtil._db_count, IpLocalUtil._db_loaded = None, 0, False
+    IpLocalUtil._cache.clear()
+    yield
+    if IpLocalUtil._db is not None:
+        IpLocalUtil._db.close()
+    IpLocalUtil._db, IpLocalUtil._db_count, IpLocalUtil._db_loaded = None, 0, False
+    IpLocalUtil._cache.clear()
+
+
+def test_local_database_lookup(tmp_path, monkeypatch):
+    """生成离线库后按区间查询，未命中时默认不访问远程API"""
+    source = tmp_path / "ip.csv"
+    source.write_text("1.0.0.0,1.0.0.255,澳大利亚\n8.8.8.0,8.8.8.255,美国-谷歌\n", encoding="utf-8")
+    assert IpLocalUtil.build_database(source) == 2
+
+    async def remote(ip):
+        raise AssertionError("离线库存在时默认不应访问远程API")
+    monkeypatch.setattr(IpLocalUtil, "get_remote_location", remote)
+
+    assert asyncio.run(IpLocalUtil.get_ip_location("8.8.8.8")) == "美国-谷歌"
+    assert asyncio.run(IpLocalUtil.get_ip_location("1.0.0.1")) == "澳大利亚"
+    assert asyncio.run(IpLocalUtil.get_ip_location("9.9.9.9")) == IpLocalUtil.UNKNOWN
+
+
+def test_remote_fallback_without_database(monkeypatch):
+    """离线库不存在时回退到远程API，而不是一律返回未知"""
+    calls = []
+
+    async def remote(ip):
+        calls.append(ip)
+        return "中国-北京"
+    monkeypatch.setattr(IpLocalUtil, "get_remote_location", remote)
+
+    assert asyncio.run(IpLocalUtil.get_ip_location("114.114.114.114")) == "中国-北京"
+    # 结果进入 LRU 缓存
+    assert asyncio.run(IpLocalUtil.get_ip_location("114.114.114.114")) == "中国-北京"
+    assert calls == ["114.114.114.114"]
+
+    monkeypatch.setattr(settings, "IP_LOCATION_REMOTE_ENABLE", False)
+    IpLocalUtil._cache.clear()
+    assert asyncio.run(IpLocalUtil.get_ip_location("114.114.114.114")) == IpLocalUtil.UNKNOWN
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+任务执行日志批量写入器测试
+
+执行命令: pytest tests/test_job_log_writer.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.config.setting import settings
+from app.api.v1.module_application.job.tools import job_log_writer
+from app.api.v1.module_application.job.tools.job_log_writer import JobLogWriter
+from app.api.v1.module_monitor.server.service import ServerService
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    JobLogWriter.sampled = 0
+    JobLogWriter.dropped = 0
+    yield
+    JobLogWriter.sampled = 0
+    JobLogWriter.dropped = 0
+
+
+def test_sampled_and_failed_writes_are_counted(monkeypatch):
+    """高负载时成功日志被采样，批量写入失败的日志计入丢弃，并通过运行时统计服务暴露"""
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(job_log_writer, "async_db_session", broken_session)
+    monkeypatch.setattr(settings, "JOB_LOG_SAMPLE_THRESHOLD", 0)
+    monkeypatch.setattr(settings, "JOB_LOG_SAMPLE_RATE", 0)
+    monkeypatch.setattr(settings, "JOB_LOG_FLUSH_INTERVAL_MS", 10)
+
+    async def main():
+        JobLogWriter.start()
+        assert JobLogWriter.stats()["running"] is True
+        for job_id in range(3):
+            JobLogWriter.submit({"job_id": job_id, "status": "0"})
+        for job_id in range(2):
+            JobLogWriter.submit({"job_id": job_id, "status": "1", "exception_info": "boom"})
+        await JobLogWriter.stop()
+        return await ServerService.get_runtime_stats_service()
+
+    result = asyncio.run(main())
+    stats = result["job_log"]
+    assert stats["running"] is False
+    assert stats["sampled"] == 3
+    assert stats["dropped"] == 2
+
+
+def test_failed_row_does_not_drop_the_whole_batch(db_sessionmaker, monkeypatch):
+    """整批写入失败时逐条重试，只丢弃外键失效(任务已删除)的日志"""
+    from sqlalchemy import func, select
+    from app.api.v1.module_application.job.model import JobLogModel
+
+    monkeypatch.setattr(job_log_writer, "async_db_session", db_sessionmaker)
+
+    def record(job_id, status):
+        return {
+            "job_name": "demo",
+            "job_group": "redis",
+            "job_executor": "default",
+            "invoke_target": "demo.run",
+            "status": status,
+            "job_id": job_id,
+        }
+
+    async def main():
+        await JobLogWriter._write([record(None, "0"), record(999, "1"), record(None, "1")])
+        async with db_sessionmaker() as session:
+            return (await session.execute(
+                select(JobLogModel.status, func.count()).group_by(JobLogModel.status).order_by(JobLogModel.status)
+            )).all()
+
+    assert [tuple(row) for row in asyncio.run(main())] == [("0", 1), ("1", 1)]
+    assert JobLogWriter.stats()["dropped"] == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+在线会话索引测试
+
+执行命令: pytest tests/test_online_session.py
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from app.api.v1.module_monitor.online.schema import OnlineOutSchema
+from app.api.v1.module_monitor.online.service import OnlineSessionRegistry
+
+
+def make_session() -> OnlineOutSchema:
+    return OnlineOutSchema(
+        name="管理员", session_id="s1", user_id=1, user_name="admin", ipaddr="10.0.0.1",
+        login_time=datetime(2026, 1, 1, 8, 0, 0),
+    )
+
+
+def test_touch_restores_evicted_indexes(redis_factory):
+    """刷新令牌时重建被清理的用户/IP/过期索引并延长有效期"""
+    async def main():
+        redis = redis_factory()
+        registry = OnlineSessionRegistry
+        await registry.register(redis, make_session(), expire=60)
+        login_score = await redis.zscore(registry.LOGIN_INDEX, "s1")
+
+        # 模拟索引被淘汰
+        await redis.delete(registry.user_key("admin"), registry.ip_key("10.0.0.1"), registry.EXPIRE_INDEX, registry.LOGIN_INDEX)
+
+        await registry.touch(redis, "s1", expire=600)
+        assert await redis.smembers(registry.user_key("admin")) == {"s1"}
+        assert await redis.smembers(registry.ip_key("10.0.0.1")) == {"s1"}
+        assert await redis.zscore(registry.EXPIRE_INDEX, "s1") > time.time() + 500
+        assert await redis.zscore(registry.LOGIN_INDEX, "s1") == login_score
+        assert await redis.ttl(registry.user_key("admin")) > 600
+
+        # 会话信息已不存在时不写入孤立索引
+        await registry.touch(redis, "missing", expire=600)
+        assert await redis.zscore(registry.EXPIRE_INDEX, "missing") is None
+        await redis.aclose()
+
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Redis 缓存值编解码测试
+
+执行命令: pytest tests/test_redis_codec.py
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.config.setting import settings
+from app.core.redis_codec import Codec, JsonCodec, PickleCodec, RedisCodec
+
+
+class Point:
+    def __init__(self, x: int) -> None:
+        self.x = x
+
+
+def test_codec_base_is_abstract():
+    """编解码器基类不能直接实例化"""
+    with pytest.raises(TypeError):
+        Codec()
+
+
+def test_known_types_keep_string_representation(monkeypatch):
+    """日期、Decimal 等常见类型按字符串编码"""
+    monkeypatch.setattr(settings, "REDIS_CODEC", "json")
+    value = {"at": datetime(2026, 1, 1, 8, 0, 0), "amount": Decimal("1.50"), "tags": {"a"}}
+    data = RedisCodec.encode(value)
+    assert data[len(RedisCodec.MAGIC)] == JsonCodec.tag
+    assert RedisCodec.decode(data) == {"at": "2026-01-01 08:00:00", "amount": "1.50", "tags": ["a"]}
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_unknown_object_is_not_stringified(monkeypatch, codec):
+    """未知对象不再被 str() 静默编码；未开启 pickle 时抛出 TypeError"""
+    monkeypatch.setattr(settings, "REDIS_CODEC", codec)
+    monkeypatch.setattr(settings, "REDIS_PICKLE_ENABLE", False)
+    with pytest.raises(TypeError):
+        RedisCodec.encode({"point": Point(1)})
+
+
+def test_pickle_fallback_requires_opt_in(monkeypatch):
+    """开启 REDIS_PICKLE_ENABLE 后无法序列化的对象退回 pickle；关闭后拒绝解码 pickle 数据"""
+    monkeypatch.setattr(settings, "REDIS_CODEC", "json")
+    monkeypatch.setattr(settings, "REDIS_PICKLE_ENABLE", True)
+    data = RedisCodec.encode({"point": Point(2)})
+    assert data[len(RedisCodec.MAGIC)] == PickleCodec.tag
+    assert RedisCodec.decode(data)["point"].x == 2
+
+    monkeypatch.setattr(settings, "REDIS_PICKLE_ENABLE", False)
+    with pytest.raises(ValueError):
+        RedisCodec.decode(data)
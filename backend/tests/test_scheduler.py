@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+定时任务主节点租约测试
+
+执行命令: pytest tests/test_scheduler.py
+"""
+
+import asyncio
+
+from app.api.v1.module_application.job.tools.ap_scheduler import SchedulerUtil
+
+
+def test_lease_fencing_token_rejects_old_leader(redis_factory):
+    """租约被其他节点接管后 fencing token 递增，旧主节点无法再加执行锁"""
+    async def main():
+        redis = redis_factory()
+        acquire = redis.register_script(SchedulerUtil.ACQUIRE_SCRIPT)
+        release = redis.register_script(SchedulerUtil.RELEASE_SCRIPT)
+        fence = redis.register_script(SchedulerUtil.FENCE_SCRIPT)
+        keys = [SchedulerUtil.LEADER_KEY, SchedulerUtil.FENCE_KEY]
+
+        assert await acquire(keys=keys, args=["node-a", 10000]) == 1
+        assert await acquire(keys=keys, args=["node-b", 10000]) == 0
+        # 续约返回原 token
+        assert await acquire(keys=keys, args=["node-a", 10000]) == 1
+        assert await fence(keys=[SchedulerUtil.LEADER_KEY, "job_lock:1"], args=["1:node-a", 30]) == 1
+        assert await fence(keys=[SchedulerUtil.LEADER_KEY, "job_lock:1"], args=["1:node-a", 30]) == 0
+        await redis.delete("job_lock:1")
+
+        # 租约过期后由 node-b 接管
+        await redis.delete(SchedulerUtil.LEADER_KEY)
+        assert await acquire(keys=keys, args=["node-b", 10000]) == 2
+        assert await fence(keys=[SchedulerUtil.LEADER_KEY, "job_lock:1"], args=["1:node-a", 30]) == -1
+        assert await release(keys=[SchedulerUtil.LEADER_KEY], args=["1:node-a"]) == 0
+        assert await redis.get(SchedulerUtil.LEADER_KEY) == "2:node-b"
+        assert await release(keys=[SchedulerUtil.LEADER_KEY], args=["2:node-b"]) == 1
+        await redis.aclose()
+
+    asyncio.run(main())
+
+
+def test_runtime_jobs_use_shared_jobstore():
+    """进程内存储器的任务改写入 Redis 共享存储器，主节点才能读取"""
+    assert SchedulerUtil._resolve_jobstore(None) == "redis"
+    assert SchedulerUtil._resolve_jobstore("default") == "redis"
+    assert SchedulerUtil._resolve_jobstore("unknown") == "redis"
+    assert SchedulerUtil._resolve_jobstore("sqlalchemy") == "sqlalchemy"
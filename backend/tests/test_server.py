@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 服务启动测试
+
+执行命令: pytest tests/test_server.py
+"""
+
+import sys
+
+import pytest
+
+from app.core import server
+
+
+@pytest.fixture
+def uvicorn_calls(monkeypatch):
+    """记录 uvicorn.run 的调用参数，不真正启动服务"""
+    calls = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def test_single_process_does_not_recycle_worker(uvicorn_calls):
+    """单进程与热重载没有进程管理器拉起，不传 limit_max_requests"""
+    server.run_server(app="main:create_app", workers=1, max_requests=100)
+    server.run_server(app="main:create_app", workers=4, reload=True, max_requests=100)
+    assert [call["limit_max_requests"] for call in uvicorn_calls] == [None, None]
+
+
+def test_uvicorn_multiprocess_recycles_worker(monkeypatch, uvicorn_calls):
+    """Windows 下 uvicorn 多进程由主进程拉起 worker，保留回收阈值"""
+    monkeypatch.setattr(sys, "platform", "win32")
+    server.run_server(app="main:create_app", workers=4, max_requests=100)
+    assert uvicorn_calls[0]["workers"] == 4
+    assert uvicorn_calls[0]["limit_max_requests"] == 100
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+服务层缓存测试
+
+执行命令: pytest tests/test_service_cache.py
+"""
+
+import asyncio
+
+from app.core.service_cache import ServiceCache
+# 导入服务模块以登记 cached 方法依赖的表
+from app.api.v1.module_system.dept import service as _dept_service  # noqa: F401
+
+
+def reset_cache() -> None:
+    ServiceCache._redis = None
+    ServiceCache._local.clear()
+    ServiceCache._tag_versions.clear()
+    ServiceCache._inflight.clear()
+
+
+def test_load_does_not_release_lock_taken_over_by_another_worker(redis_factory):
+    """回源超过锁超时后锁被其他 worker 取得，释放时不删除对方的锁"""
+    async def main():
+        redis = redis_factory()
+        ServiceCache._redis = redis
+        lock_key = f"{ServiceCache.KEY}:demo:lock"
+
+        async def loader():
+            # 模拟本 worker 的锁已过期并被其他 worker 取得
+            await redis.set(lock_key, "other", ex=30)
+            return {"value": 1}
+
+        assert await ServiceCache.get_or_load("demo", loader, tags=("sys_dept",)) == {"value": 1}
+        assert await redis.get(lock_key) == "other"
+
+        await redis.delete(lock_key)
+        ServiceCache._local.clear()
+        assert await ServiceCache.get_or_load("demo", loader, tags=("sys_dept",)) == {"value": 1}
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        reset_cache()
+
+
+def test_publish_skips_tables_without_cached_readers(redis_factory):
+    """没有 cached 方法依赖的表(如通知公告)不递增版本号也不广播"""
+    async def main():
+        redis = redis_factory()
+        ServiceCache._redis = redis
+        assert "sys_dept" in ServiceCache._readers
+        assert "sys_notice" not in ServiceCache._readers
+
+        async with redis.pubsub() as pubsub:
+            await pubsub.subscribe(ServiceCache.CHANNEL)
+            await pubsub.get_message(timeout=1)
+
+            await ServiceCache.publish({"sys_notice"})
+            assert await redis.exists(ServiceCache.tag_key("sys_notice")) == 0
+            assert await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.2) is None
+
+            await ServiceCache.publish({"sys_dept", "sys_notice"})
+            assert await redis.get(ServiceCache.tag_key("sys_dept")) is not None
+            assert await redis.exists(ServiceCache.tag_key("sys_notice")) == 0
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+            assert "sys_dept" in message["data"]
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        reset_cache()
+
+
+def test_dept_tree_is_invalidated_when_users_change(redis_factory):
+    """部门树按创建人所在部门过滤数据权限，用户表写入(如调整部门)后重新回源"""
+    async def main():
+        redis = redis_factory()
+        ServiceCache._redis = redis
+        assert "sys_user" in ServiceCache._readers
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"value": len(calls)}
+
+        tags = ("sys_dept", "sys_role", "sys_user")
+        assert await ServiceCache.get_or_load("tree", loader, tags=tags) == {"value": 1}
+        assert await ServiceCache.get_or_load("tree", loader, tags=tags) == {"value": 1}
+        await ServiceCache.publish({"sys_user"})
+        assert await ServiceCache.get_or_load("tree", loader, tags=tags) == {"value": 2}
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        reset_cache()
+
+
+def test_tag_version_reset_does_not_revive_stale_entries(redis_factory):
+    """标签版本号键丢失后重新初始化为更大的版本号，旧缓存项不会被误判为命中"""
+    async def main():
+        redis = redis_factory()
+        ServiceCache._redis = redis
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"value": len(calls)}
+
+        await ServiceCache.publish({"sys_dept"})
+        before = int(await redis.get(ServiceCache.tag_key("sys_dept")))
+        assert before > 1
+        assert await ServiceCache.get_or_load("tree", loader, tags=("sys_dept",)) == {"value": 1}
+
+        # 模拟 Redis 淘汰版本号键后再次写入部门表
+        await redis.delete(ServiceCache.tag_key("sys_dept"))
+        await ServiceCache.publish({"sys_dept"})
+        assert int(await redis.get(ServiceCache.tag_key("sys_dept"))) > before
+        assert await ServiceCache.get_or_load("tree", loader, tags=("sys_dept",)) == {"value": 2}
+
+        # 版本号键丢失且无写入时按未命中处理并重新初始化
+        await redis.delete(ServiceCache.tag_key("sys_dept"))
+        ServiceCache._local.clear()
+        assert await ServiceCache.get_or_load("tree", loader, tags=("sys_dept",)) == {"value": 3}
+        assert await redis.exists(ServiceCache.tag_key("sys_dept")) == 1
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        reset_cache()
+
+
+def test_config_value_lookup_is_cached_until_params_change(redis_factory, monkeypatch):
+    """按配置键取值命中缓存，配置表写入后重新回源"""
+    from types import SimpleNamespace
+    from app.api.v1.module_system.auth.schema import AuthSchema
+    from app.api.v1.module_system.params import service as params_service
+
+    calls = []
+
+    class FakeParamsCRUD:
+        def __init__(self, auth):
+            pass
+
+        async def get_obj_by_key_crud(self, key):
+            calls.append(key)
+            return SimpleNamespace(config_value=f"{key}:{len(calls)}")
+
+    monkeypatch.setattr(params_service, "ParamsCRUD", FakeParamsCRUD)
+    auth = AuthSchema.model_construct(user=None, check_data_scope=False, db=None)
+
+    async def main():
+        redis = redis_factory()
+        ServiceCache._redis = redis
+        get_value = params_service.ParamsService.get_config_value_by_key_service
+        assert await get_value(auth=auth, config_key="demo_enable") == "demo_enable:1"
+        assert await get_value(auth=auth, config_key="demo_enable") == "demo_enable:1"
+        assert calls == ["demo_enable"]
+
+        await ServiceCache.publish({"sys_param"})
+        assert await get_value(auth=auth, config_key="demo_enable") == "demo_enable:2"
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        reset_cache()
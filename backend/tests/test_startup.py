@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+启动编排器测试
+
+执行命令: pytest tests/test_startup.py
+"""
+
+import asyncio
+
+from app.core.startup import StartupOrchestrator
+
+
+def test_once_step_reruns_when_warmed_keys_are_cleared(redis_factory):
+    """版本戳一致且预热键存在时跳过，预热键被清理后重新执行"""
+    async def main():
+        redis = redis_factory()
+        calls = []
+
+        async def warm() -> None:
+            calls.append(1)
+            await redis.set("demo_warm:a", "1")
+            await redis.set("demo_warm:b", "2")
+
+        async def run_startup() -> StartupOrchestrator:
+            startup = StartupOrchestrator(redis=redis)
+            startup.add("demo_warm", warm, once=True, sentinel="demo_warm:*")
+            await startup.run()
+            return startup
+
+        startup = await run_startup()
+        assert startup.status()["steps"]["demo_warm"]["status"] == "done"
+        startup = await run_startup()
+        assert startup.status()["steps"]["demo_warm"]["status"] == "skipped"
+        assert len(calls) == 1
+
+        await redis.delete("demo_warm:a", "demo_warm:b")
+        startup = await run_startup()
+        assert startup.status()["steps"]["demo_warm"]["status"] == "done"
+        assert len(calls) == 2
+        assert await redis.get("demo_warm:a") == "1"
+        await redis.aclose()
+
+    asyncio.run(main())
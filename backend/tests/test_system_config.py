@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+系统配置快照测试
+
+执行命令: pytest tests/test_system_config.py
+"""
+
+import asyncio
+import json
+
+from app.common.enums import RedisInitKeyConfig
+from app.core.redis_crud import RedisCURD
+from app.core.system_config import IpMatcher, SystemConfigCache
+
+
+def test_ip_matcher_matches_exact_and_cidr():
+    """精确IP与CIDR网段均可匹配，无效网段被忽略"""
+    matcher = IpMatcher(["10.0.0.1", "192.168.1.0/24", "2001:db8::/32", "bad/99", ""])
+    assert "10.0.0.1" in matcher
+    assert "192.168.1.200" in matcher
+    assert "2001:db8::1" in matcher
+    assert "192.168.2.1" not in matcher
+    assert "not-an-ip" not in matcher
+    assert None not in matcher
+
+
+def test_clearing_config_namespace_keeps_snapshot_version(redis_factory):
+    """清理 system_config:* 不会删除快照版本号，变更后快照从 Redis 重新加载"""
+    async def main():
+        redis = redis_factory()
+        prefix = RedisInitKeyConfig.SYSTEM_CONFIG.key
+        await RedisCURD(redis).set(f"{prefix}:ip_black_list", {"config_value": json.dumps(["10.1.0.0/16"])})
+        await RedisCURD(redis).set(f"{prefix}:demo_enable", {"config_value": "true"})
+
+        await SystemConfigCache.invalidate(redis=redis)
+        snapshot = await SystemConfigCache.get(redis)
+        assert snapshot.demo_enable is True
+        assert "10.1.2.3" in snapshot.ip_black_list
+        assert await redis.get(SystemConfigCache.VERSION_KEY) == "1"
+
+        keys = await RedisCURD(redis).get_keys(f"{prefix}:*")
+        await redis.delete(*keys)
+        assert await redis.get(SystemConfigCache.VERSION_KEY) == "1"
+
+        await SystemConfigCache.invalidate(redis=redis)
+        assert await redis.get(SystemConfigCache.VERSION_KEY) == "2"
+        snapshot = await SystemConfigCache.get(redis)
+        assert snapshot.demo_enable is False
+        assert "10.1.2.3" not in snapshot.ip_black_list
+        await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        SystemConfigCache._redis = None
+        SystemConfigCache._snapshot = None
+        SystemConfigCache._version = -1
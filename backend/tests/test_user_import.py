@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+用户批量导入测试
+
+执行命令: pytest tests/test_user_import.py
+"""
+
+import asyncio
+import io
+
+from fastapi import UploadFile
+from sqlalchemy import select
+
+from app.utils import excel_util
+from app.utils.hash_bcrpy_util import PwdUtil
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.dept.model import DeptModel
+from app.api.v1.module_system.user.model import UserModel
+from app.api.v1.module_system.user.service import UserService
+
+
+def test_import_mixed_create_and_update_chunk(db_sessionmaker, monkeypatch):
+    """同一块内新增与更新混合: 新用户使用默认密码，已存在用户只更新资料不覆盖密码，超管行只记一次错误"""
+    monkeypatch.setattr(excel_util, "async_db_session", db_sessionmaker)
+
+    async def fake_hash(password: str) -> str:
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(PwdUtil, "set_password_hash_async", staticmethod(fake_hash))
+    content = (
+        "部门编号,用户名,名称,邮箱,手机号,性别,状态\n"
+        "1,alice,Alice,,,女,正常\n"
+        "1,bob,Bobby,bob@example.com,,男,正常\n"
+        "1,root,Root,,,男,正常\n"
+    ).encode("utf-8")
+
+    async def main() -> tuple[str, dict[str, UserModel]]:
+        async with db_sessionmaker() as session:
+            async with session.begin():
+                session.add(DeptModel(id=1, name="总部"))
+                session.add_all([
+                    UserModel(username="bob", password="old-hash", name="Bob", dept_id=1),
+                    UserModel(username="root", password="root-hash", name="Root", is_superuser=True),
+                ])
+
+        async with db_sessionmaker() as session:
+            message = await UserService.batch_import_user_service(
+                auth=AuthSchema(db=session, check_data_scope=False),
+                file=UploadFile(file=io.BytesIO(content), filename="user.csv"),
+                update_support=True,
+            )
+
+        async with db_sessionmaker() as session:
+            users = {user.username: user for user in (await session.scalars(select(UserModel))).all()}
+        return message, users
+
+    message, users = asyncio.run(main())
+    assert message.startswith("成功导入 2 条数据")
+    assert message.count("第3行") == 1 and "共" not in message
+    assert users["alice"].password == "hashed:123456"
+    assert users["alice"].gender == "1"
+    assert users["bob"].name == "Bobby"
+    assert users["bob"].email == "bob@example.com"
+    assert users["bob"].password == "old-hash"
+    assert users["root"].name == "Root"